@@ -3,14 +3,12 @@
 import { useRouter } from "next/navigation";
 import React, { useState, useEffect, useMemo } from "react";
 import BrandCard from "@/components/BrandCard";
-import { StockWeeksData, Brand, CATEGORY_ORDER } from "@/types/stock-weeks";
+import { StockWeeksData, StockWeeksSummary, Brand, CATEGORY_ORDER } from "@/types/stock-weeks";
 import { useLanguageStore } from "@/lib/store/language-store";
 import { useT } from "@/lib/i18n";
 
-// JSON 데이터 import
-import MLBData from "@/data/stock_weeks_MLB.json";
-import KidsData from "@/data/stock_weeks_MLB_KIDS.json";
-import DscData from "@/data/stock_weeks_DISCOVERY.json";
+// 홈 화면용 요약 JSON import (브랜드 × 중분류 × 월, preprocess_stock_weeks.py가 생성)
+import SummaryData from "@/data/stock_weeks_summary.json";
 
 /**
  * 홈 대시보드 페이지 컴포넌트
@@ -31,20 +29,26 @@ export default function HomeDashboard() {
   const [nWeeks, setNWeeks] = useState<number>(25);
   const [selectedYear, setSelectedYear] = useState<string>("");
   const [selectedMonth, setSelectedMonth] = useState<number>(0);
+  const [summaryYears, setSummaryYears] = useState<Set<string>>(new Set());
   const { language, setLanguage } = useLanguageStore();
   const t = useT();
 
   const brands: Brand[] = ["MLB", "MLB KIDS", "DISCOVERY"];
 
   /**
-   * 브랜드별 JSON 데이터 로드
+   * 브랜드별 요약 데이터 로드 (중분류 월 데이터만 포함, 소분류 제외)
    */
   useEffect(() => {
     setLoading(true);
     try {
-      setMlbData(MLBData as StockWeeksData);
-      setKidsData(KidsData as StockWeeksData);
-      setDiscoveryData(DscData as StockWeeksData);
+      // 홈 카드는 기초데이터만 사용하므로 요약을 대시보드 데이터 구조로 그대로 전달
+      const summary = SummaryData as StockWeeksSummary;
+      const categoriesOf = (brand: Brand) => (summary.brands[brand]?.categories as StockWeeksData | undefined) ?? null;
+      setMlbData(categoriesOf("MLB"));
+      setKidsData(categoriesOf("MLB KIDS"));
+      setDiscoveryData(categoriesOf("DISCOVERY"));
+      // 요약의 나머지 연도는 전년 동월 비교용이므로 연도 선택에서 제외
+      setSummaryYears(new Set(Object.values(summary.brands).flatMap((brandSummary) => brandSummary?.years ?? [])));
     } catch (error) {
       console.error("Error loading data:", error);
     } finally {
@@ -63,7 +67,7 @@ export default function HomeDashboard() {
         CATEGORY_ORDER.forEach((category) => {
           if (data[category]) {
             Object.keys(data[category]).forEach((key) => {
-              if (/^\d{4}$/.test(key) && key !== "2023" && key !== "소분류") {
+              if (/^\d{4}$/.test(key) && key !== "2023" && key !== "소분류" && summaryYears.has(key)) {
                 years.add(key);
               }
             });
@@ -73,7 +77,7 @@ export default function HomeDashboard() {
     });
     
     return Array.from(years).sort((a, b) => b.localeCompare(a));
-  }, [mlbData, kidsData, discoveryData]);
+  }, [mlbData, kidsData, discoveryData, summaryYears]);
 
   /**
    * 사용 가능한 월 목록 추출 (선택된 연도 기준)
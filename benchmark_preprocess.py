@@ -0,0 +1,258 @@
+"""
+전처리 파이프라인 벤치마크
+generate_synthetic_data.py로 만든 합성 CSV를 대상으로 단계별 처리 시간, 처리량(rows/sec),
+최대 메모리(RSS)를 측정
+
+측정 단계:
+- load_stock_all_from_agency: 대리상재고 CSV 로딩/집계 (월별 합계)
+- load_sales_chunked: 판매매출 CSV 로딩/집계 (월별 합계)
+- compute_stock_weeks: 재고주수 계산
+- export_json: 브랜드별 JSON 출력
+- end_to_end: preprocess_brands + export_json (실제 실행과 동일한 흐름)
+
+사용 예:
+    python benchmark_preprocess.py --sizes 100000 1000000 --months 2 --json bench.json
+    python benchmark_preprocess.py --sizes 1000000 --compare bench.json --tolerance 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+import preprocess_stock_weeks as psw
+from generate_synthetic_data import generate_dataset
+
+STAGES = ["load_stock_all_from_agency", "load_sales_chunked", "compute_stock_weeks", "export_json", "end_to_end"]
+
+
+class PeakMemory:
+    """
+    구간 내 최대 RSS 측정 (백그라운드 스레드로 주기적으로 샘플링)
+    RSS를 읽을 수 없는 환경에서는 tracemalloc의 Python 할당 최대치로 대체
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self.source = "rss" if psw.current_rss() is not None else "tracemalloc"
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, psw.current_rss() or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if self.source == "rss":
+            self.peak = psw.current_rss()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        else:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.source == "rss":
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, psw.current_rss() or 0)
+        else:
+            self.peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return False
+
+
+def measure(fn, rows: int, quiet: bool = True) -> tuple[object, dict]:
+    """
+    fn() 실행 시간/CPU 시간/최대 메모리 측정
+
+    Returns:
+        (fn 반환값, {"seconds", "cpu_seconds", "rows", "rows_per_sec", "peak_mb", "memory_source"})
+    """
+    output = io.StringIO() if quiet else sys.stdout
+    with PeakMemory() as memory, contextlib.redirect_stdout(output):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        result = fn()
+        cpu_seconds = time.process_time() - cpu_start
+        seconds = time.perf_counter() - wall_start
+
+    return result, {
+        "seconds": round(seconds, 4),
+        "cpu_seconds": round(cpu_seconds, 4),
+        "rows": rows,
+        "rows_per_sec": round(rows / seconds) if seconds > 0 else None,
+        "peak_mb": round(memory.peak / (1 << 20), 1),
+        "memory_source": memory.source,
+    }
+
+
+def run_size(
+    rows: int,
+    months: int,
+    workdir: Path,
+    workers: int,
+    formats: list[str],
+    quiet: bool,
+    memory_budget: int | None = None
+) -> dict:
+    """
+    파일당 rows행의 합성 데이터 months개월치를 만들어 단계별 측정
+    (캐시는 모두 끄고 CSV에서 직접 읽는 콜드 실행 기준, memory_budget(MB)을 주면 스트리밍 수집 모드)
+    """
+    base = workdir / f"data_{rows}"
+    out_dir = workdir / f"out_{rows}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"\n[{rows:,}행 × {months}개월] 합성 데이터 생성 중...")
+    generation_start = time.perf_counter()
+    month_list = generate_dataset(base, rows, (2025, 1), months)
+    print(f"  생성 완료 ({time.perf_counter() - generation_start:.1f}초)")
+
+    psw.configure_paths(base, cache_dir=workdir / "cache")
+    psw.USE_COLUMNAR_CACHE = False
+    psw.MEMORY_BUDGET_MB = memory_budget
+
+    total_rows = rows * len(month_list)
+    stages = {}
+
+    def load_all(loader):
+        return [loader(year, month) for year, month in month_list]
+
+    stock_parts, stages["load_stock_all_from_agency"] = measure(
+        lambda: load_all(psw.load_stock_all_from_agency), total_rows, quiet
+    )
+    sales_parts, stages["load_sales_chunked"] = measure(
+        lambda: load_all(psw.load_sales_chunked), total_rows, quiet
+    )
+
+    all_stock = pd.concat(stock_parts, ignore_index=True)
+    sales = pd.concat(sales_parts, ignore_index=True)
+    stock_agency = psw.get_stock_agency(all_stock)
+    stock_or = psw.get_stock_or(all_stock)
+    agg_rows = len(all_stock) + len(sales)
+
+    weeks, stages["compute_stock_weeks"] = measure(
+        lambda: psw.compute_stock_weeks(stock_agency, stock_or, sales, 25), agg_rows, quiet
+    )
+
+    def export_all(results: dict):
+        for brand, brand_df in results.items():
+            output_file = out_dir / f"stock_weeks_{brand.replace(' ', '_')}.json"
+            psw.export_json(brand_df, str(output_file), n_weeks=25, formats=formats)
+
+    by_brand = {
+        brand: brand_df.reset_index(drop=True)
+        for brand, brand_df in weeks.groupby("brand", sort=False)
+    }
+    _, stages["export_json"] = measure(lambda: export_all(by_brand), len(weeks), quiet)
+
+    def end_to_end():
+        results = psw.preprocess_brands(psw.TARGET_BRANDS, use_cache=False, workers=workers)
+        export_all({brand: df for brand, df in results.items() if not df.empty})
+
+    _, stages["end_to_end"] = measure(end_to_end, total_rows * 2, quiet)
+
+    return {"rows_per_file": rows, "months": len(month_list), "stages": stages}
+
+
+def print_report(results: list[dict]):
+    """단계별 측정 결과 표 출력"""
+    print(f"\n{'행 수':>12} {'단계':<28} {'시간(초)':>10} {'CPU(초)':>10} {'rows/sec':>14} {'최대 MB':>10}")
+    for result in results:
+        for stage in STAGES:
+            m = result["stages"][stage]
+            rate = f"{m['rows_per_sec']:,}" if m["rows_per_sec"] else "-"
+            print(
+                f"{result['rows_per_file']:>12,} {stage:<28} {m['seconds']:>10.3f} "
+                f"{m['cpu_seconds']:>10.3f} {rate:>14} {m['peak_mb']:>10.1f}"
+            )
+
+
+def compare_with_baseline(results: list[dict], baseline_path: Path, tolerance: float) -> list[str]:
+    """
+    기준 결과(--json으로 저장한 파일)와 처리량 비교
+
+    Returns:
+        처리량이 tolerance 비율 이상 떨어진 항목 설명 목록
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["rows_per_file"]: r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        base = baseline.get(result["rows_per_file"])
+        if base is None:
+            continue
+        for stage in STAGES:
+            new_rate = result["stages"][stage]["rows_per_sec"]
+            old_rate = base["stages"].get(stage, {}).get("rows_per_sec")
+            if new_rate and old_rate and new_rate < old_rate * (1 - tolerance):
+                regressions.append(
+                    f"{result['rows_per_file']:,}행 {stage}: {old_rate:,} → {new_rate:,} rows/sec "
+                    f"({new_rate / old_rate - 1:+.1%})"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="재고주수 전처리 벤치마크 (합성 데이터)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="파일당 행 수 목록 (기본값: 100,000 1,000,000)")
+    parser.add_argument("--months", type=int, default=2, help="생성할 개월 수 (기본값: 2)")
+    parser.add_argument("--workers", type=int, default=1, help="end_to_end 단계의 프로세스 수 (기본값: 1)")
+    parser.add_argument("--format", dest="formats", nargs="+", choices=psw.EXPORT_FORMATS, default=["nested"], help="export_json 출력 형식")
+    parser.add_argument("--memory-budget", type=int, default=None, metavar="MB", help="스트리밍 수집 모드의 프로세스당 메모리 상한(MB)")
+    parser.add_argument("--workdir", type=Path, default=None, help="합성 데이터/출력 폴더 (기본값: 임시 폴더, 종료 시 삭제)")
+    parser.add_argument("--keep", action="store_true", help="--workdir 미지정 시에도 임시 폴더를 삭제하지 않음")
+    parser.add_argument("--json", type=Path, default=None, help="측정 결과를 저장할 JSON 파일")
+    parser.add_argument("--compare", type=Path, default=None, help="비교할 기준 결과 JSON (--json으로 저장한 파일)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 처리량 감소 비율 (기본값: 0.2 = 20%%)")
+    parser.add_argument("--verbose", action="store_true", help="전처리 로그를 그대로 출력")
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="stock_weeks_bench_"))
+    try:
+        results = [
+            run_size(rows, args.months, workdir, args.workers, args.formats, quiet=not args.verbose,
+                     memory_budget=args.memory_budget)
+            for rows in args.sizes
+        ]
+    finally:
+        if args.workdir is None and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+        elif args.workdir is None:
+            print(f"\n임시 폴더 유지: {workdir}")
+
+    print_report(results)
+
+    if args.json:
+        report = {
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "pyarrow": psw.pa.__version__ if psw.pa is not None else None,
+            "cpu_count": os.cpu_count(),
+            "results": results,
+        }
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n측정 결과가 {args.json}에 저장되었습니다.")
+
+    if args.compare:
+        regressions = compare_with_baseline(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"\n⚠️  처리량 감소 (허용 {args.tolerance:.0%} 초과):")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"\n✓ 기준 대비 처리량 감소 없음 (허용 {args.tolerance:.0%})")
@@ -0,0 +1,113 @@
+"""
+사이드카 인덱스/드릴다운 행 번호 확인 스크립트
+빈 줄과 따옴표 안 줄바꿈이 들어 있는 작은 판매매출 CSV를 만들어,
+CSV 리더(pyarrow/pandas)와 컬럼형 캐시 사용 여부를 바꿔 가며 이상치 행의 사이드카 행 번호/바이트 위치와
+드릴다운 인덱스(rows.sqlite)의 행 번호가 실제 원본 행을 가리키는지 확인
+"""
+import csv
+import io
+import itertools
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import drilldown
+import preprocess_stock_weeks as psw
+
+HEADER = ["门店编码", "门店名称", "Channel 1", "Channel 2", "产品品牌", "产品大分类", "产品中分类", "本地小分类", "吊牌金额"]
+FLAGGED_AMOUNT = 99_000_000_000
+
+
+def csv_line(values: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue()
+
+
+def write_test_csv(file_path: Path) -> list[int]:
+    """
+    테스트용 판매매출 CSV 생성
+
+    Returns:
+        이상치(FLAGGED_AMOUNT) 행의 원본 행 번호 목록
+    """
+    text = csv_line(HEADER) + "\n"  # 헤더 다음 빈 줄
+    flagged_lines = []
+    for i in range(30):
+        # 따옴표 안 줄바꿈이 있는 매장명
+        store = "STORE\nB1" if i % 7 == 3 else "STORE"
+        amount = FLAGGED_AMOUNT if i in (12, 25) else 100 + i
+        if amount == FLAGGED_AMOUNT:
+            flagged_lines.append(text.count("\n") + 1)
+        text += csv_line([10_000 + i, store, "CN", "FRS", "MLB", psw.ACC_MAJOR_CATEGORY, "Bag", "CR", amount])
+        if i == 20:
+            text += "\n"
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(text, encoding="utf-8-sig", newline="")
+    return flagged_lines
+
+
+def check_sidecar(base: Path, use_pyarrow: bool, use_columnar: bool, expected_lines: list[int]) -> list[str]:
+    """지정한 리더 설정으로 사이드카를 만들고 이상치 행 위치 확인, 문제 설명 목록 반환"""
+    cache_dir = base / f"cache_{int(use_pyarrow)}{int(use_columnar)}"
+    psw.configure_paths(base, cache_dir=cache_dir)
+    psw.USE_PYARROW_CSV = use_pyarrow
+    psw.USE_COLUMNAR_CACHE = use_columnar
+    psw.WRITE_SIDECAR_INDEX = True
+    psw.load_sales_chunked(2025, 1)
+
+    sidecar = json.loads(psw.sidecar_path("판매매출", 2025, 1).read_text(encoding="utf-8"))
+    problems = []
+    lines = [row["line"] for row in sidecar["flagged"]]
+    if lines != expected_lines:
+        problems.append(f"행 번호 {lines} (기대값 {expected_lines})")
+
+    source = Path(sidecar["source"]).read_bytes()
+    for row in sidecar["flagged"]:
+        offset = row["byte_offset"]
+        if offset is None:
+            problems.append(f"{row['line']}행: 바이트 위치 없음")
+            continue
+        record = next(csv.reader(io.StringIO(source[offset:].decode("utf-8"))))
+        if record[-1:] != [str(FLAGGED_AMOUNT)]:
+            problems.append(f"바이트 위치 {offset}의 행: {record}")
+    return problems
+
+
+def check_drilldown(expected_lines: list[int]) -> list[str]:
+    """현재 설정(check_sidecar 직후)으로 드릴다운 인덱스를 만들고 이상치 행 번호 확인"""
+    conn = drilldown.open_rows_db()
+    try:
+        drilldown.index_month(conn, "판매매출", 2025, 1)
+        lines = [line for (line,) in conn.execute(
+            "SELECT line FROM raw_rows WHERE source = '판매매출' AND amount = ? ORDER BY line", (FLAGGED_AMOUNT,)
+        )]
+    finally:
+        conn.close()
+    return [] if lines == expected_lines else [f"드릴다운 행 번호 {lines} (기대값 {expected_lines})"]
+
+
+if __name__ == "__main__":
+    base = Path(tempfile.mkdtemp(prefix="stock_weeks_sidecar_"))
+    try:
+        expected = write_test_csv(base / "판매매출" / "2025.01.csv")
+        readers = [True, False] if psw.pacsv is not None else [False]
+        caches = [True, False] if psw.pq is not None else [False]
+
+        failed = False
+        for use_pyarrow, use_columnar in itertools.product(readers, caches):
+            problems = check_sidecar(base, use_pyarrow, use_columnar, expected) + check_drilldown(expected)
+            label = f"pyarrow={use_pyarrow}, 컬럼형 캐시={use_columnar}"
+            if problems:
+                failed = True
+                print(f"✗ {label}")
+                for problem in problems:
+                    print(f"   - {problem}")
+            else:
+                print(f"✓ {label}: 이상치 행 {expected}")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    sys.exit(1 if failed else 0)
@@ -3,7 +3,7 @@
 import React, { useState } from "react";
 import { StockWeeksData, Brand, CATEGORY_NAMES, CATEGORY_ORDER, MonthData } from "@/types/stock-weeks";
 import { getCellColor, getHeatmapClass, formatWeeksValue } from "@/utils/color-helper";
-import { calcWeeksFromBase, WeeksKind } from "@/utils/calc-weeks";
+import { calcWeeksFromBase, weeksBaseData, WeeksKind } from "@/utils/calc-weeks";
 import { formatSubcategoryLabel } from "@/utils/subcategory-names";
 import InventoryMonthlySummaryCard from "@/components/inventory/InventoryMonthlySummaryCard";
 import InventorySummaryCards from "@/components/inventory/InventorySummaryCards";
@@ -93,9 +93,9 @@ export default function StockWeeksHeatmap({
       return null;
     }
 
-    // 기초데이터가 있으면 재계산
+    // 기초데이터가 있으면 재계산 (판매 누적 구간 모드면 구간 판매 기준)
     if (monthData.기초데이터) {
-      return calcWeeksFromBase(monthData.기초데이터, kind, nWeeks);
+      return calcWeeksFromBase(weeksBaseData(monthData), kind, nWeeks);
     }
 
     // 기초데이터가 없으면 기존 값 사용 (하위 호환성)
@@ -0,0 +1,369 @@
+"""
+원본 행 드릴다운 도구
+대시보드 숫자를 원본 CSV 행 단위로 확인 (브랜드 × 중분류 × 소분류 × 월: 행 수, 합계, 분포, 상위 행)
+
+원본 CSV에서 전처리 필터(Channel 2 FRS/OR, 대상 브랜드, 대분류 饰品)를 통과한 행만
+.cache/rows.sqlite에 (입력 종류, 브랜드, 중분류, 소분류, 연월) 인덱스와 함께 저장해 두고 조회하므로,
+한 번 인덱싱한 월은 원본 파일을 다시 읽지 않음 (원본 크기/수정시각이 바뀌면 자동으로 다시 인덱싱,
+원본이 삭제/교체되면 그 파일의 행도 인덱스에서 삭제)
+월 파일이 없는 진행 중인 월은 전처리와 같은 일별/주별 파일(YYYY.MM.DD.csv)을 인덱싱
+
+사용 예:
+    python drilldown.py query --brand MLB --mid Headwear --sub CP --month 2024.03
+    python drilldown.py query --brand MLB --mid Shoes --month 2025.05 --source 대리상재고 --top 20
+    python drilldown.py index --from 2024.01 --to 2025.05
+"""
+
+import argparse
+import itertools
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import preprocess_stock_weeks as psw
+
+
+ROWS_DB_NAME = "rows.sqlite"
+# 원본 행 인덱스 형식 버전 (행 번호 기준이 바뀌면 올려서 기존 인덱스를 다시 만듦)
+ROWS_DB_VERSION = 3
+
+ROWS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_files (
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    rows INTEGER NOT NULL,
+    indexed_at TEXT NOT NULL,
+    PRIMARY KEY (source, name)
+);
+-- 조회 단위(입력 종류, 브랜드, 중분류, 소분류, 연월) 순으로 클러스터링하여 한 조각의 행이 연속으로 저장됨
+CREATE TABLE IF NOT EXISTS raw_rows (
+    source TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    mid_category TEXT NOT NULL,
+    sub_category TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    name TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    amount REAL,
+    PRIMARY KEY (source, brand, mid_category, sub_category, year, month, channel, name, line)
+) WITHOUT ROWID;
+"""
+
+
+def rows_db_path() -> Path:
+    """원본 행 인덱스 파일 경로 (전처리 캐시 폴더 아래)"""
+    return psw.CACHE_DIR / ROWS_DB_NAME
+
+
+def open_rows_db() -> sqlite3.Connection:
+    """원본 행 인덱스 열기 (없으면 생성)"""
+    path = rows_db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != ROWS_DB_VERSION:
+        conn.executescript("DROP TABLE IF EXISTS raw_rows; DROP TABLE IF EXISTS indexed_files;")
+        conn.execute(f"PRAGMA user_version = {ROWS_DB_VERSION}")
+    conn.executescript(ROWS_SCHEMA)
+    return conn
+
+
+def _usecols(kind: str) -> list[str]:
+    """입력 종류 → 읽을 컬럼"""
+    return psw.STOCK_USECOLS if kind == "대리상재고" else psw.SALES_USECOLS
+
+
+def source_files(kind: str, year: int, month: int) -> list[Path]:
+    """
+    입력 종류/연월 → 드릴다운 대상 원본 CSV 목록 (전처리 집계와 같은 기준)
+    - 월 파일(YYYY.MM.csv)이 있으면 월 파일
+    - 없으면 일별/주별 파일(YYYY.MM.DD.csv): 판매매출은 전체(월 누계), 대리상재고는 가장 최근 스냅샷
+    """
+    folder, _, _ = psw._source_loader(kind)
+    month_file = folder / psw.source_file_name(year, month)
+    if month_file.exists():
+        return [month_file]
+    days = psw.discover_days(folder, year, month)
+    if kind == "대리상재고":
+        days = days[-1:]
+    return [folder / psw.source_file_name(year, month, day) for day in days]
+
+
+def _drop_file(conn: sqlite3.Connection, kind: str, name: str):
+    """인덱싱한 원본 파일 하나의 행과 기록 삭제"""
+    conn.execute("DELETE FROM raw_rows WHERE source = ? AND name = ?", (kind, name))
+    conn.execute("DELETE FROM indexed_files WHERE source = ? AND name = ?", (kind, name))
+
+
+def prune_missing(conn: sqlite3.Connection) -> int:
+    """원본 파일이 삭제되었거나 경로가 바뀐 인덱스 항목 삭제, 삭제한 파일 수 반환"""
+    missing = [
+        (kind, name) for kind, name, path in conn.execute("SELECT source, name, path FROM indexed_files")
+        if not Path(path).exists()
+    ]
+    with conn:
+        for kind, name in missing:
+            _drop_file(conn, kind, name)
+    return len(missing)
+
+
+def index_file(conn: sqlite3.Connection, kind: str, year: int, month: int, file_path: Path) -> int:
+    """
+    원본 CSV 한 개를 인덱싱 (전처리 필터를 통과한 행만, 원본 파일명/행 번호 포함)
+
+    Returns:
+        저장한 행 수
+    """
+    usecols = _usecols(kind)
+    stat = file_path.stat()
+    amount_col = usecols[-1]
+    print(f"[인덱싱] {kind}/{file_path.name}")
+    # 데이터 행 위치 → 원본 CSV 행 번호 (빈 줄/따옴표 안 줄바꿈 반영)
+    line_numbers, _ = psw.source_row_locations(file_path)
+
+    with conn:
+        _drop_file(conn, kind, file_path.name)
+
+        offset = 0
+        stored = 0
+        for chunk in psw.iter_source_chunks(file_path, usecols):
+            # 청크 인덱스를 파일 내 행 위치로 맞춘 뒤 필터 (필터 후에도 원본 행 번호 유지)
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            if offset > len(line_numbers):
+                raise ValueError(f"{file_path}: 읽은 행 수({offset:,})가 원본 행 수({len(line_numbers):,})와 다릅니다.")
+
+            filtered = psw._filter_chunk(chunk, amount_col, "amount", None)
+            amounts = filtered["amount"]
+            if not pd.api.types.is_numeric_dtype(amounts):
+                amounts = pd.to_numeric(amounts, errors="coerce")
+            amounts = amounts.astype(float)
+
+            rows = zip(
+                itertools.repeat(kind),
+                filtered["brand"].astype(str).tolist(),
+                # 중분류/소분류가 비어 있는 행은 ""로 저장 (전처리 집계에서는 제외되는 행)
+                filtered["중분류"].astype(object).fillna("").tolist(),
+                filtered["소분류"].astype(object).fillna("").tolist(),
+                itertools.repeat(year),
+                itertools.repeat(month),
+                filtered["channel"].astype(str).tolist(),
+                itertools.repeat(file_path.name),
+                line_numbers[filtered.index.to_numpy()].tolist(),
+                # 숫자로 변환할 수 없는 값은 NULL로 저장
+                amounts.astype(object).where(amounts.notna(), None).tolist(),
+            )
+            conn.executemany("INSERT INTO raw_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            stored += len(filtered)
+        if offset != len(line_numbers):
+            raise ValueError(f"{file_path}: 읽은 행 수({offset:,})가 원본 행 수({len(line_numbers):,})와 다릅니다.")
+
+        conn.execute(
+            "INSERT INTO indexed_files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                kind, file_path.name, str(file_path), year, month,
+                stat.st_size, stat.st_mtime, stored, time.strftime("%Y-%m-%dT%H:%M:%S"),
+            )
+        )
+    return stored
+
+
+def index_month(conn: sqlite3.Connection, kind: str, year: int, month: int) -> int:
+    """
+    한 달의 인덱스를 원본 파일과 맞춤
+    - 더 이상 대상이 아닌 파일(삭제, 월 파일로 대체된 일별/주별 파일, 이전 재고 스냅샷)의 행은 삭제
+    - 인덱싱되지 않았거나 크기/수정시각이 바뀐 파일만 다시 인덱싱
+
+    Returns:
+        인덱싱한 파일 수
+    """
+    files = {file_path.name: file_path for file_path in source_files(kind, year, month)}
+    entries = {
+        name: (path, size, mtime)
+        for name, path, size, mtime in conn.execute(
+            "SELECT name, path, size, mtime FROM indexed_files WHERE source = ? AND year = ? AND month = ?",
+            (kind, year, month)
+        )
+    }
+    with conn:
+        for name in entries.keys() - files.keys():
+            _drop_file(conn, kind, name)
+
+    count = 0
+    for name, file_path in files.items():
+        stat = file_path.stat()
+        if entries.get(name) != (str(file_path), stat.st_size, stat.st_mtime):
+            index_file(conn, kind, year, month, file_path)
+            count += 1
+    return count
+
+
+def ensure_indexed(conn: sqlite3.Connection, kinds: list[str], months: list[tuple[int, int]]) -> int:
+    """원본이 없어진 항목을 지우고, 인덱싱되지 않았거나 바뀐 원본만 인덱싱, 인덱싱한 파일 수 반환"""
+    prune_missing(conn)
+    return sum(index_month(conn, kind, year, month) for kind in kinds for year, month in months)
+
+
+def _slice_filter(
+    kinds: list[str],
+    brand: str,
+    months: list[tuple[int, int]],
+    mid: str | None = None,
+    sub: str | None = None,
+    channel: str | None = None
+) -> tuple[str, list]:
+    """조회 조건 → (WHERE 절, 파라미터)"""
+    conditions = [
+        f"source IN ({', '.join('?' for _ in kinds)})",
+        "brand = ?",
+        f"(year * 100 + month) IN ({', '.join('?' for _ in months)})",
+    ]
+    params: list = list(kinds) + [brand] + [year * 100 + month for year, month in months]
+    for column, value in [("mid_category", mid), ("sub_category", sub), ("channel", channel)]:
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    return " AND ".join(conditions), params
+
+
+def query_drilldown(conn: sqlite3.Connection, *slice_args, top: int = 10) -> dict:
+    """
+    인덱스에서 조각(slice) 조회 (집계/정렬은 SQLite에서 수행하고 금액 분포용 금액만 가져옴)
+
+    Args:
+        slice_args: _slice_filter 인자 (kinds, brand, months, mid, sub, channel)
+
+    Returns:
+        {"summary": 그룹별 행 수/합계/변환불가, "amounts": 금액 배열 (변환불가 제외), "top": 금액 절대값 상위 행}
+    """
+    where, params = _slice_filter(*slice_args)
+    group_cols = ["source", "year", "month", "중분류", "소분류", "channel"]
+
+    summary = pd.DataFrame(
+        conn.execute(
+            "SELECT source, year, month, mid_category, sub_category, channel, "
+            "COUNT(*), TOTAL(amount), COUNT(*) - COUNT(amount) "
+            f"FROM raw_rows WHERE {where} "
+            "GROUP BY source, brand, mid_category, sub_category, year, month, channel",
+            params
+        ).fetchall(),
+        columns=group_cols + ["행수", "합계", "변환불가"],
+    )
+    amounts = np.array(
+        [row[0] for row in conn.execute(f"SELECT amount FROM raw_rows WHERE {where} AND amount IS NOT NULL", params)],
+        dtype=np.float64,
+    )
+    top_rows = pd.DataFrame(
+        conn.execute(
+            "SELECT source, year, month, mid_category, sub_category, channel, name, line, amount "
+            f"FROM raw_rows WHERE {where} ORDER BY ABS(amount) DESC LIMIT ?",
+            params + [top]
+        ).fetchall(),
+        columns=group_cols + ["file", "line", "amount"],
+    )
+    return {"summary": summary, "amounts": amounts, "top": top_rows}
+
+
+def _with_year_month(frame: pd.DataFrame) -> pd.DataFrame:
+    """year/month → 연월 표시 컬럼"""
+    year_month = frame["year"].astype(str) + "." + frame["month"].map("{:02d}".format)
+    return frame.drop(columns=["year", "month"]).assign(연월=year_month)
+
+
+def print_drilldown(result: dict, top: int = 10):
+    """조회 결과 출력: 그룹별 행 수/합계, 금액 분포, 금액 절대값 상위 행"""
+    summary = result["summary"]
+    if summary.empty:
+        print("조건에 맞는 행이 없습니다.")
+        return
+
+    print("=" * 80)
+    print("그룹별 행 수 / 합계 (변환불가: 숫자로 변환할 수 없는 금액, 전처리에서 0으로 처리)")
+    print("=" * 80)
+    summary = _with_year_month(summary)
+    print(
+        summary[["source", "연월", "중분류", "소분류", "channel", "행수", "합계", "변환불가"]]
+        .to_string(index=False, formatters={"합계": "{:,.0f}".format})
+    )
+
+    amounts = result["amounts"]
+    print("\n" + "=" * 80)
+    print(f"금액 분포 (전체 {summary['행수'].sum():,}행)")
+    print("=" * 80)
+    if len(amounts) > 0:
+        for q, value in zip([0, 10, 25, 50, 75, 90, 99, 100], np.percentile(amounts, [0, 10, 25, 50, 75, 90, 99, 100])):
+            print(f"   p{q:<3}: {value:>20,.2f}")
+        print(f"   합계: {amounts.sum():,.0f}원 / 평균: {amounts.mean():,.2f}")
+        print(f"   음수(반품) 행: {(amounts < 0).sum():,} / 개별 이상치(>{psw.MAX_INDIVIDUAL_AMOUNT:,.0f}) 행: "
+              f"{(np.abs(amounts) > psw.MAX_INDIVIDUAL_AMOUNT).sum():,}")
+    print(f"   변환불가 행: {summary['변환불가'].sum():,}")
+
+    print("\n" + "=" * 80)
+    print(f"금액 절대값 상위 {top}행 (file / line: 원본 CSV 파일명 / 행 번호)")
+    print("=" * 80)
+    top_rows = _with_year_month(result["top"])
+    print(
+        top_rows[["source", "연월", "중분류", "소분류", "channel", "file", "line", "amount"]]
+        .to_string(index=False, formatters={"amount": "{:,.2f}".format})
+    )
+
+
+def _month_list(args) -> list[tuple[int, int]]:
+    """--month / --from, --to 옵션 → (연도, 월) 목록"""
+    if args.months:
+        return sorted(set(args.months))
+    return psw.select_month_range(psw.discover_months(), args.from_month, args.to_month)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="원본 행 드릴다운 (브랜드 × 중분류 × 소분류 × 월)")
+    parser.add_argument("--base-path", type=Path, default=None, help="대리상재고/판매매출 폴더가 있는 상위 폴더")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_range_options(sub):
+        sub.add_argument("--month", dest="months", nargs="+", type=psw.parse_year_month, default=None, help="조회할 연월 YYYY.MM (여러 개 가능)")
+        sub.add_argument("--from", dest="from_month", type=psw.parse_year_month, default=None, help="시작 연월 YYYY.MM")
+        sub.add_argument("--to", dest="to_month", type=psw.parse_year_month, default=None, help="종료 연월 YYYY.MM")
+        sub.add_argument("--source", dest="sources", nargs="+", choices=psw.SOURCE_KINDS, default=psw.SOURCE_KINDS, help="입력 종류 (기본값: 전체)")
+
+    index_parser = subparsers.add_parser("index", help="원본 CSV 인덱싱 (신규/변경 파일만)")
+    add_range_options(index_parser)
+
+    query_parser = subparsers.add_parser("query", help="인덱스 조회 (인덱싱되지 않은 월은 먼저 인덱싱)")
+    add_range_options(query_parser)
+    query_parser.add_argument("--brand", required=True, choices=psw.TARGET_BRANDS, help="브랜드")
+    query_parser.add_argument("--mid", default=None, help="중분류 (예: Headwear)")
+    query_parser.add_argument("--sub", default=None, help="소분류 (예: CP)")
+    query_parser.add_argument("--channel", default=None, choices=psw.VALID_CHANNELS, help="Channel 2 (기본값: 전체)")
+    query_parser.add_argument("--top", type=int, default=10, help="금액 절대값 상위 행 수 (기본값: 10)")
+
+    args = parser.parse_args()
+    if args.base_path is not None:
+        psw.configure_paths(args.base_path)
+
+    months = _month_list(args)
+    conn = open_rows_db()
+    try:
+        start = time.perf_counter()
+        indexed = ensure_indexed(conn, args.sources, months)
+        if args.command == "index":
+            print(f"{indexed}개 파일 인덱싱 완료 ({time.perf_counter() - start:.1f}초)")
+        else:
+            query_start = time.perf_counter()
+            result = query_drilldown(
+                conn, args.sources, args.brand, months, args.mid, args.sub, args.channel, top=args.top
+            )
+            print_drilldown(result, args.top)
+            print(f"\n조회 시간: {(time.perf_counter() - query_start) * 1000:.0f}ms")
+    finally:
+        conn.close()
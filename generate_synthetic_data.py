@@ -0,0 +1,165 @@
+"""
+벤치마크/테스트용 합성 월별 CSV 생성 스크립트
+실제 대리상재고 / 판매매출 CSV와 같은 중국어 헤더, Channel 2 값, 브랜드,
+中分类/小分类 구성, 금액 분포를 가진 YYYY.MM.csv 파일을 생성
+
+사용 예:
+    python generate_synthetic_data.py --out D:\\bench\\data --rows 1000000 --start 2025.01 --months 3
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Channel 2 값과 비율 (FRS/OR 외 채널은 전처리에서 제외됨)
+CHANNELS = ["FRS", "OR", "ONLINE", "OUTLET"]
+CHANNEL_WEIGHTS = [0.62, 0.23, 0.10, 0.05]
+
+# 브랜드와 비율 (MLB / MLB KIDS / DISCOVERY 외 브랜드는 전처리에서 제외됨)
+BRANDS = ["MLB", "MLB KIDS", "DISCOVERY", "DUVETICA", "SERGIO TACCHINI"]
+BRAND_WEIGHTS = [0.55, 0.15, 0.20, 0.06, 0.04]
+
+# 대분류 → 중분류 → 소분류 (악세사리 = 饰品, 의류 = 服装)
+CATEGORY_TREE = {
+    "饰品": {
+        "Shoes": ["CV", "RN", "SH", "SX", "SD", "LP", "MU", "WB", "SQ"],
+        "Headwear": ["CP", "BN", "HT", "MC", "SC", "WM", "WR", "CB"],
+        "Bag": ["BG", "BK", "BM", "BQ", "BW", "CR", "HS", "OR", "PO", "HH"],
+        "Acc_etc": ["SO", "GL", "MF", "MK", "JA", "JB", "JC", "JD", "ML", "TW", "ET"],
+    },
+    "服装": {
+        "Top": ["TS", "RS", "MT", "HD", "KT", "PQ"],
+        "Bottom": ["PT", "SP", "DP", "SK", "LG"],
+        "Outer": ["JP", "DJ", "PD", "WJ", "VT"],
+    },
+}
+MAJOR_WEIGHTS = {"饰品": 0.45, "服装": 0.55}
+
+STOCK_AMOUNT_COL = "预计库存金额"
+SALES_AMOUNT_COL = "吊牌金额"
+
+
+def _category_columns(rng: np.random.Generator, n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """대분류 / 중분류 / 소분류 컬럼 생성 (소분류는 중분류에 맞게)"""
+    majors = list(CATEGORY_TREE)
+    major = rng.choice(majors, size=n, p=[MAJOR_WEIGHTS[m] for m in majors])
+    mid = np.empty(n, dtype=object)
+    sub = np.empty(n, dtype=object)
+
+    for major_name, mids in CATEGORY_TREE.items():
+        major_idx = np.flatnonzero(major == major_name)
+        mid_names = list(mids)
+        mid_values = rng.choice(mid_names, size=len(major_idx))
+        mid[major_idx] = mid_values
+        for mid_name, subs in mids.items():
+            mid_idx = major_idx[mid_values == mid_name]
+            # 소분류는 앞쪽 코드일수록 많이 나오도록 (실제 데이터처럼 편중)
+            weights = 1.0 / np.arange(1, len(subs) + 1)
+            sub[mid_idx] = rng.choice(subs, size=len(mid_idx), p=weights / weights.sum())
+
+    return major, mid, sub
+
+
+def _amounts(rng: np.random.Generator, n: int, median: float, malformed_rate: float) -> np.ndarray:
+    """
+    금액 컬럼 생성 (로그정규 분포 + 반품 음수 + 드문 이상치 + 변환 불가 값)
+    """
+    values = np.round(rng.lognormal(mean=np.log(median), sigma=1.1, size=n), 2)
+    values[rng.random(n) < 0.03] *= -1                       # 반품/조정 (음수)
+    values[rng.random(n) < 1e-6] = 12_000_000_000             # 개별 행 임계값 초과 이상치
+
+    out = values.astype(object)
+    malformed = rng.random(n) < malformed_rate
+    out[malformed] = rng.choice(["", "-", "N/A", "1,234.00"], size=int(malformed.sum()))
+    return out
+
+
+def generate_month_file(
+    file_path: Path,
+    kind: str,
+    rows: int,
+    year: int,
+    month: int,
+    seed: int = 0,
+    block_rows: int = 500_000,
+    malformed_rate: float = 0.0005
+):
+    """
+    합성 월별 CSV 하나 생성 (block_rows 단위로 나누어 써서 대용량도 메모리 일정)
+
+    Args:
+        kind: "대리상재고" 또는 "판매매출"
+        rows: 전체 행 수
+    """
+    amount_col = STOCK_AMOUNT_COL if kind == "대리상재고" else SALES_AMOUNT_COL
+    median = 3_000 if kind == "대리상재고" else 450
+    rng = np.random.default_rng([seed, year, month, 0 if kind == "대리상재고" else 1])
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "w", encoding="utf-8-sig", newline="") as f:
+        written = 0
+        while written < rows:
+            n = min(block_rows, rows - written)
+            major, mid, sub = _category_columns(rng, n)
+            # 원본처럼 전처리에 쓰지 않는 컬럼도 함께 기록 (파싱 비용을 실제와 비슷하게)
+            block = pd.DataFrame({
+                "门店编码": rng.integers(10_000, 99_999, size=n),
+                "门店名称": "STORE",
+                "Channel 1": "CN",
+                "Channel 2": rng.choice(CHANNELS, size=n, p=CHANNEL_WEIGHTS),
+                "产品品牌": rng.choice(BRANDS, size=n, p=BRAND_WEIGHTS),
+                "产品大分类": major,
+                "产品中分类": mid,
+                "本地小分类": sub,
+                "产品编码": rng.integers(1_000_000, 9_999_999, size=n),
+                "颜色": rng.choice(["BK", "WH", "NY", "BG", "RD"], size=n),
+                "尺码": rng.choice(["F", "S", "M", "L", "230", "250", "270"], size=n),
+                "年份": year,
+                "季节": rng.choice(["SS", "FW"], size=n),
+                amount_col: _amounts(rng, n, median, malformed_rate),
+            })
+            block.to_csv(f, index=False, header=(written == 0))
+            written += n
+
+
+def generate_dataset(
+    base_path: Path,
+    rows: int,
+    start: tuple[int, int],
+    months: int = 1,
+    seed: int = 0
+) -> list[tuple[int, int]]:
+    """
+    base_path/대리상재고, base_path/판매매출 아래 months개월치 YYYY.MM.csv 생성
+
+    Returns:
+        생성한 (연도, 월) 목록
+    """
+    year, month = start
+    generated = []
+    for _ in range(months):
+        for kind in ["대리상재고", "판매매출"]:
+            generate_month_file(base_path / kind / f"{year}.{month:02d}.csv", kind, rows, year, month, seed)
+        generated.append((year, month))
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return generated
+
+
+if __name__ == "__main__":
+    from preprocess_stock_weeks import parse_year_month
+
+    parser = argparse.ArgumentParser(description="합성 대리상재고/판매매출 CSV 생성")
+    parser.add_argument("--out", type=Path, required=True, help="출력 상위 폴더 (대리상재고/판매매출 폴더가 생성됨)")
+    parser.add_argument("--rows", type=int, default=100_000, help="파일당 행 수 (기본값: 100,000)")
+    parser.add_argument("--start", type=parse_year_month, default=(2025, 1), help="시작 연월 YYYY.MM (기본값: 2025.01)")
+    parser.add_argument("--months", type=int, default=1, help="생성할 개월 수 (기본값: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    for year, month in generate_dataset(args.out, args.rows, args.start, args.months, args.seed):
+        print(f"생성: {year}.{month:02d} (대리상재고/판매매출 각 {args.rows:,}행)")
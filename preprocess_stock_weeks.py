@@ -4,10 +4,48 @@
 """
 
 import pandas as pd
+import numpy as np
 import json
+import hashlib
+import itertools
+import os
+import sqlite3
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import calendar
+import cProfile
+import csv
+import gc
+import time
+import traceback
+import warnings
+from contextlib import contextmanager
+
+# 컬럼형 변환 캐시(Parquet)는 pyarrow가 설치된 경우에만 사용
+# (pyarrow CSV 리더도 설치된 경우에만 사용)
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pc = None
+    pacsv = None
+    pq = None
+
+# 메모리 측정은 psutil이 있으면 사용 (없으면 /proc 또는 resource 모듈)
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
 
 
 # 파일 경로 설정
@@ -21,6 +59,32 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 DATA_DIR = SCRIPT_DIR / "public" / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)  # 폴더가 없으면 생성
 
+# 월별 집계 캐시 경로 설정
+# 집계 큐브(SQLite): 입력 파일 기록 + (연월, 채널, 브랜드, 중분류, 소분류)별 월별 집계
+CACHE_DIR = SCRIPT_DIR / ".cache"
+CUBE_PATH = CACHE_DIR / "cube.sqlite"
+# 필터/집계 로직이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_VERSION = 1
+# 원본 CSV의 필요한 컬럼만 Parquet로 변환해 두는 폴더 (pyarrow 필요)
+COLUMNAR_CACHE_DIR = CACHE_DIR / "columnar"
+USE_COLUMNAR_CACHE = True
+# True이면 로딩 중에 원본 행 사이드카 인덱스(그룹별 행 번호 범위, 이상치 행 번호/바이트 위치)를 저장
+WRITE_SIDECAR_INDEX = False
+SIDECAR_DIR = CACHE_DIR / "sidecar"
+SIDECAR_VERSION = 2
+# pyarrow가 있으면 CSV 파싱에 pyarrow 스트리밍 리더 사용
+USE_PYARROW_CSV = True
+PYARROW_BLOCK_SIZE = 16 << 20  # 16MB 단위로 읽기
+# 지정하면(MB) 스트리밍 수집 모드: 프로세스 RSS가 예산을 넘지 않도록 청크 크기를 조정하고
+# 청크별 집계를 누적하는 대로 합쳐 파일 크기와 관계없이 메모리 사용량을 일정하게 유지 (ChunkBudget 참고)
+MEMORY_BUDGET_MB: int | None = None
+STREAM_MIN_CHUNK_ROWS = 5_000
+STREAM_MAX_CHUNK_ROWS = 1_000_000
+STREAM_CHUNK_SHARE = 0.25      # 청크 하나가 쓸 수 있는 여유 메모리 비율
+STREAM_PARSE_FACTOR = 4        # 원본 1바이트당 파싱 중 메모리 (토큰/버퍼/필터 복사 포함 추정)
+STREAM_IO_BUFFER = 1 << 20     # 1MB 블록 버퍼로 읽기
+STREAM_FOLD_ROWS = 200_000     # 누적된 청크 집계가 이 행 수를 넘으면 하나로 합침
+
 # 분석 대상 브랜드
 TARGET_BRANDS = ["MLB", "MLB KIDS", "DISCOVERY"]
 
@@ -38,681 +102,3159 @@ OR_CATEGORY_MAP = {
 MAX_INDIVIDUAL_AMOUNT = 10_000_000_000   # 개별 행 최대값: 100억원
 MAX_AGGREGATED_AMOUNT = 500_000_000_000  # 집계 합계 최대값: 5,000억원
 
+# 이상치 감지 기준선 (그룹별 직전 월 집계 금액 기준, detect_anomalies 참고)
+ANOMALY_KEYS = ["source", "channel", "brand", "중분류", "소분류"]
+ANOMALY_WINDOW = 6                # 기준선: 직전 6개월
+ANOMALY_MIN_HISTORY = 3           # 기준선 월이 3개월 미만이면 판정하지 않음
+ANOMALY_RATIO = 5.0               # 중앙값 대비 5배 이상 / 1/5 이하
+ANOMALY_Z = 6.0                   # 강건 z-점수 절대값
+ANOMALY_MAD_FLOOR = 0.05          # MAD 하한: 중앙값의 5% (월별 변동이 거의 없는 그룹의 과민 반응 방지)
+ANOMALY_MIN_BASELINE = 1_000_000  # 이보다 작은 금액/차이는 판정하지 않음 (소액 그룹 노이즈)
+ANOMALY_REPORT_NAME = "stock_weeks_anomaly_report.json"
+ANOMALY_REPORT_VERSION = 1
 
-# 월별 일수 계산
-def get_days_in_month(year: int, month: int) -> int:
-    """월별 일수 반환"""
-    return calendar.monthrange(year, month)[1]
+# 로딩 필터 조건
+VALID_CHANNELS = ["FRS", "OR"]
+ACC_MAJOR_CATEGORY = "饰品"
+VALID_MID_CATEGORIES = ["Shoes", "Headwear", "Bag", "Acc_etc"]
 
+# 원본 CSV에서 읽는 컬럼 (금액 컬럼은 마지막)
+STOCK_USECOLS = [
+    "Channel 2",
+    "产品品牌",
+    "产品大分类",
+    "产品中分类",
+    "本地小分类",
+    "预计库存金额",
+]
+SALES_USECOLS = [
+    "Channel 2",
+    "产品品牌",
+    "产品大分类",
+    "产品中分类",
+    "本地小分类",
+    "吊牌金额",
+]
 
-def validate_amount(
-    df: pd.DataFrame,
-    amount_col: str,
-    year: int,
-    month: int,
-    data_type: str,
-    threshold_individual: float = MAX_INDIVIDUAL_AMOUNT,
-    threshold_aggregated: float = MAX_AGGREGATED_AMOUNT
-) -> pd.DataFrame:
+# 입력 파일 스키마 (헤더는 파일마다 한 번, 타입/범주 값은 청크마다 확인)
+# - columns: 필수 컬럼 (check_source_header)
+# - dtypes: 리더가 반환하는 컬럼 타입 ("category": 문자열 범주, "float64": 금액, 다르면 중단 - check_chunk_dtypes)
+# - categories: 집계에 쓰는 범주 값 (파일에 하나도 없으면 경고,
+#   목록 밖 값은 파일별 행 수를 출력하고 대소문자/공백만 다른 값은 따로 경고 - 값 표기가 바뀐 경우 등)
+# - category_scope: 범주 값을 셀 행 조건 (예: 中分类는 饰品 행에서만 세어 의류 中分类를 목록 밖 값으로 보지 않음)
+# - 금액 셀 중 숫자로 변환할 수 없는 셀은 0으로 처리하고 개수를 기록
+_SCHEMA_CATEGORIES = {
+    "Channel 2": VALID_CHANNELS,
+    "产品品牌": TARGET_BRANDS,
+    "产品大分类": [ACC_MAJOR_CATEGORY],
+    "产品中分类": VALID_MID_CATEGORIES,
+}
+_SCHEMA_CATEGORY_SCOPE = {
+    "产品中分类": ("产品大分类", ACC_MAJOR_CATEGORY),
+}
+
+
+def _schema_dtypes(usecols: list[str]) -> dict[str, str]:
+    """필수 컬럼 → 컬럼 타입 (마지막 금액 컬럼은 float64, 나머지는 문자열 범주)"""
+    return {**{col: "category" for col in usecols[:-1]}, usecols[-1]: "float64"}
+
+
+SOURCE_SCHEMAS = {
+    kind: {
+        "columns": usecols,
+        "dtypes": _schema_dtypes(usecols),
+        "categories": _SCHEMA_CATEGORIES,
+        "category_scope": _SCHEMA_CATEGORY_SCOPE,
+    }
+    for kind, usecols in [("대리상재고", STOCK_USECOLS), ("판매매출", SALES_USECOLS)]
+}
+# 스키마 점검 출력에서 컬럼별로 보여 줄 목록 밖 값 수
+SCHEMA_REPORT_TOP = 5
+# 빠른 경로(pyarrow 일괄 변환)로 바로 변환할 수 있는 숫자 형식
+AMOUNT_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+
+def configure_paths(base_path: Path, cache_dir: Path | None = None):
     """
-    금액 데이터 검증 및 이상치 감지 (경고만, 제거 없음)
+    입력 폴더(대리상재고/판매매출)와 캐시 폴더 변경
+    (다른 위치의 데이터로 실행하거나 벤치마크용 합성 데이터를 처리할 때 사용)
     
     Args:
-        df: 검증할 DataFrame
-        amount_col: 금액 컬럼명
-        year: 연도
-        month: 월
-        data_type: 데이터 타입 ("대리상재고", "직영재고", "판매매출")
-        threshold_individual: 개별 행 최대값 임계값
-        threshold_aggregated: 집계 합계 최대값 임계값
-    
-    Returns:
-        df (데이터 변경 없음)
+        base_path: 대리상재고/판매매출 폴더가 있는 상위 폴더
+        cache_dir: 캐시 폴더 (None이면 기존 설정 유지)
     """
-    if df.empty:
-        return df
-    
-    if amount_col in df.columns:
-        # 개별 행 이상치 경고
-        large_rows = df[df[amount_col].abs() > threshold_individual]
-        if len(large_rows) > 0:
-            print(f"\n⚠️  [경고] {year}년 {month}월 {data_type} - 개별 행 이상치 감지(유지됨):")
-            for idx, row in large_rows.iterrows():
-                info_cols = [col for col in df.columns if col not in [amount_col, 'year', 'month']]
-                info = ", ".join([f"{col}={row[col]}" for col in info_cols if col in row])
-                print(f"   - {info}: {amount_col}={row[amount_col]:,.0f}원")
-
-        # 집계 합계 이상치 경고
-        group_cols = [col for col in df.columns if col not in [amount_col, 'year', 'month']]
-        grouped = df.groupby(group_cols, as_index=False)[amount_col].sum()
-        large_groups = grouped[grouped[amount_col].abs() > threshold_aggregated]
-        if len(large_groups) > 0:
-            print(f"\n⚠️  [경고] {year}년 {month}월 {data_type} - 집계 합계 이상치 감지(유지됨):")
-            for idx, row in large_groups.iterrows():
-                info_cols = [col for col in grouped.columns if col not in [amount_col, 'year', 'month']]
-                info = ", ".join([f"{col}={row[col]}" for col in info_cols if col in row])
-                print(f"   - {info}: 집계합계={row[amount_col]:,.0f}원")
+    global BASE_PATH, AGENCY_STOCK_PATH, SALES_PATH
+    global CACHE_DIR, CUBE_PATH, COLUMNAR_CACHE_DIR, SIDECAR_DIR
+    
+    BASE_PATH = Path(base_path)
+    AGENCY_STOCK_PATH = BASE_PATH / "대리상재고"
+    SALES_PATH = BASE_PATH / "판매매출"
+    
+    if cache_dir is not None:
+        CACHE_DIR = Path(cache_dir)
+        CUBE_PATH = CACHE_DIR / "cube.sqlite"
+        COLUMNAR_CACHE_DIR = CACHE_DIR / "columnar"
+        SIDECAR_DIR = CACHE_DIR / "sidecar"
 
-    return df
+
+# 단계별 측정 결과: (단계, 입력 종류, 연도, 월, 브랜드) → 누적 기록
+STAGE_STATS: dict[tuple, dict] = {}
+# 지정하면 주요 단계(로딩/계산/출력)별 cProfile 결과(.prof)를 이 폴더에 저장
+PROFILE_DIR: Path | None = None
+RUN_REPORT_NAME = "stock_weeks_run_report.json"
+RUN_REPORT_VERSION = 2
+
+
+def current_rss() -> int | None:
+    """현재 프로세스 RSS (bytes), 측정할 수 없으면 None"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss() -> int | None:
+    """프로세스 시작 이후 최대 RSS (bytes), 측정할 수 없으면 None"""
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        # Windows는 peak_wset, 그 외는 resource 모듈 사용
+        if hasattr(info, "peak_wset"):
+            return info.peak_wset
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
 
 
-def load_stock_all_from_agency(year: int, month: int, chunk_size: int = 100_000) -> pd.DataFrame:
+def _stage_record(stage: str, source: str | None, year: int | None, month: int | None, brand: str | None) -> dict:
+    """STAGE_STATS에서 단계 기록을 가져오거나 새로 생성"""
+    key = (stage, source, year, month, brand)
+    record = STAGE_STATS.get(key)
+    if record is None:
+        record = STAGE_STATS[key] = {
+            "stage": stage,
+            "source": source,
+            "year": year,
+            "month": month,
+            "brand": brand,
+            "calls": 0,
+            "chunks": 0,
+            "wall_seconds": 0.0,
+            "cpu_seconds": 0.0,
+            "rows_in": 0,
+            "rows_out": 0,
+            "malformed": 0,
+            "out_of_vocab": 0,
+            "start_rss_mb": None,
+            "rss_mb": None,
+            "peak_rss_mb": None,
+            "peak_delta_mb": None,
+        }
+    return record
+
+
+def _memory_mark() -> tuple[int | None, int | None]:
+    """단계 시작 시점의 (현재 RSS, 프로세스 최대 RSS)"""
+    return current_rss(), peak_rss()
+
+
+def _record_memory(record: dict, mark: tuple[int | None, int | None]):
     """
-    대리상재고 파일에서 전체 재고 데이터를 청크 단위로 읽어서 집계
-    (Channel 2 구분 없이 FRS + OR 모두 로딩)
+    mark 이후 구간의 메모리를 단계 기록에 반영 (여러 번 호출하면 최대값 유지)
     
-    필터링 조건:
-    - 产品品牌 in TARGET_BRANDS (MLB, MLB KIDS, DISCOVERY)
-    - 产品大分类 == "饰品" (악세사리)
-    - 产品中分类 in ["Shoes", "Headwear", "Bag", "Acc_etc"] (중분류 4개만)
+    - start_rss_mb / rss_mb: 구간 시작 / 끝 RSS
+    - peak_rss_mb: 구간 중 최대 RSS (시작/끝 RSS, 구간 중 프로세스 최대 RSS가 올랐으면 그 값)
+    - peak_delta_mb: 구간 중 최대 RSS - 시작 RSS (이 단계가 늘린 메모리)
     
-    Returns:
-        집계된 DataFrame: [year, month, channel, brand, 중분류, 소분류, 재고금액]
+    프로세스 최대 RSS(ru_maxrss/peak_wset)는 시작 이후 누적값이라, 구간 중에 올랐을 때만 이 단계의 값으로 사용
     """
-    file_path = AGENCY_STOCK_PATH / f"{year}.{month:02d}.csv"
-    
-    if not file_path.exists():
-        return pd.DataFrame(columns=["year", "month", "channel", "brand", "중분류", "소분류", "재고금액"])
-    
-    usecols = [
-        "Channel 2",
-        "产品品牌",
-        "产品大分类",
-        "产品中分类",
-        "本地小分类",
-        "预计库存金额",
-    ]
+    start_rss, start_peak = mark
+    rss = current_rss()
+    if rss is None:
+        return
+    stage_peak = max(rss, start_rss or 0)
+    peak = peak_rss()
+    if peak is not None and start_peak is not None and peak > start_peak:
+        stage_peak = max(stage_peak, peak)
     
-    chunks: list[pd.DataFrame] = []
+    def update(field: str, value: int):
+        record[field] = max(record[field] or 0, round(value / (1 << 20), 1))
     
-    for chunk in pd.read_csv(
-        file_path,
-        chunksize=chunk_size,
-        encoding="utf-8-sig",
-        usecols=usecols,
-        low_memory=False
-    ):
-        # 1) FRS 또는 OR (Channel 2 필터 제거 → 모두 포함)
-        chunk = chunk[chunk["Channel 2"].isin(["FRS", "OR"])].copy()
-        # 2) 브랜드
-        chunk = chunk[chunk["产品品牌"].isin(TARGET_BRANDS)].copy()
-        # 3) 대분류 = 饰品
-        chunk = chunk[chunk["产品大分类"] == "饰品"].copy()
-        # 4) 중분류 4개
-        valid_mid = ["Shoes", "Headwear", "Bag", "Acc_etc"]
-        chunk = chunk[chunk["产品中分类"].isin(valid_mid)].copy()
-        
-        # 5) 필요한 컬럼만
-        chunk = chunk[["Channel 2", "产品品牌", "产品中分类", "本地小分类", "预计库存金额"]].copy()
-        chunk.columns = ["channel", "brand", "중분류", "소분류", "재고금액"]
-        
-        # 6) 재고금액 숫자 변환 (음수 유지, 상한 제거 없음)
-        chunk["재고금액"] = pd.to_numeric(chunk["재고금액"].astype(str), errors="coerce").fillna(0)
-        
-        # 개별 이상치 경고만 (삭제/수정 없음)
-        large_rows = chunk[chunk["재고금액"].abs() > MAX_INDIVIDUAL_AMOUNT]
-        if len(large_rows) > 0:
-            print(f"\n⚠️  [경고] {year}년 {month:02d}월 전체재고 - 청크 내 개별 행 이상치 감지(유지됨):")
-            for idx, row in large_rows.head(10).iterrows():
-                print(f"   - channel={row['channel']}, brand={row['brand']}, 중분류={row['중분류']}, 소분류={row['소분류']}: {row['재고금액']:,.0f}원")
-        
-        # 7) 그룹 집계
-        chunk_agg = (
-            chunk.groupby(["channel", "brand", "중분류", "소분류"], as_index=False)["재고금액"]
-            .sum()
+    update("rss_mb", rss)
+    update("peak_rss_mb", stage_peak)
+    if start_rss is not None:
+        update("start_rss_mb", start_rss)
+        update("peak_delta_mb", stage_peak - start_rss)
+
+
+def _finish_stage(record: dict, wall_start: float, cpu_start: float, mark: tuple[int | None, int | None]):
+    """단계 종료 시 시간/메모리 누적"""
+    record["calls"] += 1
+    record["wall_seconds"] += time.perf_counter() - wall_start
+    record["cpu_seconds"] += time.process_time() - cpu_start
+    _record_memory(record, mark)
+
+
+@contextmanager
+def track_stage(
+    stage: str,
+    source: str | None = None,
+    year: int | None = None,
+    month: int | None = None,
+    brand: str | None = None,
+    rows_in: int = 0,
+    profile: bool = False
+):
+    """
+    단계 실행 시간(wall/CPU), 입출력 행 수, 메모리 측정
+    같은 키로 여러 번 호출하면(청크별 필터 등) 누적됨
+
+    사용 예:
+        with track_stage("filter", "대리상재고", 2025, 5, rows_in=len(chunk)) as record:
+            chunk = ...
+            record["rows_out"] += len(chunk)
+
+    Args:
+        profile: True이고 PROFILE_DIR이 지정되어 있으면 cProfile 결과를 저장
+    """
+    record = _stage_record(stage, source, year, month, brand)
+    record["rows_in"] += rows_in
+
+    profiler = None
+    if profile and PROFILE_DIR is not None:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 다른 프로파일러가 이미 동작 중이면 건너뜀
+            profiler = None
+
+    mark = _memory_mark()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield record
+    finally:
+        _finish_stage(record, wall_start, cpu_start, mark)
+        if profiler is not None:
+            profiler.disable()
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            name = "_".join(
+                str(part) for part in [stage, source, brand, f"{year}.{month:02d}" if month else year]
+                if part is not None
+            )
+            profiler.dump_stats(PROFILE_DIR / f"{name.replace(' ', '_')}.prof")
+
+
+def track_chunks(chunks, stage: str, source: str, year: int, month: int):
+    """
+    청크 이터레이터를 감싸 청크를 읽는 데 걸린 시간(파일 읽기/파싱)과 청크 수, 행 수를 기록
+    (메모리는 청크를 읽는 구간마다 측정, 청크 사이의 호출 측 처리는 포함하지 않음)
+    """
+    record = _stage_record(stage, source, year, month, None)
+    iterator = iter(chunks)
+    while True:
+        mark = _memory_mark()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            _finish_stage(record, wall_start, cpu_start, mark)
+            return
+        record["wall_seconds"] += time.perf_counter() - wall_start
+        record["cpu_seconds"] += time.process_time() - cpu_start
+        _record_memory(record, mark)
+        record["chunks"] += 1
+        record["rows_out"] += len(chunk)
+        yield chunk
+
+
+def collect_stage_stats(reset: bool = True) -> list[dict]:
+    """측정 기록 목록 반환 (워커 프로세스 → 부모 프로세스 전달용)"""
+    records = [dict(record) for record in STAGE_STATS.values()]
+    if reset:
+        STAGE_STATS.clear()
+    return records
+
+
+def merge_stage_stats(records: list[dict]):
+    """다른 프로세스에서 받은 측정 기록을 STAGE_STATS에 누적"""
+    for incoming in records:
+        record = _stage_record(
+            incoming["stage"], incoming["source"], incoming["year"], incoming["month"], incoming["brand"]
         )
-        chunk_agg["year"] = year
-        chunk_agg["month"] = month
-        
-        chunks.append(chunk_agg)
-        del chunk
-    
-    if not chunks:
-        return pd.DataFrame(columns=["year", "month", "channel", "brand", "중분류", "소분류", "재고금액"])
-    
-    result = pd.concat(chunks, ignore_index=True)
-    result = (
-        result.groupby(["year", "month", "channel", "brand", "중분류", "소분류"], as_index=False)["재고금액"]
-        .sum()
+        for field in ["calls", "chunks", "wall_seconds", "cpu_seconds", "rows_in", "rows_out", "malformed", "out_of_vocab"]:
+            record[field] += incoming[field]
+        for field in ["start_rss_mb", "rss_mb", "peak_rss_mb", "peak_delta_mb"]:
+            if incoming[field] is not None:
+                record[field] = max(record[field] or 0, incoming[field])
+
+
+def build_run_report(started_at: float, wall_seconds: float, args: dict | None = None) -> dict:
+    """
+    STAGE_STATS → 실행 리포트 (단계별 상세 + 단계별 합계)
+    """
+    stages = sorted(
+        collect_stage_stats(reset=False),
+        key=lambda r: (r["year"] or 0, r["month"] or 0, r["source"] or "", r["brand"] or "", r["stage"])
     )
-    
-    # 검증은 channel별로 따로 수행
-    for ch in result["channel"].unique():
-        ch_data = result[result["channel"] == ch].copy()
-        data_type = "대리상재고(FRS)" if ch == "FRS" else "직영재고(OR)"
-        validate_amount(ch_data.drop(columns=["channel"]), "재고금액", year, month, data_type)
-    
-    return result
+    totals: dict[str, dict] = {}
+    for record in stages:
+        total = totals.setdefault(record["stage"], {
+            "calls": 0, "chunks": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "rows_in": 0, "rows_out": 0,
+            "malformed": 0, "out_of_vocab": 0,
+        })
+        for field in total:
+            total[field] += record[field]
+    # 단계별로 가장 많이 늘린 메모리 (합산이 아닌 최대값)
+    for record in stages:
+        if record["peak_delta_mb"] is not None:
+            total = totals[record["stage"]]
+            total["peak_delta_mb"] = max(total.get("peak_delta_mb", 0), record["peak_delta_mb"])
+    for record in stages + list(totals.values()):
+        record["wall_seconds"] = round(record["wall_seconds"], 4)
+        record["cpu_seconds"] = round(record["cpu_seconds"], 4)
 
+    peak = peak_rss()
+    return {
+        "version": RUN_REPORT_VERSION,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started_at)),
+        "wall_seconds": round(wall_seconds, 3),
+        "cpu_seconds": round(time.process_time(), 3),
+        "peak_rss_mb": round(peak / (1 << 20), 1) if peak is not None else None,
+        "args": args or {},
+        "totals": totals,
+        "stages": stages,
+    }
 
-def get_stock_agency(all_stock_df: pd.DataFrame) -> pd.DataFrame:
+
+# 월별 일수 계산
+def get_days_in_month(year: int, month: int) -> int:
+    """월별 일수 반환"""
+    return calendar.monthrange(year, month)[1]
+
+
+def detect_anomalies(
+    aggregates: pd.DataFrame,
+    months: list[tuple[int, int]],
+    window: int = ANOMALY_WINDOW,
+    min_history: int = ANOMALY_MIN_HISTORY,
+    ratio_threshold: float = ANOMALY_RATIO,
+    z_threshold: float = ANOMALY_Z,
+    mad_floor: float = ANOMALY_MAD_FLOOR,
+    min_baseline: float = ANOMALY_MIN_BASELINE
+) -> pd.DataFrame:
     """
-    전체 재고 DataFrame에서 대리상재고(FRS)만 필터링
+    월별 집계 금액을 직전 window개월 기준선(중앙값/MAD)과 비교하여 이상치 감지 (경고만, 제거 없음)
+    
+    (입력 종류, 채널, 브랜드, 중분류, 소분류) × 연월 행렬을 한 번 만들고 전체 그룹을 벡터 연산으로 판정
+    - ratio: 금액 / 직전 중앙값이 ratio_threshold배 이상 또는 1/ratio_threshold배 이하 (10배 잘못 올린 파일 등)
+    - zscore: 강건 z-점수(0.6745 × (금액 - 중앙값) / MAD)의 절대값이 z_threshold 이상
+      (MAD는 |중앙값| × mad_floor 이상으로 보정)
+    - missing: 해당 월 파일은 있는데 직전 기간에 있던 그룹이 빠짐
+    - threshold: 집계 합계가 MAX_AGGREGATED_AMOUNT 초과 (기준선과 무관)
+    ratio/zscore/missing은 기준선 월이 min_history개 이상이고, 비교하는 금액(중앙값/당월 금액/차이)이
+    min_baseline 이상일 때만 판정
     
     Args:
-        all_stock_df: load_stock_all_from_agency()의 결과
+        aggregates: [source, channel, brand, 중분류, 소분류, year, month, amount] (대상 월 + 직전 window개월)
+        months: 검사할 (연도, 월) 목록
     
     Returns:
-        대리상재고 DataFrame: [year, month, brand, 중분류, 소분류, 재고금액]
+        이상치 DataFrame: [source, channel, brand, 중분류, 소분류, year, month, amount,
+        baseline_median, baseline_mad, history_months, ratio, z_score, reasons]
     """
-    if all_stock_df.empty:
-        return pd.DataFrame(columns=["year", "month", "brand", "중분류", "소분류", "재고금액"])
+    columns = ANOMALY_KEYS + ["year", "month", "amount", "baseline_median", "baseline_mad",
+                              "history_months", "ratio", "z_score", "reasons"]
+    if aggregates.empty or not months:
+        return pd.DataFrame(columns=columns)
     
-    frs_df = all_stock_df[all_stock_df["channel"] == "FRS"].copy()
-    frs_df = frs_df.drop(columns=["channel"])
+    # 연월 → 연속 기간 번호 (검사 대상 첫 월의 window개월 전부터)
+    target_periods = np.array(sorted({year * 12 + month - 1 for year, month in months}))
+    first_period = target_periods[0] - window
+    periods = aggregates["year"].to_numpy() * 12 + aggregates["month"].to_numpy() - 1
+    in_range = (periods >= first_period) & (periods <= target_periods[-1])
+    aggregates = aggregates[in_range]
+    periods = periods[in_range] - first_period
+    n_periods = target_periods[-1] - first_period + 1
     
-    return frs_df
+    key_codes, keys = pd.MultiIndex.from_frame(aggregates[ANOMALY_KEYS]).factorize()
+    keys = keys.set_names(ANOMALY_KEYS)
+    matrix = np.full((len(keys), n_periods), np.nan)
+    matrix[key_codes, periods] = aggregates["amount"].to_numpy(dtype=float)
+    absent = np.isnan(matrix)
+    
+    # 입력 파일이 있는 월에 없는 그룹은 0 (파일 자체가 없는 월은 NaN 유지)
+    source_codes, sources = pd.factorize(aggregates["source"])
+    present = np.zeros((len(sources), n_periods), dtype=bool)
+    present[source_codes, periods] = True
+    key_sources = sources.get_indexer(keys.get_level_values("source"))
+    matrix[absent & present[key_sources]] = 0.0
+    
+    # 대상 월마다 직전 window개월: (그룹, 대상 월, window)
+    columns_idx = target_periods - first_period
+    history = np.lib.stride_tricks.sliding_window_view(matrix, window, axis=1)[:, columns_idx - window]
+    current = matrix[:, columns_idx]
+    history_months = (~np.isnan(history)).sum(axis=2)
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 기준선 월이 없는 그룹 (All-NaN slice)
+        median = np.nanmedian(history, axis=2)
+        mad = np.nanmedian(np.abs(history - median[..., None]), axis=2)
+        mad = np.maximum(mad, mad_floor * np.abs(median))
+        ratio = np.where(median > 0, current / median, np.nan)
+        z_score = np.where(mad > 0, 0.6745 * (current - median) / mad, np.nan)
+    
+    has_data = ~np.isnan(current)
+    has_history = has_data & (history_months >= min_history)
+    flags = {
+        "ratio": has_history & ((ratio >= ratio_threshold) | (ratio <= 1 / ratio_threshold))
+                 & (np.maximum(np.abs(current), median) >= min_baseline),
+        "zscore": has_history & (np.abs(z_score) >= z_threshold) & (np.abs(current - median) >= min_baseline),
+        "missing": has_history & absent[:, columns_idx] & (np.abs(median) >= min_baseline),
+        "threshold": has_data & (np.abs(current) > MAX_AGGREGATED_AMOUNT),
+    }
+    flagged = np.logical_or.reduce(list(flags.values()))
+    key_idx, target_idx = np.nonzero(flagged)
+    if len(key_idx) == 0:
+        return pd.DataFrame(columns=columns)
+    
+    result = keys[key_idx].to_frame(index=False)
+    result["year"] = target_periods[target_idx] // 12
+    result["month"] = target_periods[target_idx] % 12 + 1
+    for name, values in [
+        ("amount", current), ("baseline_median", median), ("baseline_mad", mad),
+        ("history_months", history_months), ("ratio", ratio), ("z_score", z_score),
+    ]:
+        result[name] = values[key_idx, target_idx]
+    result["reasons"] = [
+        [name for name, mask in flags.items() if mask[k, t]] for k, t in zip(key_idx, target_idx)
+    ]
+    return result.sort_values(["year", "month"] + ANOMALY_KEYS, ignore_index=True)[columns]
 
 
-def get_stock_or(all_stock_df: pd.DataFrame) -> pd.DataFrame:
+def sample_row_bytes(file_path: Path, sample_size: int = 1 << 20) -> float:
+    """원본 CSV 앞부분 sample_size 바이트로 추정한 행당 바이트 수"""
+    with open(file_path, "rb") as f:
+        sample = f.read(sample_size)
+    return len(sample) / max(sample.count(b"\n"), 1)
+
+
+class ChunkBudget:
     """
-    전체 재고 DataFrame에서 직영재고(OR)만 필터링
+    메모리 예산(프로세스 RSS) 기준 청크 행 수 조정 (스트리밍 수집 모드)
     
-    Args:
-        all_stock_df: load_stock_all_from_agency()의 결과
-    
-    Returns:
-        직영재고 DataFrame: [year, month, brand, 중분류, 소분류, 재고금액]
+    - 최대 청크: 여유 메모리(예산 - 시작 시 RSS)의 STREAM_CHUNK_SHARE를
+      원본 행당 바이트 × STREAM_PARSE_FACTOR로 나눈 행 수
+    - 청크를 처리할 때마다 RSS 확인: 예산의 80% 초과면 절반으로, 50% 미만이면 1.5배로 (최대 청크까지)
+    - 최소 청크(STREAM_MIN_CHUNK_ROWS)로도 예산을 넘으면 MemoryError
+      (OOM으로 강제 종료되기 전에 명확한 오류로 중단)
     """
-    if all_stock_df.empty:
-        return pd.DataFrame(columns=["year", "month", "brand", "중분류", "소분류", "재고금액"])
     
-    or_df = all_stock_df[all_stock_df["channel"] == "OR"].copy()
-    or_df = or_df.drop(columns=["channel"])
+    def __init__(self, file_path: Path, budget_mb: int):
+        self.budget = budget_mb << 20
+        self.row_bytes = sample_row_bytes(file_path)
+        headroom = max(self.budget - (current_rss() or 0), 0)
+        rows = int(headroom * STREAM_CHUNK_SHARE / (self.row_bytes * STREAM_PARSE_FACTOR))
+        self.max_rows = min(max(rows, STREAM_MIN_CHUNK_ROWS), STREAM_MAX_CHUNK_ROWS)
+        self.rows = self.max_rows
     
-    return or_df
+    @property
+    def block_rows(self) -> int:
+        """리더가 한 번에 읽는 행 수 (청크는 이 단위를 rows행까지 모아서 만듦)"""
+        return max(self.max_rows // 4, STREAM_MIN_CHUNK_ROWS)
+    
+    def check(self) -> int:
+        """현재 RSS로 다음 청크 행 수 결정"""
+        rss = current_rss()
+        if rss is None:
+            return self.rows
+        if rss > self.budget:
+            gc.collect()
+            rss = current_rss()
+            if rss > self.budget and self.rows <= STREAM_MIN_CHUNK_ROWS:
+                raise MemoryError(
+                    f"메모리 예산 {self.budget >> 20}MB 초과 (현재 RSS {rss >> 20}MB, "
+                    f"청크 {self.rows:,}행) - --memory-budget을 늘리거나 --workers를 줄이세요."
+                )
+        if rss > self.budget * 0.8:
+            self.rows = max(self.rows // 2, STREAM_MIN_CHUNK_ROWS)
+        elif rss < self.budget * 0.5:
+            self.rows = min(int(self.rows * 1.5), self.max_rows)
+        return self.rows
 
 
-def load_sales_chunked(year: int, month: int) -> pd.DataFrame:
+def _budget_batches(batches, budget: ChunkBudget):
     """
-    판매매출 파일을 청크 단위로 읽어서 집계
+    리더의 작은 배치(block_rows 단위)를 budget이 정한 행 수까지 모아 pa.Table로 반환
+    (배치를 요청받을 때마다 = 이전 청크 처리가 끝났을 때 RSS 확인)
+    """
+    target = budget.check()
+    pending, rows = [], 0
+    for batch in batches:
+        pending.append(batch)
+        rows += batch.num_rows
+        if rows >= target:
+            yield pa.Table.from_batches(pending)
+            pending, rows = [], 0
+            target = budget.check()
+    if pending:
+        yield pa.Table.from_batches(pending)
+
+
+def _fold_partials(partials: list[pd.DataFrame], group_cols: list[str], value_col: str) -> list[pd.DataFrame]:
+    """
+    스트리밍 수집 모드: 누적된 청크 집계가 STREAM_FOLD_ROWS행을 넘으면 하나로 합침
+    (그룹 수는 채널 × 브랜드 × 중분류 × 소분류로 제한되므로 파일 크기와 관계없이 일정)
+    """
+    if MEMORY_BUDGET_MB is None or sum(len(p) for p in partials) <= STREAM_FOLD_ROWS:
+        return partials
+    folded = pd.concat(partials, ignore_index=True).groupby(group_cols, as_index=False)[value_col].sum()
+    return [folded]
+
+
+def _arrow_amounts(column) -> tuple[np.ndarray, int]:
+    """
+    금액 컬럼(pyarrow 문자열) → (float64 배열, 변환 불가 셀 수)
     
-    Returns:
-        집계된 DataFrame: [year, month, brand, channel, 중분류, 소분류, 판매금액]
+    - 빠른 경로: 블록 전체를 pyarrow로 한 번에 float64 변환
+    - 실패하면 숫자 형식(AMOUNT_PATTERN)인 셀은 그대로 일괄 변환하고,
+      나머지 셀만 pd.to_numeric으로 개별 변환 (그래도 안 되면 NaN, 빈 셀은 변환 불가로 세지 않음)
     """
-    file_path = SALES_PATH / f"{year}.{month:02d}.csv"
+    try:
+        return pc.cast(column, pa.float64()).to_numpy(zero_copy_only=False), 0
+    except pa.ArrowInvalid:
+        pass
     
-    if not file_path.exists():
-        return pd.DataFrame()
+    fast = pc.match_substring_regex(column, AMOUNT_PATTERN)
+    amounts = pc.cast(pc.if_else(fast, column, pa.scalar(None, pa.string())), pa.float64())
+    amounts = amounts.to_numpy(zero_copy_only=False)
+    slow = np.flatnonzero(~pc.fill_null(fast, True).to_numpy(zero_copy_only=False))
+    if len(slow) == 0:
+        return amounts, 0
+    parsed = pd.to_numeric(pd.Series(column.take(pa.array(slow)).to_pylist(), dtype=object), errors="coerce")
+    amounts[slow] = parsed.to_numpy(dtype=np.float64)
+    return amounts, int(parsed.isna().sum())
+
+
+def _pandas_amounts(values: pd.Series) -> tuple[pd.Series, int]:
+    """
+    금액 컬럼(pandas) → (float64 Series, 변환 불가 셀 수)
+    파서가 이미 숫자로 읽었으면 그대로 사용하고, 문자열이 섞인 청크만 변환
+    (pyarrow가 있으면 _arrow_amounts와 같은 방식, 없으면 pd.to_numeric)
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(np.float64), 0
+    if pa is not None:
+        amounts, malformed = _arrow_amounts(pa.array(values, type=pa.string(), from_pandas=True))
+        return pd.Series(amounts, index=values.index), malformed
+    parsed = pd.to_numeric(values, errors="coerce")
+    return parsed.astype(np.float64), int((parsed.isna() & values.notna()).sum())
+
+
+def _iter_csv_chunks_pyarrow(
+    file_path: Path,
+    usecols: list[str],
+    budget: ChunkBudget | None = None,
+    stats: dict | None = None
+):
+    """
+    pyarrow 스트리밍 CSV 리더로 청크 반환
+    - 문자열 컬럼은 dictionary(→ pandas categorical)로 읽음
+    - 따옴표 안의 줄바꿈 허용 (newlines_in_values)
+    - 금액 컬럼은 _arrow_amounts로 float64 변환 (변환 불가 셀 수는 stats["malformed"]에 누적)
+    - budget이 있으면 1MB 블록 버퍼 스트림에서 작은 블록으로 읽어 budget이 정한 행 수만큼씩 반환
+    - 끝까지 읽지 않고 중단되어도(호출 측 예외 등) 리더와 스트림을 닫아 파일 핸들이 남지 않음
+      (Windows에서는 열린 파일을 교체/삭제할 수 없으므로 감시 모드에서 중요)
+    """
+    amount_col = usecols[-1]
+    text_cols = usecols[:-1]
+    column_types = {col: pa.dictionary(pa.int32(), pa.string()) for col in text_cols}
+    column_types[amount_col] = pa.string()
     
-    chunks = []
-    chunk_size = 100_000
+    stream = None
+    if budget is None:
+        source, block_size = file_path, PYARROW_BLOCK_SIZE
+    else:
+        source = stream = pa.input_stream(str(file_path), buffer_size=STREAM_IO_BUFFER)
+        block_size = max(int(budget.block_rows * budget.row_bytes), STREAM_IO_BUFFER)
     
-    usecols = [
-        "Channel 2",
-        "产品品牌",
-        "产品大分类",
-        "产品中分类",
-        "本地小分类",
-        "吊牌金额"
-    ]
+    try:
+        reader = pacsv.open_csv(
+            source,
+            read_options=pacsv.ReadOptions(block_size=block_size),
+            # 따옴표 안 줄바꿈이 블록 경계에 걸려도 행이 잘리지 않도록 (pandas 리더와 같은 행 구분)
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=usecols,
+                column_types=column_types,
+                strings_can_be_null=True,
+            ),
+        )
+        with reader:
+            for batch in reader if budget is None else _budget_batches(reader, budget):
+                chunk = batch.to_pandas()
+                chunk[amount_col], malformed = _arrow_amounts(batch.column(amount_col))
+                if stats is not None:
+                    stats["malformed"] += malformed
+                yield chunk[usecols]
+    finally:
+        if stream is not None:
+            stream.close()
+
+
+def _iter_csv_chunks(
+    file_path: Path,
+    usecols: list[str],
+    chunk_size: int = 100_000,
+    budget: ChunkBudget | None = None,
+    stats: dict | None = None
+):
+    """
+    원본 CSV를 청크 단위로 파싱
+    
+    - 필터 컬럼은 categorical로 읽어 문자열 비교/복사 비용 감소
+    - 금액 컬럼은 파서가 바로 숫자로 읽고, 숫자가 아닌 값이 섞인 청크만 개별 변환하여
+      항상 float64로 반환 (변환 불가 셀은 NaN, 개수는 stats["malformed"]에 누적)
+    - pyarrow가 있으면 pyarrow 스트리밍 리더 사용
+    - budget이 있으면 청크마다 budget이 정한 행 수만큼 읽음 (chunk_size 무시)
+    """
+    if pacsv is not None and USE_PYARROW_CSV:
+        yield from _iter_csv_chunks_pyarrow(file_path, usecols, budget, stats)
+        return
     
-    for chunk in pd.read_csv(
-        file_path,
-        chunksize=chunk_size,
-        encoding='utf-8-sig',
+    amount_col = usecols[-1]
+    options = dict(
+        encoding="utf-8-sig",
         usecols=usecols,
+        dtype={col: "category" for col in usecols[:-1]},
         low_memory=False
-    ):
-        # FRS, OR
-        chunk = chunk[chunk["Channel 2"].isin(["FRS", "OR"])].copy()
-        # 브랜드
-        chunk = chunk[chunk["产品品牌"].isin(TARGET_BRANDS)].copy()
-        # 대분류 = 饰品
-        chunk = chunk[chunk["产品大分类"] == "饰品"].copy()
-        
-        chunk = chunk[[
-            "Channel 2",
-            "产品品牌",
-            "产品中分类",
-            "本地小分类",
-            "吊牌金额"
-        ]].copy()
-        
-        chunk.columns = ["channel", "brand", "중분류", "소분류", "판매금액"]
-        
-        # 판매금액 숫자 변환 (음수 허용, 상한 제거 없음)
-        chunk["판매금액"] = pd.to_numeric(chunk["판매금액"].astype(str), errors='coerce').fillna(0)
-        
-        # 이상치 경고만
-        large_rows = chunk[chunk["판매금액"].abs() > MAX_INDIVIDUAL_AMOUNT]
-        if len(large_rows) > 0:
-            print(f"\n⚠️  [경고] {year}년 {month:02d}월 판매매출 - 청크 내 개별 행 이상치 감지(유지됨):")
-            for idx, row in large_rows.head(10).iterrows():
-                print(f"   - channel={row['channel']}, brand={row['brand']}, 중분류={row['중분류']}, 소분류={row['소분류']}: {row['판매금액']:,.0f}원")
-        
-        chunk_agg = chunk.groupby(["channel", "brand", "중분류", "소분류"], as_index=False)["판매금액"].sum()
-        chunk_agg["year"] = year
-        chunk_agg["month"] = month
-        
-        chunks.append(chunk_agg)
-        del chunk
+    )
     
-    if not chunks:
-        return pd.DataFrame(columns=["year", "month", "channel", "brand", "중분류", "소분류", "판매금액"])
+    def parsed(chunks):
+        for chunk in chunks:
+            chunk[amount_col], malformed = _pandas_amounts(chunk[amount_col])
+            if stats is not None:
+                stats["malformed"] += malformed
+            yield chunk
     
-    result = pd.concat(chunks, ignore_index=True)
-    result = result.groupby(
-        ["year", "month", "channel", "brand", "중분류", "소분류"],
-        as_index=False
-    )["판매금액"].sum()
+    if budget is None:
+        yield from parsed(pd.read_csv(file_path, chunksize=chunk_size, **options))
+        return
     
-    # 최종 검증 (경고만)
-    result_check = result.copy()
-    result_check["판매금액_abs"] = result_check["판매금액"].abs()
-    result_check = validate_amount(result_check, "판매금액_abs", year, month, "판매매출")
-    del result_check
+    def budget_chunks(reader):
+        while True:
+            try:
+                yield reader.get_chunk(budget.check())
+            except StopIteration:
+                return
     
-    return result
+    with open(file_path, "rb", buffering=STREAM_IO_BUFFER) as f, pd.read_csv(f, iterator=True, **options) as reader:
+        yield from parsed(budget_chunks(reader))
 
 
-def compute_stock_weeks(
-    stock_agency: pd.DataFrame,
-    stock_or: pd.DataFrame,
-    sales: pd.DataFrame,
-    n_weeks: int = 25
-) -> pd.DataFrame:
+def _parse_amount(amounts: pd.Series) -> pd.Series:
     """
-    재고주수 계산
+    금액 컬럼 → float64 (변환 불가 값은 0)
+    리더가 이미 float64로 변환하므로 보통은 빈 셀/변환 불가 셀(NaN)만 0으로 채움
+    """
+    if not pd.api.types.is_numeric_dtype(amounts):
+        amounts = pd.to_numeric(amounts, errors="coerce")
+    return amounts.astype(np.float64).fillna(0)
+
+
+def _filter_chunk(chunk: pd.DataFrame, amount_col: str, value_name: str, mid_categories: list[str] | None) -> pd.DataFrame:
     """
-    sales_frs = sales[sales["channel"] == "FRS"].copy()
-    sales_or = sales[sales["channel"] == "OR"].copy()
+    청크 필터링 (조건을 하나의 마스크로 결합한 뒤 한 번만 복사)
+    금액 컬럼 숫자 변환은 호출 측에서 _parse_amount로 수행
     
-    if not sales_frs.empty:
-        sales_frs = sales_frs.groupby(
-            ["year", "month", "brand", "중분류", "소분류"],
-            as_index=False
-        )["판매금액"].sum()
-    if not sales_or.empty:
-        sales_or = sales_or.groupby(
-            ["year", "month", "brand", "중분류", "소분류"],
-            as_index=False
-        )["판매금액"].sum()
+    - Channel 2 in VALID_CHANNELS
+    - 产品品牌 in TARGET_BRANDS
+    - 产品大分类 == ACC_MAJOR_CATEGORY
+    - 产品中分类 in mid_categories (None이면 중분류 필터 없음)
     
-    all_keys = set()
-    for df in [stock_agency, stock_or, sales_frs, sales_or]:
-        if not df.empty:
-            all_keys.update(df[["year", "month", "brand", "중분류", "소분류"]].apply(tuple, axis=1))
+    Returns:
+        [channel, brand, 중분류, 소분류, value_name]
+    """
+    mask = (
+        chunk["Channel 2"].isin(VALID_CHANNELS).to_numpy()
+        & chunk["产品品牌"].isin(TARGET_BRANDS).to_numpy()
+        & (chunk["产品大分类"] == ACC_MAJOR_CATEGORY).to_numpy()
+    )
+    if mid_categories is not None:
+        mask &= chunk["产品中分类"].isin(mid_categories).to_numpy()
     
-    if not all_keys:
-        return pd.DataFrame(columns=[
-            "year", "month", "brand", "중분류", "소분류",
-            "전체재고주수", "대리상재고주수", "창고재고주수"
-        ])
+    filtered = chunk.loc[mask, ["Channel 2", "产品品牌", "产品中分类", "本地小分类", amount_col]]
+    filtered.columns = ["channel", "brand", "중분류", "소분류", value_name]
+    return filtered
+
+
+def convert_to_columnar(
+    file_path: Path,
+    usecols: list[str],
+    chunk_size: int = 100_000,
+    budget: ChunkBudget | None = None
+) -> Path | None:
+    """
+    원본 CSV의 usecols 컬럼만 타입이 지정된 Parquet 파일로 변환 (최초 1회)
     
-    key_cols = ["year", "month", "brand", "중분류", "소분류"]
-    merged = pd.DataFrame(list(all_keys), columns=key_cols)
+    - 문자열 컬럼은 dictionary 인코딩, 금액 컬럼(usecols 마지막)은 float64
+      (숫자로 변환할 수 없는 값은 null로 저장하고 그 개수를 메타데이터 malformed에 기록)
+    - 원본 크기/수정시각을 Parquet 메타데이터에 기록하여 원본이 바뀌면 다시 변환
     
-    if not stock_agency.empty:
-        merged = merged.merge(
-            stock_agency[key_cols + ["재고금액"]],
-            on=key_cols,
-            how="left"
-        ).rename(columns={"재고금액": "agency_stock"})
-    else:
-        merged["agency_stock"] = 0
+    Returns:
+        Parquet 파일 경로 (pyarrow가 없거나 캐시 사용 안 함이면 None)
+    """
+    if pq is None or not USE_COLUMNAR_CACHE:
+        return None
     
-    if not stock_or.empty:
-        merged = merged.merge(
-            stock_or[key_cols + ["재고금액"]],
-            on=key_cols,
-            how="left"
-        ).rename(columns={"재고금액": "or_stock"})
-    else:
-        merged["or_stock"] = 0
-    
-    if not sales_frs.empty:
-        merged = merged.merge(
-            sales_frs[key_cols + ["판매금액"]],
-            on=key_cols,
-            how="left"
-        ).rename(columns={"판매금액": "frs_sales"})
-    else:
-        merged["frs_sales"] = 0
-    
-    if not sales_or.empty:
-        merged = merged.merge(
-            sales_or[key_cols + ["판매금액"]],
-            on=key_cols,
-            how="left"
-        ).rename(columns={"판매금액": "or_sales"})
-    else:
-        merged["or_sales"] = 0
+    target = COLUMNAR_CACHE_DIR / file_path.parent.name / f"{file_path.stem}.parquet"
+    stat = file_path.stat()
+    source_meta = {
+        b"source": str(file_path).encode("utf-8"),
+        b"source_size": str(stat.st_size).encode(),
+        b"source_mtime": repr(stat.st_mtime).encode(),
+    }
     
-    merged = merged.fillna(0)
+    if target.exists():
+        cached_schema = pq.read_schema(target)
+        cached_meta = pq.read_metadata(target).metadata or {}
+        if (
+            all(cached_meta.get(k) == v for k, v in source_meta.items())
+            and set(usecols) <= set(cached_schema.names)
+            and b"malformed" in cached_meta
+        ):
+            return target
     
-    results = []
-    for _, row in merged.iterrows():
-        year = int(row["year"])
-        month = int(row["month"])
-        brand = row["brand"]
-        중분류 = row["중분류"]
-        소분류 = row["소분류"]
-        
-        agency_stock = float(row["agency_stock"])
-        or_stock = float(row["or_stock"])
-        frs_sales = float(row["frs_sales"])
-        or_sales = float(row["or_sales"])
-        
-        days_in_month = get_days_in_month(year, month)
-        
-        total_stock = agency_stock + or_stock
-        total_sales = frs_sales + or_sales
-        
-        전체재고주수 = None
-        대리상재고주수 = None
-        창고재고주수 = None
-        
-        if total_sales == 0 or pd.isna(total_sales):
-            전체재고주수 = "판매0"
-        else:
-            weekly_sales = (total_sales / days_in_month) * 7
-            if weekly_sales != 0:
-                전체재고주수 = round(total_stock / weekly_sales, 2)
-            else:
-                전체재고주수 = "판매0"
-        
-        if frs_sales == 0 or pd.isna(frs_sales):
-            대리상재고주수 = "판매0"
-        else:
-            frs_weekly_sales = (frs_sales / days_in_month) * 7
-            if frs_weekly_sales != 0:
-                대리상재고주수 = round(agency_stock / frs_weekly_sales, 2)
-            else:
-                대리상재고주수 = "판매0"
-        
-        if or_sales == 0 or pd.isna(or_sales):
-            or_weekly_sales = 0
-        else:
-            or_weekly_sales = (or_sales / days_in_month) * 7
-        
-        직영판매예정재고 = or_weekly_sales * n_weeks
-        창고재고 = or_stock - 직영판매예정재고
-        
-        if total_sales == 0 or pd.isna(total_sales):
-            창고재고주수 = "판매0"
-        else:
-            weekly_sales = (total_sales / days_in_month) * 7
-            if weekly_sales != 0:
-                창고재고주수 = round(창고재고 / weekly_sales, 2)
-            else:
-                창고재고주수 = "판매0"
-        
-        results.append({
-            "year": year,
-            "month": month,
-            "brand": brand,
-            "중분류": 중분류,
-            "소분류": 소분류,
-            "전체재고주수": 전체재고주수,
-            "대리상재고주수": 대리상재고주수,
-            "창고재고주수": 창고재고주수,
-            "월일수": days_in_month,
-            "전체재고금액": total_stock,
-            "대리상재고금액": agency_stock,
-            "직영재고금액": or_stock,
-            "전체판매금액": total_sales,
-            "대리상판매금액": frs_sales,
-            "직영판매금액": or_sales
-        })
+    print(f"[컬럼형 변환] {file_path.parent.name}/{file_path.name} → Parquet")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(".parquet.tmp")
+    
+    amount_col = usecols[-1]
+    text_cols = usecols[:-1]
+    schema = pa.schema(
+        [pa.field(col, pa.dictionary(pa.int32(), pa.string())) for col in text_cols]
+        + [pa.field(amount_col, pa.float64())],
+        metadata=source_meta,
+    )
+    
+    stats = {"malformed": 0}
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for chunk in _iter_csv_chunks(file_path, usecols, chunk_size, budget, stats):
+            for col in text_cols:
+                chunk[col] = chunk[col].astype("category")
+            writer.write_table(pa.Table.from_pandas(chunk[usecols], schema=schema, preserve_index=False))
+        writer.add_key_value_metadata({b"malformed": str(stats["malformed"]).encode()})
     
-    return pd.DataFrame(results)
+    os.replace(tmp_path, target)
+    return target
 
 
-def preprocess_all(brand: str, n_weeks: int = 25) -> pd.DataFrame:
+def check_source_header(file_path: Path, usecols: list[str]):
     """
-    전체 전처리 프로세스 실행
+    입력 파일 헤더(첫 줄)에 필요한 컬럼이 모두 있는지 확인
+    (본문을 읽기 전에 파일마다 한 번 확인하여 컬럼명 변경/누락을 바로 알림)
     """
-    if brand not in TARGET_BRANDS:
-        raise ValueError(f"브랜드는 {TARGET_BRANDS} 중 하나여야 합니다.")
-    
-    years = set()
-    months = set()
-    
-    # 대리상재고 폴더에서 파일 목록 수집
-    for file_path in AGENCY_STOCK_PATH.glob("*.csv"):
-        try:
-            parts = file_path.stem.split(".")
-            if len(parts) == 2:
-                year = int(parts[0])
-                month = int(parts[1])
-                years.add(year)
-                months.add((year, month))
-        except:
-            continue
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+        header = next(csv.reader(f), [])
+    missing = [col for col in usecols if col not in header]
+    if missing:
+        raise ValueError(
+            f"[스키마] {file_path.parent.name}/{file_path.name}: 필수 컬럼이 없습니다 {missing} (파일 컬럼: {header})"
+        )
+
+
+def iter_source_chunks(file_path: Path, usecols: list[str], chunk_size: int = 100_000, stats: dict | None = None):
+    """
+    원본 월별 CSV를 청크 단위로 반환
+    컬럼형 캐시를 사용할 수 있으면 Parquet에서, 아니면 CSV에서 직접 읽음
+    (MEMORY_BUDGET_MB가 지정되어 있으면 청크 크기를 메모리 예산에 맞춰 조정)
     
-    # 판매매출 폴더에서 파일 목록 수집
-    for file_path in SALES_PATH.glob("*.csv"):
-        try:
-            parts = file_path.stem.split(".")
-            if len(parts) == 2:
-                year = int(parts[0])
-                month = int(parts[1])
-                years.add(year)
-                months.add((year, month))
-        except:
-            continue
+    금액 컬럼은 항상 float64 (변환 불가 셀은 NaN), stats를 넘기면 변환 불가 셀 수를 stats["malformed"]에 누적
+    """
+    check_source_header(file_path, usecols)
+    budget = ChunkBudget(file_path, MEMORY_BUDGET_MB) if MEMORY_BUDGET_MB is not None else None
+    columnar_path = convert_to_columnar(file_path, usecols, chunk_size, budget)
     
-    all_results = []
+    if columnar_path is not None:
+        parquet_file = pq.ParquetFile(columnar_path)
+        if stats is not None:
+            stats["malformed"] += int(parquet_file.metadata.metadata[b"malformed"])
+        if budget is None:
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=usecols):
+                yield batch.to_pandas()
+        else:
+            batches = parquet_file.iter_batches(batch_size=budget.block_rows, columns=usecols)
+            for table in _budget_batches(batches, budget):
+                yield table.to_pandas()
+        return
     
-    for year, month in sorted(months):
-        print(f"처리 중: {year}년 {month}월 - {brand}")
-        
-        # 대리상재고 CSV에서 전체 재고 로딩 (FRS + OR)
-        all_stock = load_stock_all_from_agency(year, month)
-        
-        # Channel 2 기준으로 분리
-        stock_agency = get_stock_agency(all_stock)
-        stock_or = get_stock_or(all_stock)
+    yield from _iter_csv_chunks(file_path, usecols, chunk_size, budget, stats)
+
+
+def check_chunk_dtypes(kind: str, file_path: Path, chunk: pd.DataFrame):
+    """
+    리더가 반환한 청크의 컬럼 타입이 스키마 dtypes와 같은지 확인 (다르면 ValueError)
+    문자열 범주 컬럼은 범주 값이 문자열이어야 함 (값이 모두 빈 청크는 통과)
+    """
+    wrong = {}
+    for col, dtype in SOURCE_SCHEMAS[kind]["dtypes"].items():
+        actual = chunk[col].dtype
+        if dtype == "category":
+            matches = isinstance(actual, pd.CategoricalDtype) and (
+                len(actual.categories) == 0 or pd.api.types.is_string_dtype(actual.categories.dtype)
+            )
+        else:
+            matches = actual == np.dtype(dtype)
+        if not matches:
+            wrong[col] = f"{actual} (스키마: {dtype})"
+    if wrong:
+        raise ValueError(f"[스키마] {file_path.parent.name}/{file_path.name}: 컬럼 타입이 스키마와 다릅니다 {wrong}")
+
+
+def _observe_categories(seen: dict[str, Counter], chunk: pd.DataFrame, kind: str):
+    """청크의 스키마 범주 컬럼 값별 행 수 누적 (category_scope가 있는 컬럼은 조건에 맞는 행만)"""
+    schema = SOURCE_SCHEMAS[kind]
+    for col in schema["categories"]:
+        values = chunk[col]
+        scope = schema["category_scope"].get(col)
+        if scope is not None:
+            scope_col, scope_value = scope
+            values = values[(chunk[scope_col] == scope_value).to_numpy()]
+        counts = values.value_counts(sort=False)
+        counter = seen.setdefault(col, Counter())
+        for value, count in zip(counts.index.tolist(), counts.tolist()):
+            if count:
+                counter[value] += count
+
+
+def _fold_category(value) -> str:
+    """범주 값 비교용 표기 정규화 (대소문자, 앞뒤/연속 공백 무시)"""
+    return " ".join(str(value).split()).casefold()
+
+
+def report_source_schema(kind: str, file_path: Path, year: int, month: int, stats: dict, seen: dict[str, Counter]):
+    """
+    파일 하나의 스키마 점검 결과 출력 + 실행 리포트(parse 단계의 malformed, out_of_vocab)에 기록
+    - 금액 변환 불가 셀 수 (0으로 처리됨)
+    - 집계에 쓰는 범주 값 중 파일에 하나도 없는 값
+    - 목록 밖 범주 값별 행 수 (집계에서 제외됨), 그중 대소문자/공백만 다른 값(표기 변경 의심)은 경고
+    """
+    record = _stage_record("parse", kind, year, month, None)
+    record["malformed"] += stats["malformed"]
+    name = f"{kind}/{file_path.name}"
+    if stats["malformed"]:
+        print(f"\n⚠️  [스키마] {name} - 금액 변환 불가 셀 {stats['malformed']:,}개 (0으로 처리)")
+    
+    outside_lines = []
+    for col, allowed in SOURCE_SCHEMAS[kind]["categories"].items():
+        counts = seen.get(col, Counter())
+        absent = [value for value in allowed if not counts.get(value)]
+        if absent:
+            print(f"⚠️  [스키마] {name} - {col} 값이 없습니다: {absent}")
         
-        # 판매매출 로딩
-        sales = load_sales_chunked(year, month)
+        outside = {value: count for value, count in counts.items() if value not in allowed}
+        if not outside:
+            continue
+        record["out_of_vocab"] += sum(outside.values())
+        
+        folded = {_fold_category(value): value for value in allowed}
+        variants = {value: count for value, count in outside.items() if _fold_category(value) in folded}
+        if variants:
+            shown = ", ".join(
+                f"{value!r}→{folded[_fold_category(value)]} {count:,}행" for value, count in variants.items()
+            )
+            print(f"⚠️  [스키마] {name} - {col} 표기가 다른 값 (집계에서 제외됨): {shown}")
+        
+        others = sorted(
+            ((value, count) for value, count in outside.items() if value not in variants),
+            key=lambda item: -item[1]
+        )
+        if others:
+            shown = ", ".join(f"{value} {count:,}행" for value, count in others[:SCHEMA_REPORT_TOP])
+            more = f" 외 {len(others) - SCHEMA_REPORT_TOP}종" if len(others) > SCHEMA_REPORT_TOP else ""
+            outside_lines.append(
+                f"   - {col}: {len(others)}종 {sum(count for _, count in others):,}행 ({shown}{more})"
+            )
+    
+    if outside_lines:
+        print(f"[스키마] {name} - 목록 밖 범주 값 (집계 제외):")
+        for line in outside_lines:
+            print(line)
+
+
+def _decategorize(df: pd.DataFrame) -> pd.DataFrame:
+    """범주형(categorical) 컬럼을 일반 문자열 컬럼으로 변환 (청크 간 concat/병합용)"""
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+    return df
+
+
+def _with_row_numbers(chunks):
+    """청크 인덱스를 원본 파일 내 데이터 행 위치(0부터)로 설정 (필터 후에도 원본 행 위치 유지)"""
+    offset = 0
+    for chunk in chunks:
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+
+def source_row_locations(file_path: Path, block_size: int = 1 << 22) -> tuple[np.ndarray, np.ndarray]:
+    """
+    원본 CSV 데이터 행 위치(0부터, 리더가 반환하는 행 순서) → (물리 행 번호, 행 시작 바이트 위치)
+    
+    블록 단위로 줄바꿈을 세어 파서와 같은 기준으로 행을 나눔
+    - 따옴표 안의 줄바꿈은 행 구분으로 보지 않음 (값 안에 줄바꿈이 있어도 다음 행 번호가 밀리지 않음)
+    - 빈 줄/공백만 있는 줄은 파서(pandas skip_blank_lines, pyarrow ignore_empty_lines)와 같이 행으로 세지 않음
+    - 비어 있지 않은 첫 행은 헤더 (앞의 UTF-8 BOM 제외)
+    
+    Returns:
+        (행 번호 배열, 바이트 위치 배열), 길이는 데이터 행 수
+    """
+    whitespace = b" \t\r\n"
+    starts, lines = [], []
+    record_start, record_line = 0, 1  # 현재 행의 시작 바이트 위치/행 번호
+    record_blank = True               # 이전 블록까지 읽은 현재 행 앞부분이 모두 공백인지 (블록 경계에 걸친 행용)
+    position = quotes = newlines = 0
+    
+    with open(file_path, "rb") as f:
+        # UTF-8 BOM은 파서와 같이 내용으로 보지 않음
+        if f.read(3) == b"\xef\xbb\xbf":
+            position = record_start = 3
+        else:
+            f.seek(0)
+        for block in iter(lambda: f.read(block_size), b""):
+            data = np.frombuffer(block, dtype=np.uint8)
+            newline_idx = np.flatnonzero(data == 10)
+            quote_idx = np.flatnonzero(data == 34)
+            # 행 끝 = 따옴표 밖(앞선 따옴표 수가 짝수)의 줄바꿈
+            ends = (quotes + np.searchsorted(quote_idx, newline_idx)) % 2 == 0
+            end_idx = newline_idx[ends]
+            
+            if len(end_idx):
+                next_lines = newlines + np.flatnonzero(ends) + 2  # 줄바꿈 다음 행 번호
+                local_starts = np.concatenate([[0], end_idx[:-1] + 1])
+                # 빈 줄 후보(길이 0이거나 공백으로 시작하는 행, 이전 블록에서 시작한 행)만 실제 내용 확인
+                maybe_blank = (local_starts == end_idx) | np.isin(data[np.minimum(local_starts, len(data) - 1)], list(whitespace))
+                maybe_blank[0] = True
+                non_blank = np.ones(len(end_idx), dtype=bool)
+                for i in np.flatnonzero(maybe_blank):
+                    blank_head = record_blank if i == 0 else True
+                    non_blank[i] = not (blank_head and not block[local_starts[i]:end_idx[i]].strip(whitespace))
+                
+                record_starts = np.concatenate([[record_start], position + local_starts[1:]])
+                record_lines = np.concatenate([[record_line], next_lines[:-1]])
+                starts.append(record_starts[non_blank])
+                lines.append(record_lines[non_blank])
+                
+                record_start = position + int(end_idx[-1]) + 1
+                record_line = int(next_lines[-1])
+                record_blank = not block[int(end_idx[-1]) + 1:].strip(whitespace)
+            else:
+                record_blank = record_blank and not block.strip(whitespace)
+            
+            position += len(block)
+            quotes += len(quote_idx)
+            newlines += len(newline_idx)
+    
+    # 줄바꿈 없이 끝나는 마지막 행
+    if record_start < position and not record_blank:
+        starts.append(np.array([record_start]))
+        lines.append(np.array([record_line]))
+    
+    if not starts:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+    # 첫 행(헤더) 제외
+    return np.concatenate(lines)[1:].astype(np.int64), np.concatenate(starts)[1:].astype(np.int64)
+
+
+def _new_sidecar(file_path: Path, kind: str, year: int, month: int, day: int | None = None) -> dict:
+    """원본 행 사이드카 인덱스 초기화"""
+    stat = file_path.stat()
+    return {
+        "version": SIDECAR_VERSION,
+        "source": str(file_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "kind": kind,
+        "year": year,
+        "month": month,
+        "day": day,
+        "rows": 0,
+        "chunks": [],
+        "groups": {},
+        "flagged": [],
+    }
+
+
+def _sidecar_add_chunk(sidecar: dict, chunk_rows: int, filtered: pd.DataFrame, value_name: str, flagged: pd.DataFrame):
+    """
+    청크 하나의 정보를 사이드카에 추가 (*_row: 데이터 행 위치, 원본 행 번호 *_line은 write_sidecar에서 채움)
+    - chunks: 청크별 시작 행과 행 수
+    - groups: (브랜드, 중분류, 소분류)별 행 수 / 금액 합계 / 첫·마지막 행 / 포함 청크 번호
+    - flagged: 개별 이상치 행 (행, 값)
+    """
+    chunk_id = len(sidecar["chunks"])
+    sidecar["chunks"].append({"first_row": sidecar["rows"], "rows": chunk_rows})
+    sidecar["rows"] += chunk_rows
+    
+    if not filtered.empty:
+        positions = filtered.assign(_position=filtered.index.to_numpy())
+        grouped = positions.groupby(["brand", "중분류", "소분류"], observed=True).agg(
+            rows=(value_name, "size"),
+            amount=(value_name, "sum"),
+            first=("_position", "min"),
+            last=("_position", "max"),
+        )
+        groups = sidecar["groups"]
+        for (brand, mid, sub), rows, amount, first, last in zip(
+            grouped.index, grouped["rows"], grouped["amount"], grouped["first"], grouped["last"]
+        ):
+            key = f"{brand}|{mid}|{sub}"
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    "brand": brand, "중분류": mid, "소분류": sub,
+                    "rows": 0, "amount": 0.0,
+                    "first_row": int(first), "last_row": 0, "chunks": [],
+                }
+            group["rows"] += int(rows)
+            group["amount"] += float(amount)
+            group["last_row"] = int(last)
+            group["chunks"].append(chunk_id)
+    
+    for position, row in zip(flagged.index, flagged.itertuples(index=False)):
+        sidecar["flagged"].append({
+            "row": int(position),
+            "channel": row.channel,
+            "brand": row.brand,
+            "중분류": row.중분류,
+            "소분류": row.소분류,
+            "amount": float(getattr(row, value_name)),
+        })
+
+
+def sidecar_path(kind: str, year: int, month: int, day: int | None = None) -> Path:
+    """원본 파일별 사이드카 인덱스 경로"""
+    return SIDECAR_DIR / kind / Path(source_file_name(year, month, day)).with_suffix(".json")
+
+
+def write_sidecar(sidecar: dict):
+    """
+    기록해 둔 데이터 행 위치를 원본 CSV 행 번호/바이트 위치로 바꾼 뒤 사이드카 인덱스 저장
+    (원본을 한 번 더 훑어 행 경계를 찾음, 파서가 읽은 행 수와 다르면 행 번호/바이트 위치는 null)
+    """
+    lines, offsets = source_row_locations(Path(sidecar["source"]))
+    if len(lines) != sidecar["rows"]:
+        print(
+            f"⚠️  [사이드카] {sidecar['source']}: 원본 행 수({len(lines):,})가 읽은 행 수({sidecar['rows']:,})와 달라 "
+            f"행 번호를 기록하지 않습니다."
+        )
+        lines = offsets = None
+    
+    def line_of(position: int) -> int | None:
+        return int(lines[position]) if lines is not None else None
+    
+    for chunk in sidecar["chunks"]:
+        chunk["first_line"] = line_of(chunk["first_row"])
+    for group in sidecar["groups"].values():
+        group["first_line"] = line_of(group["first_row"])
+        group["last_line"] = line_of(group["last_row"])
+    for row in sidecar["flagged"]:
+        row["line"] = line_of(row["row"])
+        row["byte_offset"] = int(offsets[row["row"]]) if offsets is not None else None
+    sidecar["groups"] = list(sidecar["groups"].values())
+    
+    path = sidecar_path(sidecar["kind"], sidecar["year"], sidecar["month"], sidecar["day"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(path, sidecar, compact=True)
+
+
+def source_file_name(year: int, month: int, day: int | None = None) -> str:
+    """입력 파일명: 월 파일 YYYY.MM.csv, 일별/주별 파일 YYYY.MM.DD.csv"""
+    if day is None:
+        return f"{year}.{month:02d}.csv"
+    return f"{year}.{month:02d}.{day:02d}.csv"
+
+
+def discover_days(folder: Path, year: int, month: int) -> list[int]:
+    """
+    입력 폴더에서 해당 월의 일별/주별 파일(YYYY.MM.DD.csv) 날짜 목록 (오름차순)
+    
+    - 판매매출: 직전 파일 다음 날부터 파일 날짜까지의 판매 (일별이면 그날, 주별이면 그 주)
+    - 대리상재고: 파일 날짜 기준 재고 스냅샷
+    """
+    days = set()
+    for file_path in folder.glob(f"{year}.{month:02d}.*.csv"):
+        parts = file_path.stem.split(".")
+        if len(parts) == 3 and parts[2].isdigit() and 1 <= int(parts[2]) <= get_days_in_month(year, month):
+            days.add(int(parts[2]))
+    return sorted(days)
+
+
+def load_stock_all_from_agency(year: int, month: int, chunk_size: int = 100_000, day: int | None = None) -> pd.DataFrame:
+    """
+    대리상재고 파일에서 전체 재고 데이터를 청크 단위로 읽어서 집계
+    (Channel 2 구분 없이 FRS + OR 모두 로딩)
+    
+    day를 지정하면 일별/주별 파일(YYYY.MM.DD.csv) 하나만 집계
+    월 파일이 없으면 가장 최근 일별/주별 파일의 재고를 월 재고로 사용 (재고는 스냅샷이므로 합산하지 않음)
+    
+    필터링 조건:
+    - Channel 2 in VALID_CHANNELS (FRS, OR)
+    - 产品品牌 in TARGET_BRANDS (MLB, MLB KIDS, DISCOVERY)
+    - 产品大分类 == "饰品" (악세사리)
+    - 产品中分类 in VALID_MID_CATEGORIES (중분류 4개만)
+    
+    Returns:
+        집계된 DataFrame: [year, month, channel, brand, 중분류, 소분류, 재고금액]
+    """
+    file_path = AGENCY_STOCK_PATH / source_file_name(year, month, day)
+    
+    if not file_path.exists():
+        days = discover_days(AGENCY_STOCK_PATH, year, month) if day is None else []
+        if days:
+            return load_stock_all_from_agency(year, month, chunk_size, day=days[-1])
+        return pd.DataFrame(columns=["year", "month", "channel", "brand", "중분류", "소분류", "재고금액"])
+    
+    chunks: list[pd.DataFrame] = []
+    
+    source = "대리상재고"
+    stats, seen = {"malformed": 0}, {}
+    chunk_iter = track_chunks(iter_source_chunks(file_path, STOCK_USECOLS, chunk_size, stats), "read", source, year, month)
+    sidecar = _new_sidecar(file_path, source, year, month, day) if WRITE_SIDECAR_INDEX else None
+    for chunk in _with_row_numbers(chunk_iter):
+        chunk_rows = len(chunk)
+        check_chunk_dtypes(source, file_path, chunk)
+        _observe_categories(seen, chunk, source)
+        # 1) FRS/OR + 브랜드 + 대분류(饰品) + 중분류 4개 필터를 한 번에 적용
+        with track_stage("filter", source, year, month, rows_in=len(chunk)) as record:
+            chunk = _filter_chunk(chunk, "预计库存金额", "재고금액", VALID_MID_CATEGORIES)
+            record["rows_out"] += len(chunk)
+        
+        # 2) 재고금액 숫자 변환 (음수 유지, 상한 제거 없음)
+        with track_stage("parse", source, year, month, rows_in=len(chunk)) as record:
+            chunk["재고금액"] = _parse_amount(chunk["재고금액"])
+            record["rows_out"] += len(chunk)
         
-        # 브랜드 필터링
-        if not stock_agency.empty:
-            stock_agency = stock_agency[stock_agency["brand"] == brand].copy()
-        if not stock_or.empty:
-            stock_or = stock_or[stock_or["brand"] == brand].copy()
-        if not sales.empty:
-            sales = sales[sales["brand"] == brand].copy()
+        # 개별 이상치 행은 사이드카에만 기록 (삭제/수정 없음, 집계 단위 이상치는 이상치 리포트)
+        if sidecar is not None:
+            large_rows = chunk[chunk["재고금액"].abs() > MAX_INDIVIDUAL_AMOUNT]
+            _sidecar_add_chunk(sidecar, chunk_rows, chunk, "재고금액", large_rows)
         
-        # 재고주수 계산
-        result = compute_stock_weeks(stock_agency, stock_or, sales, n_weeks)
+        # 3) 그룹 집계
+        with track_stage("chunk_groupby", source, year, month, rows_in=len(chunk)) as record:
+            chunk_agg = (
+                chunk.groupby(["channel", "brand", "중분류", "소분류"], as_index=False, observed=True)["재고금액"]
+                .sum()
+            )
+            chunk_agg = _decategorize(chunk_agg)
+            record["rows_out"] += len(chunk_agg)
+        chunk_agg["year"] = year
+        chunk_agg["month"] = month
         
+        chunks.append(chunk_agg)
+        chunks = _fold_partials(chunks, ["year", "month", "channel", "brand", "중분류", "소분류"], "재고금액")
+        del chunk
+    
+    if sidecar is not None:
+        write_sidecar(sidecar)
+    report_source_schema(source, file_path, year, month, stats, seen)
+    
+    if not chunks:
+        return pd.DataFrame(columns=["year", "month", "channel", "brand", "중분류", "소분류", "재고금액"])
+    
+    with track_stage("final_groupby", source, year, month, rows_in=sum(len(c) for c in chunks)) as record:
+        result = pd.concat(chunks, ignore_index=True)
+        result = (
+            result.groupby(["year", "month", "channel", "brand", "중분류", "소분류"], as_index=False, observed=True)["재고금액"]
+            .sum()
+        )
+        record["rows_out"] += len(result)
+    
+    return result
+
+
+def get_stock_agency(all_stock_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    전체 재고 DataFrame에서 대리상재고(FRS)만 필터링
+    
+    Args:
+        all_stock_df: load_stock_all_from_agency()의 결과
+    
+    Returns:
+        대리상재고 DataFrame: [year, month, brand, 중분류, 소분류, 재고금액]
+    """
+    if all_stock_df.empty:
+        return pd.DataFrame(columns=["year", "month", "brand", "중분류", "소분류", "재고금액"])
+    
+    frs_df = all_stock_df[all_stock_df["channel"] == "FRS"].copy()
+    frs_df = frs_df.drop(columns=["channel"])
+    
+    return frs_df
+
+
+def get_stock_or(all_stock_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    전체 재고 DataFrame에서 직영재고(OR)만 필터링
+    
+    Args:
+        all_stock_df: load_stock_all_from_agency()의 결과
+    
+    Returns:
+        직영재고 DataFrame: [year, month, brand, 중분류, 소분류, 재고금액]
+    """
+    if all_stock_df.empty:
+        return pd.DataFrame(columns=["year", "month", "brand", "중분류", "소분류", "재고금액"])
+    
+    or_df = all_stock_df[all_stock_df["channel"] == "OR"].copy()
+    or_df = or_df.drop(columns=["channel"])
+    
+    return or_df
+
+
+def load_sales_chunked(year: int, month: int, day: int | None = None) -> pd.DataFrame:
+    """
+    판매매출 파일을 청크 단위로 읽어서 집계
+    
+    day를 지정하면 일별/주별 파일(YYYY.MM.DD.csv) 하나만 집계
+    월 파일이 없으면 해당 월의 일별/주별 파일을 모두 집계하여 합산 (월 누계)
+    
+    Returns:
+        집계된 DataFrame: [year, month, brand, channel, 중분류, 소분류, 판매금액]
+    """
+    file_path = SALES_PATH / source_file_name(year, month, day)
+    
+    if not file_path.exists():
+        days = discover_days(SALES_PATH, year, month) if day is None else []
+        if days:
+            result = pd.concat([load_sales_chunked(year, month, d) for d in days], ignore_index=True)
+            return result.groupby(
+                ["year", "month", "channel", "brand", "중분류", "소분류"],
+                as_index=False,
+                observed=True
+            )["판매금액"].sum()
+        return pd.DataFrame(columns=["year", "month", "channel", "brand", "중분류", "소분류", "판매금액"])
+    
+    chunks = []
+    chunk_size = 100_000
+    
+    source = "판매매출"
+    stats, seen = {"malformed": 0}, {}
+    chunk_iter = track_chunks(iter_source_chunks(file_path, SALES_USECOLS, chunk_size, stats), "read", source, year, month)
+    sidecar = _new_sidecar(file_path, source, year, month, day) if WRITE_SIDECAR_INDEX else None
+    for chunk in _with_row_numbers(chunk_iter):
+        chunk_rows = len(chunk)
+        check_chunk_dtypes(source, file_path, chunk)
+        _observe_categories(seen, chunk, source)
+        # FRS/OR + 브랜드 + 대분류(饰品) 필터를 한 번에 적용 (판매는 중분류 필터 없음)
+        with track_stage("filter", source, year, month, rows_in=len(chunk)) as record:
+            chunk = _filter_chunk(chunk, "吊牌金额", "판매금액", None)
+            record["rows_out"] += len(chunk)
+        
+        # 판매금액 숫자 변환 (음수 허용, 상한 제거 없음)
+        with track_stage("parse", source, year, month, rows_in=len(chunk)) as record:
+            chunk["판매금액"] = _parse_amount(chunk["판매금액"])
+            record["rows_out"] += len(chunk)
+        
+        # 개별 이상치 행은 사이드카에만 기록 (삭제/수정 없음, 집계 단위 이상치는 이상치 리포트)
+        if sidecar is not None:
+            large_rows = chunk[chunk["판매금액"].abs() > MAX_INDIVIDUAL_AMOUNT]
+            _sidecar_add_chunk(sidecar, chunk_rows, chunk, "판매금액", large_rows)
+        
+        with track_stage("chunk_groupby", source, year, month, rows_in=len(chunk)) as record:
+            chunk_agg = chunk.groupby(["channel", "brand", "중분류", "소분류"], as_index=False, observed=True)["판매금액"].sum()
+            chunk_agg = _decategorize(chunk_agg)
+            record["rows_out"] += len(chunk_agg)
+        chunk_agg["year"] = year
+        chunk_agg["month"] = month
+        
+        chunks.append(chunk_agg)
+        chunks = _fold_partials(chunks, ["year", "month", "channel", "brand", "중분류", "소분류"], "판매금액")
+        del chunk
+    
+    if sidecar is not None:
+        write_sidecar(sidecar)
+    report_source_schema(source, file_path, year, month, stats, seen)
+    
+    if not chunks:
+        return pd.DataFrame(columns=["year", "month", "channel", "brand", "중분류", "소분류", "판매금액"])
+    
+    with track_stage("final_groupby", source, year, month, rows_in=sum(len(c) for c in chunks)) as record:
+        result = pd.concat(chunks, ignore_index=True)
+        result = result.groupby(
+            ["year", "month", "channel", "brand", "중분류", "소분류"],
+            as_index=False,
+            observed=True
+        )["판매금액"].sum()
+        record["rows_out"] += len(result)
+    
+    return result
+
+
+def file_sha256(file_path: Path, block_size: int = 1 << 20) -> str:
+    """파일 내용 해시 (블록 단위로 읽어 메모리 사용 최소화)"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_signature() -> dict:
+    """캐시가 유효하려면 일치해야 하는 집계 조건"""
+    return {"version": CACHE_VERSION, "brands": TARGET_BRANDS}
+
+
+# 입력 종류별 (폴더, 월별 집계 함수, 금액 컬럼명)
+SOURCE_KINDS = ["대리상재고", "판매매출"]
+
+
+def _source_loader(kind: str):
+    """입력 종류 → (입력 폴더, 월별 집계 함수, 집계 금액 컬럼명)"""
+    if kind == "대리상재고":
+        return AGENCY_STOCK_PATH, load_stock_all_from_agency, "재고금액"
+    if kind == "판매매출":
+        return SALES_PATH, load_sales_chunked, "판매금액"
+    raise ValueError(f"입력 종류는 {SOURCE_KINDS} 중 하나여야 합니다: {kind}")
+
+
+CUBE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source_files (
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    loaded_at TEXT NOT NULL,
+    PRIMARY KEY (source, name)
+);
+CREATE TABLE IF NOT EXISTS aggregates (
+    source TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    mid_category TEXT NOT NULL,
+    sub_category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (source, year, month, channel, brand, mid_category, sub_category)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_aggregates_brand_month ON aggregates (brand, year, month);
+CREATE TABLE IF NOT EXISTS daily_aggregates (
+    source TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    mid_category TEXT NOT NULL,
+    sub_category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (source, year, month, day, channel, brand, mid_category, sub_category)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sales_window (
+    span INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    brand TEXT NOT NULL,
+    mid_category TEXT NOT NULL,
+    sub_category TEXT NOT NULL,
+    frs_cents INTEGER NOT NULL,
+    or_cents INTEGER NOT NULL,
+    PRIMARY KEY (span, year, month, brand, mid_category, sub_category)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sales_window_months (
+    span INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    months INTEGER NOT NULL,
+    days INTEGER NOT NULL,
+    PRIMARY KEY (span, year, month)
+);
+"""
+
+
+def open_cube(path: Path | None = None) -> sqlite3.Connection:
+    """
+    월별 집계 큐브(SQLite) 열기
+    집계 조건(_cache_signature)이 달라졌으면 기존 집계를 모두 삭제 → 전체 재집계
+    """
+    path = Path(path) if path is not None else CUBE_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(CUBE_SCHEMA)
+    
+    signature = json.dumps(_cache_signature(), ensure_ascii=False, sort_keys=True)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+    if row is None or row[0] != signature:
+        if row is not None:
+            print("[캐시] 집계 조건이 변경되어 집계 큐브를 다시 생성합니다.")
+        with conn:
+            conn.execute("DELETE FROM aggregates")
+            conn.execute("DELETE FROM daily_aggregates")
+            conn.execute("DELETE FROM source_files")
+            conn.execute("DELETE FROM sales_window")
+            conn.execute("DELETE FROM sales_window_months")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (signature,))
+    return conn
+
+
+def stale_sources(
+    conn: sqlite3.Connection,
+    months: list[tuple[int, int]],
+    kinds: list[str] = SOURCE_KINDS
+) -> list[tuple[str, int, int]]:
+    """
+    큐브에 반영되지 않았거나 바뀐 입력 파일 목록 (입력 종류, 연도, 월)
+    
+    - 크기/수정시각이 같으면 최신
+    - 수정시각만 바뀌었으면 내용 해시를 비교하여 같으면 수정시각만 갱신
+    - 원본 파일이 없어진 월은 큐브에서 삭제
+    """
+    stale = []
+    for kind in kinds:
+        folder, _, _ = _source_loader(kind)
+        for year, month in months:
+            file_path = folder / source_file_name(year, month)
+            
+            if not file_path.exists():
+                entry = conn.execute(
+                    "SELECT 1 FROM source_files WHERE source = ? AND name = ?", (kind, file_path.name)
+                ).fetchone()
+                if entry is not None:
+                    with conn:
+                        _delete_month(conn, kind, year, month)
+                continue
+            
+            if not _source_file_current(conn, kind, file_path):
+                stale.append((kind, year, month))
+    return stale
+
+
+def _source_file_current(conn: sqlite3.Connection, kind: str, file_path: Path) -> bool:
+    """
+    입력 파일 하나가 큐브에 반영된 그대로인지 확인
+    (크기/수정시각이 같으면 최신, 수정시각만 바뀌었으면 내용 해시가 같을 때 수정시각만 갱신)
+    """
+    entry = conn.execute(
+        "SELECT path, size, mtime, sha256 FROM source_files WHERE source = ? AND name = ?",
+        (kind, file_path.name)
+    ).fetchone()
+    
+    stat = file_path.stat()
+    if entry is None or entry[0] != str(file_path) or entry[1] != stat.st_size:
+        return False
+    if entry[2] == stat.st_mtime:
+        return True
+    # 수정시각만 바뀐 경우 (복사/재업로드) 내용이 같으면 재사용
+    if file_sha256(file_path) == entry[3]:
+        with conn:
+            conn.execute(
+                "UPDATE source_files SET mtime = ? WHERE source = ? AND name = ?",
+                (stat.st_mtime, kind, file_path.name)
+            )
+        return True
+    return False
+
+
+def _recorded_days(conn: sqlite3.Connection, kind: str, year: int, month: int) -> set[int]:
+    """큐브에 반영된 해당 월의 일별/주별 파일 날짜"""
+    names = conn.execute(
+        "SELECT name FROM source_files WHERE source = ? AND year = ? AND month = ? AND name != ?",
+        (kind, year, month, source_file_name(year, month))
+    ).fetchall()
+    return {int(name.split(".")[2]) for (name,) in names}
+
+
+def stale_day_files(
+    conn: sqlite3.Connection,
+    months: list[tuple[int, int]],
+    kinds: list[str] = SOURCE_KINDS
+) -> tuple[list[tuple[str, int, int, int]], list[tuple[str, int, int, int]]]:
+    """
+    월 파일이 아직 없는 (진행 중인) 월의 일별/주별 파일 중
+    큐브에 반영되지 않았거나 바뀐 파일과, 반영된 뒤 없어진 파일
+    (월 파일이 있는 월은 월 파일이 우선이므로 일별/주별 파일을 보지 않음)
+    
+    Returns:
+        (stale, removed): 각각 (입력 종류, 연도, 월, 일) 목록
+    """
+    stale, removed = [], []
+    for kind in kinds:
+        folder, _, _ = _source_loader(kind)
+        for year, month in months:
+            if (folder / source_file_name(year, month)).exists():
+                continue
+            days = discover_days(folder, year, month)
+            for day in days:
+                if not _source_file_current(conn, kind, folder / source_file_name(year, month, day)):
+                    stale.append((kind, year, month, day))
+            for day in sorted(_recorded_days(conn, kind, year, month) - set(days)):
+                removed.append((kind, year, month, day))
+    return stale, removed
+
+
+def _invalidate_sales_window(conn: sqlite3.Connection, year: int, month: int):
+    """이 월을 포함하는 판매 누적 구간(sales_window) 삭제 → 다음 조회 때 다시 계산"""
+    period = year * 12 + month - 1
+    for table in ["sales_window", "sales_window_months"]:
+        conn.execute(
+            f"DELETE FROM {table} WHERE year * 12 + month - 1 - ? BETWEEN 0 AND span - 1",
+            (period,)
+        )
+
+
+def _delete_month(conn: sqlite3.Connection, kind: str, year: int, month: int):
+    """
+    큐브에서 한 입력 파일(종류, 연월)의 집계와 파일 기록 삭제
+    (판매매출이면 이 월을 포함하는 판매 누적 구간(sales_window)도 삭제 → 다음 조회 때 다시 계산)
+    
+    해당 월의 일별/주별 파일 집계와 기록도 함께 삭제 (월 파일이 우선,
+    월 파일이 다시 없어지면 일별/주별 파일을 처음부터 다시 반영)
+    """
+    conn.execute("DELETE FROM aggregates WHERE source = ? AND year = ? AND month = ?", (kind, year, month))
+    conn.execute("DELETE FROM daily_aggregates WHERE source = ? AND year = ? AND month = ?", (kind, year, month))
+    conn.execute("DELETE FROM source_files WHERE source = ? AND year = ? AND month = ?", (kind, year, month))
+    if kind == "판매매출":
+        _invalidate_sales_window(conn, year, month)
+
+
+def load_source_aggregate(kind: str, year: int, month: int, day: int | None = None) -> tuple[pd.DataFrame, dict]:
+    """
+    입력 파일 하나를 집계하고 파일 기록(크기/수정시각/해시)과 함께 반환
+    (프로세스 풀에서 실행 가능, 큐브 쓰기는 부모 프로세스에서 수행, day를 지정하면 일별/주별 파일)
+    """
+    folder, loader, _ = _source_loader(kind)
+    file_path = folder / source_file_name(year, month, day)
+    stat = file_path.stat()
+    
+    label = f"{year}년 {month}월" if day is None else f"{year}년 {month}월 {day}일"
+    print(f"[캐시] {kind} {label} - 신규/변경 파일 집계")
+    with track_stage("load", kind, year, month, profile=True) as record:
+        result = loader(year, month, day=day)
+        record["rows_out"] += len(result)
+    
+    entry = {
+        "path": str(file_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": file_sha256(file_path),
+    }
+    return result, entry
+
+
+def _aggregate_rows(kind: str, year: int, month: int, result: pd.DataFrame, day: int | None = None):
+    """집계 결과 → 큐브 행 (day를 지정하면 daily_aggregates 행)"""
+    _, _, value_col = _source_loader(kind)
+    keys = [itertools.repeat(kind), itertools.repeat(year), itertools.repeat(month)]
+    if day is not None:
+        keys.append(itertools.repeat(day))
+    return zip(
+        *keys,
+        result["channel"].tolist(),
+        result["brand"].tolist(),
+        result["중분류"].tolist(),
+        result["소분류"].tolist(),
+        result[value_col].astype(float).tolist(),
+    )
+
+
+def _insert_source_file(conn: sqlite3.Connection, kind: str, name: str, year: int, month: int, rows: int, entry: dict):
+    """입력 파일 기록 추가"""
+    conn.execute(
+        "INSERT INTO source_files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            kind, name, entry["path"], year, month,
+            entry["size"], entry["mtime"], entry["sha256"], rows,
+            time.strftime("%Y-%m-%dT%H:%M:%S"),
+        )
+    )
+
+
+def write_source_aggregate(conn: sqlite3.Connection, kind: str, year: int, month: int, result: pd.DataFrame, entry: dict):
+    """월별 집계 결과로 큐브의 해당 (입력 종류, 연월)을 교체 (한 트랜잭션)"""
+    with track_stage("cube_write", kind, year, month, rows_in=len(result)), conn:
+        _delete_month(conn, kind, year, month)
+        conn.executemany("INSERT INTO aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _aggregate_rows(kind, year, month, result))
+        _insert_source_file(conn, kind, source_file_name(year, month), year, month, len(result), entry)
+
+
+def write_day_aggregates(
+    conn: sqlite3.Connection,
+    kind: str,
+    year: int,
+    month: int,
+    loaded: list[tuple[int, pd.DataFrame, dict]],
+    removed: list[int]
+):
+    """
+    일별/주별 파일 집계를 진행 중인 월에 반영 (한 트랜잭션)
+    
+    - daily_aggregates: 파일(날짜)별 집계를 추가만 함 (바뀐 파일은 그 날짜만 교체, 없어진 파일은 삭제)
+    - 판매매출: 새 날짜만 추가되었으면 그 날짜 집계를 월 누계(aggregates)에 더함 (새 파일 행 수에 비례)
+      기존 날짜가 바뀌거나 없어졌으면 daily_aggregates에서 월 누계를 다시 합산 (CSV는 다시 읽지 않음)
+    - 대리상재고: 재고는 스냅샷이므로 월 재고를 가장 최근 날짜의 집계로 교체
+    
+    Args:
+        loaded: [(일, 집계 결과, 파일 기록)] 신규/변경 파일
+        removed: 없어진 파일의 날짜
+    """
+    recorded = _recorded_days(conn, kind, year, month)
+    appended = not removed and all(day not in recorded for day, _, _ in loaded)
+    latest = max((recorded - set(removed)) | {day for day, _, _ in loaded}, default=None)
+    month_key = (kind, year, month)
+    
+    with track_stage("cube_write", kind, year, month, rows_in=sum(len(result) for _, result, _ in loaded)), conn:
+        for day in removed + [day for day, _, _ in loaded]:
+            conn.execute(
+                "DELETE FROM daily_aggregates WHERE source = ? AND year = ? AND month = ? AND day = ?", month_key + (day,)
+            )
+            conn.execute("DELETE FROM source_files WHERE source = ? AND name = ?", (kind, source_file_name(year, month, day)))
+        for day, result, entry in loaded:
+            conn.executemany(
+                "INSERT INTO daily_aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                _aggregate_rows(kind, year, month, result, day)
+            )
+            _insert_source_file(conn, kind, source_file_name(year, month, day), year, month, len(result), entry)
+        
+        if kind == "판매매출" and appended:
+            for _, result, _ in loaded:
+                conn.executemany(
+                    """
+                    INSERT INTO aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (source, year, month, channel, brand, mid_category, sub_category)
+                    DO UPDATE SET amount = amount + excluded.amount
+                    """,
+                    _aggregate_rows(kind, year, month, result)
+                )
+        else:
+            conn.execute("DELETE FROM aggregates WHERE source = ? AND year = ? AND month = ?", month_key)
+            if kind == "판매매출":
+                conn.execute(
+                    """
+                    INSERT INTO aggregates
+                    SELECT source, year, month, channel, brand, mid_category, sub_category, SUM(amount)
+                    FROM daily_aggregates WHERE source = ? AND year = ? AND month = ?
+                    GROUP BY channel, brand, mid_category, sub_category
+                    """,
+                    month_key
+                )
+            elif latest is not None:
+                conn.execute(
+                    """
+                    INSERT INTO aggregates
+                    SELECT source, year, month, channel, brand, mid_category, sub_category, amount
+                    FROM daily_aggregates WHERE source = ? AND year = ? AND month = ? AND day = ?
+                    """,
+                    month_key + (latest,)
+                )
+        
+        if kind == "판매매출":
+            _invalidate_sales_window(conn, year, month)
+
+
+def _load_source_task(task: tuple) -> tuple[pd.DataFrame, dict, list[dict]]:
+    """프로세스 풀 작업 단위: 입력 파일 하나 집계 (단계별 측정 기록도 함께 반환)"""
+    kind, year, month, day = task
+    STAGE_STATS.clear()
+    result, entry = load_source_aggregate(kind, year, month, day)
+    return result, entry, collect_stage_stats()
+
+
+def refresh_cube(
+    conn: sqlite3.Connection,
+    months: list[tuple[int, int]],
+    workers: int = 1,
+    kinds: list[str] = SOURCE_KINDS
+) -> int:
+    """
+    신규/변경된 입력 파일만 집계하여 큐브에 반영
+    
+    월 파일(YYYY.MM.csv)이 없는 진행 중인 월은 일별/주별 파일(YYYY.MM.DD.csv) 중
+    새로 들어오거나 바뀐 파일만 읽어 월 누계에 반영 (write_day_aggregates 참고)
+    
+    Args:
+        workers: 2 이상이면 파일별 집계를 프로세스 풀에서 병렬 실행 (큐브 쓰기는 이 프로세스에서)
+        kinds: 확인할 입력 종류 (기본값: 전체)
+    
+    Returns:
+        다시 집계한 파일 수
+    """
+    stale_days, removed_days = stale_day_files(conn, months, kinds)
+    tasks = [(kind, year, month, None) for kind, year, month in stale_sources(conn, months, kinds)] + stale_days
+    
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(_worker_settings(),)
+        ) as executor:
+            loaded = []
+            for task, (result, entry, stage_stats) in zip(tasks, executor.map(_load_source_task, tasks)):
+                merge_stage_stats(stage_stats)
+                loaded.append((task, result, entry))
+    else:
+        loaded = ((task, *load_source_aggregate(*task)) for task in tasks)
+    
+    # 일별/주별 파일은 월 단위로 모아서 한 번에 반영
+    day_files: dict[tuple[str, int, int], tuple[list, list]] = {}
+    for kind, year, month, day in removed_days:
+        day_files.setdefault((kind, year, month), ([], []))[1].append(day)
+    for (kind, year, month, day), result, entry in loaded:
+        if day is None:
+            write_source_aggregate(conn, kind, year, month, result, entry)
+        else:
+            day_files.setdefault((kind, year, month), ([], []))[0].append((day, result, entry))
+    for (kind, year, month), (month_loaded, removed) in sorted(day_files.items()):
+        write_day_aggregates(conn, kind, year, month, month_loaded, removed)
+    
+    return len(tasks)
+
+
+def sales_window_lookback(
+    months: list[tuple[int, int]],
+    span: int,
+    available: list[tuple[int, int]]
+) -> list[tuple[int, int]]:
+    """
+    판매 누적 구간(직전 span개월)에 필요하지만 months에 없는 월 (available 중에서)
+    """
+    periods = {year * 12 + month - 1 for year, month in months}
+    return [
+        (year, month) for year, month in available
+        if (year, month) not in set(months)
+        and any(0 < p - (year * 12 + month - 1) < span for p in periods)
+    ]
+
+
+# 월별 판매 집계 → 정수 센트 (누적 구간 합계를 더하고 빼도 오차가 쌓이지 않도록)
+_SALES_CENTS = """
+    SELECT brand, mid_category, sub_category,
+           CASE WHEN channel = 'FRS' THEN CAST(ROUND(amount * 100) AS INTEGER) ELSE 0 END AS frs_cents,
+           CASE WHEN channel = 'OR' THEN CAST(ROUND(amount * 100) AS INTEGER) ELSE 0 END AS or_cents
+    FROM aggregates
+    WHERE source = '판매매출'
+"""
+
+
+def refresh_sales_window(conn: sqlite3.Connection, span: int, months: list[tuple[int, int]]) -> int:
+    """
+    months 각 월의 직전 span개월(당월 포함) 판매 합계를 큐브(sales_window)에 유지
+    
+    - 이미 계산된 월은 그대로 사용 (판매매출 파일이 바뀌면 _delete_month에서 해당 구간 삭제)
+    - 전월 합계가 있으면 전월 합계 + 당월 - (span개월 전 월)로 계산 (키 수에 비례, 이전 CSV를 다시 읽지 않음)
+    - 없으면 큐브의 span개월 집계를 직접 합산
+    - 금액은 정수 센트로 합산하므로 증분 계산과 직접 합산의 결과가 같음
+    - sales_window_months: 구간 내 판매매출 파일이 있는 월 수와 일수 합계 (주간 판매 환산용, 진행 중인 월은 경과 일수)
+    
+    Returns:
+        새로 계산한 월 수
+    """
+    done = set(conn.execute("SELECT year, month FROM sales_window_months WHERE span = ?", (span,)).fetchall())
+    insert = """
+        INSERT INTO sales_window
+        SELECT ?, ?, ?, brand, mid_category, sub_category, SUM(frs_cents), SUM(or_cents)
+        FROM ({rows})
+        GROUP BY brand, mid_category, sub_category
+        HAVING SUM(frs_cents) != 0 OR SUM(or_cents) != 0
+    """
+    computed = 0
+    
+    with track_stage("sales_window", rows_in=len(months)) as record, conn:
+        for year, month in sorted(months):
+            if (year, month) in done:
+                continue
+            period = year * 12 + month - 1
+            prev = divmod(period - 1, 12)
+            prev = (prev[0], prev[1] + 1)
+            
+            if prev in done:
+                dropped = divmod(period - span, 12)
+                rows = f"""
+                    SELECT brand, mid_category, sub_category, frs_cents, or_cents
+                    FROM sales_window WHERE span = ? AND year = ? AND month = ?
+                    UNION ALL
+                    {_SALES_CENTS} AND year = ? AND month = ?
+                    UNION ALL
+                    SELECT brand, mid_category, sub_category, -frs_cents, -or_cents
+                    FROM ({_SALES_CENTS} AND year = ? AND month = ?)
+                """
+                params = [span, *prev, year, month, dropped[0], dropped[1] + 1]
+            else:
+                rows = f"{_SALES_CENTS} AND year * 12 + month - 1 BETWEEN ? AND ?"
+                params = [period - span + 1, period]
+            conn.execute(insert.format(rows=rows), [span, year, month] + params)
+            
+            window_months = conn.execute(
+                "SELECT DISTINCT year, month FROM source_files WHERE source = '판매매출' "
+                "AND year * 12 + month - 1 BETWEEN ? AND ?",
+                (period - span + 1, period)
+            ).fetchall()
+            conn.execute(
+                "INSERT INTO sales_window_months VALUES (?, ?, ?, ?, ?)",
+                (span, year, month, len(window_months), sum(elapsed_sales_days(y, m) for y, m in window_months))
+            )
+            done.add((year, month))
+            computed += 1
+        record["rows_out"] += computed
+    return computed
+
+
+def query_cube_frame(
+    conn: sqlite3.Connection,
+    brands: list[str],
+    months: list[tuple[int, int]],
+    sales_window: int = 1
+) -> pd.DataFrame:
+    """
+    큐브에서 (연월, 브랜드, 중분류, 소분류)별 채널 합계 조회
+    
+    sales_window > 1이면 sales_window(refresh_sales_window로 미리 계산)의 직전 N개월 판매 합계와
+    그 구간의 일수 합계를 window_* 컬럼으로 추가 (당월 판매 frs_sales/or_sales는 그대로, 키는 해당 월에 데이터가 있는 키만)
+    
+    Returns:
+        [year, month, brand, 중분류, 소분류, agency_stock, or_stock, frs_sales, or_sales] (키 순 정렬)
+        (sales_window > 1이면 window_frs_sales, window_or_sales, window_days 컬럼 추가)
+    """
+    columns = ["year", "month", "brand", "중분류", "소분류", "agency_stock", "or_stock", "frs_sales", "or_sales"]
+    if sales_window > 1:
+        columns += ["window_frs_sales", "window_or_sales", "window_days"]
+    if not brands or not months:
+        return pd.DataFrame(columns=columns)
+    
+    brand_params = ", ".join("?" for _ in brands)
+    month_params = ", ".join("?" for _ in months)
+    query = f"""
+        SELECT
+            year, month, brand, mid_category, sub_category,
+            TOTAL(CASE WHEN source = '대리상재고' AND channel = 'FRS' THEN amount END),
+            TOTAL(CASE WHEN source = '대리상재고' AND channel = 'OR' THEN amount END),
+            TOTAL(CASE WHEN source = '판매매출' AND channel = 'FRS' THEN amount END),
+            TOTAL(CASE WHEN source = '판매매출' AND channel = 'OR' THEN amount END)
+        FROM aggregates
+        WHERE brand IN ({brand_params})
+          AND year * 100 + month IN ({month_params})
+        GROUP BY year, month, brand, mid_category, sub_category
+        ORDER BY year, month, brand, mid_category, sub_category
+    """
+    params = list(brands) + [year * 100 + month for year, month in months]
+    
+    if sales_window > 1:
+        query = f"""
+            SELECT
+                a.year, a.month, a.brand, a.mid_category, a.sub_category,
+                a.agency_stock, a.or_stock, a.frs_sales, a.or_sales,
+                COALESCE(w.frs_cents, 0) / 100.0, COALESCE(w.or_cents, 0) / 100.0, m.days
+            FROM (
+                SELECT
+                    year, month, brand, mid_category, sub_category,
+                    TOTAL(CASE WHEN source = '대리상재고' AND channel = 'FRS' THEN amount END) AS agency_stock,
+                    TOTAL(CASE WHEN source = '대리상재고' AND channel = 'OR' THEN amount END) AS or_stock,
+                    TOTAL(CASE WHEN source = '판매매출' AND channel = 'FRS' THEN amount END) AS frs_sales,
+                    TOTAL(CASE WHEN source = '판매매출' AND channel = 'OR' THEN amount END) AS or_sales
+                FROM aggregates
+                WHERE brand IN ({brand_params})
+                  AND year * 100 + month IN ({month_params})
+                GROUP BY year, month, brand, mid_category, sub_category
+            ) a
+            LEFT JOIN sales_window w
+              ON w.span = ? AND w.year = a.year AND w.month = a.month AND w.brand = a.brand
+             AND w.mid_category = a.mid_category AND w.sub_category = a.sub_category
+            LEFT JOIN sales_window_months m
+              ON m.span = ? AND m.year = a.year AND m.month = a.month
+            ORDER BY a.year, a.month, a.brand, a.mid_category, a.sub_category
+        """
+        params += [sales_window, sales_window]
+    
+    with track_stage("cube_query") as record:
+        rows = conn.execute(query, params).fetchall()
+        record["rows_out"] += len(rows)
+    return pd.DataFrame(rows, columns=columns)
+
+
+def query_stock_weeks(
+    conn: sqlite3.Connection,
+    brands: list[str],
+    months: list[tuple[int, int]],
+    n_weeks: int = 25,
+    sales_window: int = 1
+) -> pd.DataFrame:
+    """
+    큐브 조회 → 재고주수 결과 DataFrame (sales_window = 1이면 compute_stock_weeks와 같은 결과)
+    sales_window > 1이면 분모 판매를 직전 N개월 평균으로 계산 (refresh_sales_window를 먼저 호출)
+    진행 중인 월(일별/주별 파일만 있는 월)은 월초부터의 경과 일수로 주간 판매 환산
+    """
+    merged = _with_sales_days(query_cube_frame(conn, brands, months, sales_window), partial_month_days(months))
+    if merged.empty:
+        return pd.DataFrame(columns=["year", "month", "brand", "중분류", "소분류"] + WEEKS_COLUMNS)
+    
+    with track_stage("compute", rows_in=len(merged), profile=True) as record:
+        result = _stock_weeks_from_merged(merged, n_weeks, sales_window)
+        record["rows_out"] += len(result)
+    return result
+
+
+def query_cube_aggregates(
+    conn: sqlite3.Connection,
+    brands: list[str],
+    first: tuple[int, int],
+    last: tuple[int, int]
+) -> pd.DataFrame:
+    """
+    큐브에서 first ~ last 연월의 (입력 종류, 채널, 브랜드, 중분류, 소분류, 연월)별 금액 조회
+    
+    Returns:
+        [source, channel, brand, 중분류, 소분류, year, month, amount]
+    """
+    columns = ANOMALY_KEYS + ["year", "month", "amount"]
+    if not brands:
+        return pd.DataFrame(columns=columns)
+    
+    brand_params = ", ".join("?" for _ in brands)
+    query = f"""
+        SELECT source, channel, brand, mid_category, sub_category, year, month, amount
+        FROM aggregates
+        WHERE brand IN ({brand_params})
+          AND year * 100 + month BETWEEN ? AND ?
+    """
+    params = list(brands) + [first[0] * 100 + first[1], last[0] * 100 + last[1]]
+    return pd.DataFrame(conn.execute(query, params).fetchall(), columns=columns)
+
+
+def check_anomalies(
+    conn: sqlite3.Connection,
+    brands: list[str],
+    months: list[tuple[int, int]],
+    window: int = ANOMALY_WINDOW
+) -> pd.DataFrame:
+    """
+    검사 대상 월과 직전 window개월의 큐브 집계로 이상치 감지 (CSV는 다시 읽지 않음)
+    진행 중인 월의 판매는 경과 일수 기준 월 환산 금액으로 비교
+    """
+    if not months:
+        return detect_anomalies(pd.DataFrame(), months)
+    
+    first_year, first_month = min(months)
+    first_period = first_year * 12 + first_month - 1 - window
+    aggregates = query_cube_aggregates(conn, brands, (first_period // 12, first_period % 12 + 1), max(months))
+    for (year, month), days in partial_month_days(months).items():
+        rows = (aggregates["source"] == "판매매출") & (aggregates["year"] == year) & (aggregates["month"] == month)
+        aggregates.loc[rows, "amount"] *= get_days_in_month(year, month) / days
+    with track_stage("validate", rows_in=len(aggregates)) as record:
+        anomalies = detect_anomalies(aggregates, months, window=window)
+        record["rows_out"] += len(anomalies)
+    return anomalies
+
+
+def build_anomaly_report(anomalies: pd.DataFrame, months: list[tuple[int, int]]) -> dict:
+    """
+    이상치 DataFrame → 이상치 리포트 (기준선 설정 + 사유/월별 건수 + 이상치 목록)
+    """
+    # to_json이 NaN(기준선 없음)을 null로 변환
+    records = json.loads(anomalies.to_json(orient="records", force_ascii=False)) if not anomalies.empty else []
+    
+    by_reason: dict[str, int] = defaultdict(int)
+    by_month: dict[str, int] = defaultdict(int)
+    for record in records:
+        for reason in record["reasons"]:
+            by_reason[reason] += 1
+        by_month[f"{record['year']}.{record['month']:02d}"] += 1
+    
+    return {
+        "version": ANOMALY_REPORT_VERSION,
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "months": [f"{year}.{month:02d}" for year, month in months],
+        "baseline": {
+            "window": ANOMALY_WINDOW,
+            "min_history": ANOMALY_MIN_HISTORY,
+            "ratio": ANOMALY_RATIO,
+            "z": ANOMALY_Z,
+            "mad_floor": ANOMALY_MAD_FLOOR,
+            "min_baseline": ANOMALY_MIN_BASELINE,
+            "max_aggregated": MAX_AGGREGATED_AMOUNT,
+        },
+        "summary": {"total": len(records), "by_reason": dict(by_reason), "by_month": dict(by_month)},
+        "anomalies": records,
+    }
+
+
+# 출력 형식: nested(기존 대시보드 JSON), columnar(차원 사전 + 지표별 배열), shards(중분류/연도별 분할)
+EXPORT_FORMATS = ["nested", "columnar", "shards", "warehouse"]
+COLUMNAR_FORMAT_VERSION = 1
+# warehouse: 셀별 창고재고주수 계수 (창고재고주수는 직영 판매예정 주수 n에 대해 선형)
+WAREHOUSE_FORMAT_VERSION = 2
+# 샤드 출력 폴더 (출력 JSON과 같은 폴더 아래) 및 매니페스트 형식 버전
+SHARDS_DIR_NAME = "shards"
+SHARDS_FORMAT_VERSION = 1
+# 델타 파일 (직전 실행 대비 바뀐 셀) 형식 버전 및 데이터 버전(내용 해시) 길이
+DELTA_FORMAT_VERSION = 1
+DATA_VERSION_LENGTH = 16
+# 홈 화면용 요약 (브랜드 × 중분류 × 월) 파일명 및 형식 버전
+SUMMARY_FILE_NAME = "stock_weeks_summary.json"
+SUMMARY_FORMAT_VERSION = 3
+# 요약에 넣는 홈 화면 연도 선택 대상 (최근 N개 연도, 전년 동월 비교용으로 그 전 연도의 같은 월도 포함)
+SUMMARY_YEARS = 1
+
+# 재고주수 결과 컬럼 (기초데이터 포함)
+WEEKS_COLUMNS = ["전체재고주수", "대리상재고주수", "창고재고주수"]
+BASE_COLUMNS = [
+    "월일수",
+    "전체재고금액",
+    "대리상재고금액",
+    "직영재고금액",
+    "전체판매금액",
+    "대리상판매금액",
+    "직영판매금액",
+]
+# 판매 누적 구간 모드(--sales-window N)의 재고주수 분모
+# (셀에는 기초데이터와 별도로 "판매구간" 블록에 저장, 키는 컬럼명에서 "구간"을 뺀 이름 - 기초데이터는 항상 당월 값)
+SALES_WINDOW_KEY = "판매구간"
+WINDOW_COLUMNS = ["구간개월수", "구간일수", "구간전체판매금액", "구간대리상판매금액", "구간직영판매금액"]
+
+
+def _weeks_denominators(frame: pd.DataFrame) -> list:
+    """재고주수 분모 [전체판매, 대리상판매, 직영판매, 일수] (판매 누적 구간 컬럼이 있으면 구간 값, 없으면 당월 기초데이터)"""
+    if "구간일수" in frame.columns:
+        return [frame[col].to_numpy() for col in WINDOW_COLUMNS[2:] + ["구간일수"]]
+    return [frame[col].to_numpy() for col in ["전체판매금액", "대리상판매금액", "직영판매금액", "월일수"]]
+
+
+def _cell_weeks_base(cell: dict) -> dict:
+    """월 셀의 재고주수 계산 기준 (기초데이터, 판매구간 블록이 있으면 판매금액/월일수를 구간 값으로 대체)"""
+    window = cell.get(SALES_WINDOW_KEY)
+    if window is None:
+        return cell["기초데이터"]
+    return {
+        **cell["기초데이터"],
+        "월일수": window["일수"],
+        "전체판매금액": window["전체판매금액"],
+        "대리상판매금액": window["대리상판매금액"],
+        "직영판매금액": window["직영판매금액"],
+    }
+
+
+def stock_weeks_sales_window(result_dict: dict) -> int | None:
+    """
+    대시보드 JSON의 판매 누적 구간 개월 수 (판매구간 블록이 없으면 1, 데이터가 있는 셀이 없으면 None)
+    부분 재계산 병합 전에 이번 실행의 --sales-window와 같은지 확인하는 데 사용
+    """
+    for cat_data in result_dict.values():
+        for year, months in cat_data.items():
+            if year == "소분류":
+                continue
+            for cell in months.values():
+                if cell["전체재고주수"] is None:
+                    continue
+                window = cell.get(SALES_WINDOW_KEY)
+                return 1 if window is None else window["개월수"]
+    return None
+
+
+def days_in_month_array(years, months) -> np.ndarray:
+    """연도/월 배열에 대한 월별 일수 배열 (벡터화된 get_days_in_month)"""
+    years = np.asarray(years, dtype=np.int64)
+    months = np.asarray(months, dtype=np.int64)
+    days = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)[months - 1]
+    leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    return np.where((months == 2) & leap, 29, days)
+
+
+def compute_weeks_metrics(
+    total_stock,
+    agency_stock,
+    or_stock,
+    total_sales,
+    frs_sales,
+    or_sales,
+    days,
+    n_weeks: int = 25
+) -> dict[str, np.ndarray]:
+    """
+    재고주수 계산 커널 (소분류/중분류 공통, NumPy 벡터화)
+    
+    - 전체재고주수 = 전체재고 / 주간 전체판매
+    - 대리상재고주수 = 대리상재고 / 주간 대리상판매
+    - 창고재고주수 = (직영재고 - 주간 직영판매 × n_weeks) / 주간 전체판매
+    - 분모 판매가 0(또는 NaN)이면 "판매0", 그 외는 소수점 2자리 반올림
+    
+    Args:
+        각 금액/일수는 같은 길이의 배열
+        n_weeks: 직영 판매예정 주수
+    
+    Returns:
+        {"전체재고주수", "대리상재고주수", "창고재고주수": object 배열}
+    """
+    total_stock = np.asarray(total_stock, dtype=np.float64)
+    agency_stock = np.asarray(agency_stock, dtype=np.float64)
+    or_stock = np.asarray(or_stock, dtype=np.float64)
+    total_sales = np.asarray(total_sales, dtype=np.float64)
+    frs_sales = np.asarray(frs_sales, dtype=np.float64)
+    or_sales = np.asarray(or_sales, dtype=np.float64)
+    days = np.asarray(days, dtype=np.float64)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weekly_sales = (total_sales / days) * 7
+        frs_weekly_sales = (frs_sales / days) * 7
+        or_weekly_sales = np.where(np.isnan(or_sales), 0.0, (or_sales / days) * 7)
+        
+        창고재고 = or_stock - or_weekly_sales * n_weeks
+        
+        no_total_sales = np.isnan(weekly_sales) | (weekly_sales == 0)
+        no_frs_sales = np.isnan(frs_weekly_sales) | (frs_weekly_sales == 0)
+        
+        values = {
+            "전체재고주수": (np.round(total_stock / weekly_sales, 2), no_total_sales),
+            "대리상재고주수": (np.round(agency_stock / frs_weekly_sales, 2), no_frs_sales),
+            "창고재고주수": (np.round(창고재고 / weekly_sales, 2), no_total_sales),
+        }
+    
+    metrics = {}
+    for name, (weeks, no_sales) in values.items():
+        column = weeks.astype(object)
+        column[no_sales] = "판매0"
+        metrics[name] = column
+    
+    return metrics
+
+
+def compute_stock_weeks(
+    stock_agency: pd.DataFrame,
+    stock_or: pd.DataFrame,
+    sales: pd.DataFrame,
+    n_weeks: int = 25,
+    sales_days: dict[tuple[int, int], int] | None = None
+) -> pd.DataFrame:
+    """
+    재고주수 계산
+    
+    네 가지 입력(대리상재고, 직영재고, 대리상판매, 직영판매)을 키 기준으로 한 번에 합산한 뒤
+    compute_weeks_metrics로 전체 키를 벡터 연산
+    
+    sales_days: {(연도, 월): 경과 일수} 일별/주별 파일로 집계한 진행 중인 월의 판매 일수
+    (지정하지 않은 월은 당월 일수, partial_month_days 참고)
+    """
+    key_cols = ["year", "month", "brand", "중분류", "소분류"]
+    value_cols = ["agency_stock", "or_stock", "frs_sales", "or_sales"]
+    
+    parts = []
+    if not stock_agency.empty:
+        parts.append(stock_agency[key_cols + ["재고금액"]].rename(columns={"재고금액": "agency_stock"}))
+    if not stock_or.empty:
+        parts.append(stock_or[key_cols + ["재고금액"]].rename(columns={"재고금액": "or_stock"}))
+    if not sales.empty:
+        for channel, value_col in [("FRS", "frs_sales"), ("OR", "or_sales")]:
+            channel_sales = sales.loc[sales["channel"] == channel, key_cols + ["판매금액"]]
+            if not channel_sales.empty:
+                parts.append(channel_sales.rename(columns={"판매금액": value_col}))
+    
+    if not parts:
+        return pd.DataFrame(columns=key_cols + WEEKS_COLUMNS)
+    
+    # 키 전체집합(outer) + 채널별 합계를 한 번의 groupby로 계산 (없는 값은 0)
+    merged = (
+        pd.concat(parts, ignore_index=True)
+        .reindex(columns=key_cols + value_cols)
+        .groupby(key_cols, as_index=False, sort=True)[value_cols]
+        .sum()
+    )
+    return _stock_weeks_from_merged(_with_sales_days(merged, sales_days), n_weeks)
+
+
+def _stock_weeks_from_merged(merged: pd.DataFrame, n_weeks: int = 25, sales_window: int = 1) -> pd.DataFrame:
+    """
+    키별 채널 합계 [year, month, brand, 중분류, 소분류, agency_stock, or_stock, frs_sales, or_sales]
+    → 재고주수 결과 (compute_stock_weeks / query_stock_weeks 공통)
+    
+    sales_days 컬럼이 있으면 진행 중인 월의 월일수는 월초부터의 경과 일수
+    window_* 컬럼이 있으면(판매 누적 구간 모드) 재고주수 분모는 구간 합계/구간 일수이고
+    기초데이터는 당월 값 그대로, 구간 값은 WINDOW_COLUMNS로 별도 출력
+    """
+    key_cols = ["year", "month", "brand", "중분류", "소분류"]
+    agency_stock = merged["agency_stock"].to_numpy(dtype=np.float64)
+    or_stock = merged["or_stock"].to_numpy(dtype=np.float64)
+    frs_sales = merged["frs_sales"].to_numpy(dtype=np.float64)
+    or_sales = merged["or_sales"].to_numpy(dtype=np.float64)
+    total_stock = agency_stock + or_stock
+    total_sales = frs_sales + or_sales
+    days = days_in_month_array(merged["year"], merged["month"])
+    if "sales_days" in merged.columns:
+        # 월 파일이 있는 월이면 당월 일수
+        sales_days = merged["sales_days"].to_numpy(dtype=np.float64)
+        days = np.where(np.isnan(sales_days), days, sales_days).astype(int)
+    
+    window = None
+    if "window_days" in merged.columns:
+        window_frs = merged["window_frs_sales"].to_numpy(dtype=np.float64)
+        window_or = merged["window_or_sales"].to_numpy(dtype=np.float64)
+        # 구간 내 판매매출 파일이 하나도 없으면 당월 일수
+        window_days = merged["window_days"].to_numpy(dtype=np.float64)
+        window_days = np.where(np.isnan(window_days), days, window_days).astype(int)
+        window = [window_frs + window_or, window_frs, window_or, window_days]
+    
+    metrics = compute_weeks_metrics(
+        total_stock, agency_stock, or_stock,
+        *(window or [total_sales, frs_sales, or_sales, days]),
+        n_weeks=n_weeks
+    )
+    
+    result = merged[key_cols].copy()
+    result["year"] = result["year"].astype(int)
+    result["month"] = result["month"].astype(int)
+    for name in WEEKS_COLUMNS:
+        result[name] = metrics[name]
+    result["월일수"] = days
+    result["전체재고금액"] = total_stock
+    result["대리상재고금액"] = agency_stock
+    result["직영재고금액"] = or_stock
+    result["전체판매금액"] = total_sales
+    result["대리상판매금액"] = frs_sales
+    result["직영판매금액"] = or_sales
+    if window is not None:
+        result["구간개월수"] = sales_window
+        result["구간일수"] = window[3]
+        result["구간전체판매금액"], result["구간대리상판매금액"], result["구간직영판매금액"] = window[:3]
+    
+    return result
+
+
+def discover_months() -> list[tuple[int, int]]:
+    """
+    대리상재고 / 판매매출 폴더의 YYYY.MM.csv 파일명에서 처리 대상 (연도, 월) 목록 수집
+    (일별/주별 파일 YYYY.MM.DD.csv만 있는 진행 중인 월도 포함)
+    """
+    months = set()
+    
+    for folder in [AGENCY_STOCK_PATH, SALES_PATH]:
+        for file_path in folder.glob("*.csv"):
+            try:
+                parts = file_path.stem.split(".")
+                if len(parts) in (2, 3):
+                    year = int(parts[0])
+                    month = int(parts[1])
+                    months.add((year, month))
+            except:
+                continue
+    
+    return sorted(months)
+
+
+def elapsed_sales_days(year: int, month: int) -> int:
+    """
+    판매 경과 일수 (주간 판매 환산의 분모)
+    월 판매매출 파일이 있으면 그 달 일수, 일별/주별 파일만 있으면 마지막 파일 날짜 (월초부터 누계)
+    """
+    if not (SALES_PATH / source_file_name(year, month)).exists():
+        days = discover_days(SALES_PATH, year, month)
+        if days:
+            return days[-1]
+    return get_days_in_month(year, month)
+
+
+def partial_month_days(months: list[tuple[int, int]]) -> dict[tuple[int, int], int]:
+    """months 중 월 판매매출 파일 없이 일별/주별 파일만 있는 (진행 중인) 월 → 경과 일수"""
+    partial = {}
+    for year, month in months:
+        days = elapsed_sales_days(year, month)
+        if days != get_days_in_month(year, month):
+            partial[(year, month)] = days
+    return partial
+
+
+def _with_sales_days(merged: pd.DataFrame, sales_days: dict[tuple[int, int], int]) -> pd.DataFrame:
+    """진행 중인 월의 경과 일수를 sales_days 컬럼으로 추가 (나머지 월은 NaN → 당월 일수)"""
+    if not sales_days or merged.empty:
+        return merged
+    keys = merged["year"].astype(int) * 100 + merged["month"].astype(int)
+    merged["sales_days"] = keys.map({year * 100 + month: days for (year, month), days in sales_days.items()})
+    return merged
+
+
+def parse_year_month(text: str) -> tuple[int, int]:
+    """ "2024.03" / "2024-03" 형식 → (2024, 3)"""
+    parts = text.replace("-", ".").split(".")
+    if len(parts) != 2:
+        raise ValueError(f"연월은 YYYY.MM 형식이어야 합니다: {text}")
+    year, month = int(parts[0]), int(parts[1])
+    if not 1 <= month <= 12:
+        raise ValueError(f"월은 1~12 사이여야 합니다: {text}")
+    return year, month
+
+
+def apply_retention(
+    months: list[tuple[int, int]],
+    keep_years: int | None = None,
+    since: tuple[int, int] | None = None
+) -> list[tuple[int, int]]:
+    """
+    보관 기간(retention window) 밖의 월 제외
+    
+    Args:
+        months: (연도, 월) 목록
+        keep_years: 최근 N개 연도만 유지 (가장 최근 연도 포함, 해당 연도들의 1월부터)
+        since: 이 연월 이후만 유지 (예: (2024, 1))
+        둘 다 지정하면 더 늦은 시작 월 기준
+    """
+    if not months:
+        return months
+    
+    start = None
+    if keep_years is not None:
+        if keep_years < 1:
+            raise ValueError("keep_years는 1 이상이어야 합니다.")
+        start = (max(year for year, _ in months) - keep_years + 1, 1)
+    if since is not None:
+        start = max(start, since) if start is not None else since
+    
+    if start is None:
+        return months
+    return [ym for ym in months if ym >= start]
+
+
+def process_month(
+    year: int,
+    month: int,
+    brands: list[str],
+    n_weeks: int = 25
+) -> pd.DataFrame:
+    """
+    한 달치 로딩 → 채널 분리 → 브랜드 필터 → 재고주수 계산 (집계 큐브를 사용하지 않는 경로)
+    (월 단위로 독립적이므로 프로세스 풀에서 병렬 실행 가능)
+    
+    Returns:
+        대상 브랜드 전체의 재고주수 결과 DataFrame
+    """
+    print(f"처리 중: {year}년 {month}월 - {', '.join(brands)}")
+    
+    # 대리상재고 CSV에서 전체 재고 로딩 (FRS + OR), 판매매출 로딩
+    with track_stage("load", "대리상재고", year, month, profile=True) as record:
+        all_stock = load_stock_all_from_agency(year, month)
+        record["rows_out"] += len(all_stock)
+    
+    with track_stage("load", "판매매출", year, month, profile=True) as record:
+        sales = load_sales_chunked(year, month)
+        record["rows_out"] += len(sales)
+    
+    # Channel 2 기준으로 분리
+    stock_agency = get_stock_agency(all_stock)
+    stock_or = get_stock_or(all_stock)
+    
+    # 브랜드 필터링
+    if not stock_agency.empty:
+        stock_agency = stock_agency[stock_agency["brand"].isin(brands)].copy()
+    if not stock_or.empty:
+        stock_or = stock_or[stock_or["brand"].isin(brands)].copy()
+    if not sales.empty:
+        sales = sales[sales["brand"].isin(brands)].copy()
+    
+    # 재고주수 계산 (대상 브랜드 전체 한 번에)
+    rows_in = len(stock_agency) + len(stock_or) + len(sales)
+    with track_stage("compute", None, year, month, rows_in=rows_in, profile=True) as record:
+        result = compute_stock_weeks(stock_agency, stock_or, sales, n_weeks, partial_month_days([(year, month)]))
+        record["rows_out"] += len(result)
+    return result
+
+
+def _worker_settings() -> dict:
+    """워커 프로세스에 전달할 경로/캐시 설정 (Windows spawn 방식에서도 동일하게 적용)"""
+    return {
+        "AGENCY_STOCK_PATH": AGENCY_STOCK_PATH,
+        "SALES_PATH": SALES_PATH,
+        "CACHE_DIR": CACHE_DIR,
+        "CUBE_PATH": CUBE_PATH,
+        "COLUMNAR_CACHE_DIR": COLUMNAR_CACHE_DIR,
+        "USE_COLUMNAR_CACHE": USE_COLUMNAR_CACHE,
+        "WRITE_SIDECAR_INDEX": WRITE_SIDECAR_INDEX,
+        "SIDECAR_DIR": SIDECAR_DIR,
+        "MEMORY_BUDGET_MB": MEMORY_BUDGET_MB,
+        "PROFILE_DIR": PROFILE_DIR,
+    }
+
+
+def _init_worker(settings: dict):
+    """워커 프로세스 초기화: 부모 프로세스의 설정을 모듈 전역에 반영"""
+    globals().update(settings)
+
+
+def _process_month_task(task: tuple) -> tuple[pd.DataFrame, list[dict]]:
+    """
+    프로세스 풀 작업 단위 (집계 큐브를 사용하지 않는 경로)
+    단계별 측정 기록도 함께 반환하여 부모의 STAGE_STATS에 누적
+    """
+    year, month, brands, n_weeks = task
+    STAGE_STATS.clear()
+    result = process_month(year, month, brands, n_weeks)
+    return result, collect_stage_stats()
+
+
+def preprocess_brands(
+    brands: list[str],
+    n_weeks: int = 25,
+    use_cache: bool = True,
+    workers: int = 1,
+    keep_years: int | None = None,
+    since: tuple[int, int] | None = None,
+    months: list[tuple[int, int]] | None = None,
+    sales_window: int = 1
+) -> dict[str, pd.DataFrame]:
+    """
+    여러 브랜드를 한 번의 월별 스캔으로 전처리
+    
+    월별 CSV는 브랜드 수와 관계없이 한 번만 읽고 집계하며,
+    집계 결과를 브랜드별로 나누어 재고주수 결과를 모음
+    (재고주수는 brand를 키에 포함하므로 브랜드 전체를 한 번에 계산)
+    
+    use_cache=True이면 집계 큐브(.cache/cube.sqlite)를 기준으로
+    신규/변경된 월 파일만 다시 집계하여 큐브에 반영하고, 재고주수는 큐브 조회로 계산
+    (use_cache=False이면 큐브 없이 매번 CSV에서 직접 집계)
+    
+    workers > 1이면 파일별(큐브 사용 시) 또는 월별 집계를 프로세스 풀에서 병렬로 실행하며,
+    결과는 직렬 실행과 동일함
+    
+    keep_years / since를 지정하면 보관 기간 밖의 월은 CSV 로딩부터 제외되어
+    집계/출력되지 않음 (apply_retention 참고)
+    
+    months를 지정하면 입력 폴더 전체 대신 해당 (연도, 월)만 처리 (일부 월 재집계용)
+    
+    sales_window > 1이면 재고주수 분모를 당월 판매 대신 직전 N개월(당월 포함) 판매 평균으로 계산
+    (큐브의 누적 구간 합계를 증분 갱신, 구간에 필요한 이전 월 판매매출도 큐브에 반영, use_cache=True 필요)
+    
+    Returns:
+        {브랜드: 재고주수 결과 DataFrame} (데이터가 없는 브랜드는 빈 DataFrame)
+    """
+    for brand in brands:
+        if brand not in TARGET_BRANDS:
+            raise ValueError(f"브랜드는 {TARGET_BRANDS} 중 하나여야 합니다.")
+    if sales_window > 1 and not use_cache:
+        raise ValueError("판매 누적 구간(sales_window > 1)은 집계 큐브를 사용할 때만 지원합니다.")
+    
+    results_by_brand: dict[str, list[pd.DataFrame]] = {brand: [] for brand in brands}
+    months = apply_retention(months if months is not None else discover_months(), keep_years, since)
+    
+    if use_cache:
+        conn = open_cube()
+        try:
+            refreshed = refresh_cube(conn, months, workers)
+            if sales_window > 1:
+                lookback = sales_window_lookback(months, sales_window, discover_months())
+                refreshed += refresh_cube(conn, lookback, workers, kinds=["판매매출"])
+                computed = refresh_sales_window(conn, sales_window, months)
+                print(f"[캐시] 판매 {sales_window}개월 누적 구간: {computed}개월 계산")
+            print(f"[캐시] 집계 큐브 갱신: {refreshed}개 파일 재집계, {len(months)}개월 조회")
+            month_results = [query_stock_weeks(conn, brands, months, n_weeks, sales_window)]
+        finally:
+            conn.close()
+    elif workers > 1 and len(months) > 1:
+        tasks = [(year, month, brands, n_weeks) for year, month in months]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(_worker_settings(),)
+        ) as executor:
+            # map은 제출 순서대로 결과를 반환 → 월 순서가 보장됨
+            month_results = []
+            for result, stage_stats in executor.map(_process_month_task, tasks):
+                merge_stage_stats(stage_stats)
+                month_results.append(result)
+    else:
+        month_results = (process_month(year, month, brands, n_weeks) for year, month in months)
+    
+    for result in month_results:
+        # 브랜드별 결과로 분배
         if not result.empty:
-            all_results.append(result)
+            for brand, brand_result in result.groupby("brand", sort=False):
+                results_by_brand[brand].append(brand_result.reset_index(drop=True))
         
-        del all_stock, stock_agency, stock_or, sales, result
+        del result
+    
+    return {
+        brand: pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        for brand, frames in results_by_brand.items()
+    }
+
+
+def preprocess_all(brand: str, n_weeks: int = 25) -> pd.DataFrame:
+    """
+    전체 전처리 프로세스 실행 (단일 브랜드)
+    """
+    return preprocess_brands([brand], n_weeks)[brand]
+
+
+def create_default_month_data(days: int) -> dict:
+    """데이터가 없는 월의 기본값 (재고주수 null, 기초데이터 0)"""
+    return {
+        "전체재고주수": None,
+        "대리상재고주수": None,
+        "창고재고주수": None,
+        "기초데이터": {
+            "월일수": days,
+            "전체재고금액": 0,
+            "대리상재고금액": 0,
+            "직영재고금액": 0,
+            "전체판매금액": 0,
+            "대리상판매금액": 0,
+            "직영판매금액": 0,
+        },
+    }
+
+
+def _month_cells(frame: pd.DataFrame, key_cols: list[str]) -> dict:
+    """
+    키 컬럼 + 재고주수/기초데이터 컬럼 → {키 튜플: 월 데이터} (컬럼 배열을 한 번에 순회)
+    """
+    keys = zip(*[frame[col].tolist() for col in key_cols])
+    weeks = zip(*[frame[col].tolist() for col in WEEKS_COLUMNS])
+    days = frame["월일수"].astype(int).tolist()
+    amounts = zip(*[frame[col].astype(float).tolist() for col in BASE_COLUMNS[1:]])
+    
+    cells = {}
+    for key, (전체, 대리상, 창고), 월일수, amount_values in zip(keys, weeks, days, amounts):
+        기초데이터 = {"월일수": 월일수}
+        기초데이터.update(zip(BASE_COLUMNS[1:], amount_values))
+        cells[key] = {
+            "전체재고주수": 전체,
+            "대리상재고주수": 대리상,
+            "창고재고주수": 창고,
+            "기초데이터": 기초데이터,
+        }
+    
+    # 판매 누적 구간 모드: 재고주수 분모(구간 판매/일수)를 판매구간 블록으로 추가
+    if "구간일수" in frame.columns:
+        window_names = [col.removeprefix("구간") for col in WINDOW_COLUMNS]
+        windows = zip(
+            frame["구간개월수"].astype(int).tolist(),
+            frame["구간일수"].astype(int).tolist(),
+            *[frame[col].astype(float).tolist() for col in WINDOW_COLUMNS[2:]]
+        )
+        for key, window_values in zip(cells, windows):
+            cells[key][SALES_WINDOW_KEY] = dict(zip(window_names, window_values))
+    return cells
+
+
+def build_stock_weeks_dict(df: pd.DataFrame, n_weeks: int = 25) -> dict:
+    """
+    재고주수 결과 DataFrame → 대시보드 JSON 구조
+    
+    - 중분류 → 연도 → 월: 소분류 기초데이터를 groupby로 합산한 뒤 compute_weeks_metrics로 계산
+    - 중분류 → 소분류 → 연도 → 월: 소분류 결과를 그대로 사용
+    - 각 연도는 항상 1~12월 키를 가지며, 데이터가 없는 월은 기본값으로 채움
+    """
+    if df.empty:
+        return {}
+    
+    df = df.copy()
+    df["year"] = df["year"].astype(int)
+    df["month"] = df["month"].astype(int)
+    amount_cols = BASE_COLUMNS[1:]
+    day_cols = ["월일수"]
+    if "구간일수" in df.columns:
+        amount_cols = amount_cols + WINDOW_COLUMNS[2:]
+        day_cols = day_cols + WINDOW_COLUMNS[:2]
+    
+    # 중분류 집계 (소분류 기초데이터/판매구간 합산, 월일수/구간 일수는 월마다 같으므로 키에 포함)
+    category_df = df.groupby(["중분류", "year", "month"] + day_cols, as_index=False, sort=False)[amount_cols].sum()
+    category_metrics = compute_weeks_metrics(
+        *[category_df[col].to_numpy() for col in BASE_COLUMNS[1:4]],
+        *_weeks_denominators(category_df),
+        n_weeks=n_weeks
+    )
+    for name in WEEKS_COLUMNS:
+        category_df[name] = category_metrics[name]
+    
+    category_cells = _month_cells(category_df, ["중분류", "year", "month"])
+    subcategory_cells = _month_cells(df, ["중분류", "소분류", "year", "month"])
+    
+    years = sorted(df["year"].unique().tolist())
+    subcategories_by_category = {
+        중분류: sorted(group.unique().tolist())
+        for 중분류, group in df.groupby("중분류", sort=True)["소분류"]
+    }
+    month_days = {
+        (year, month): get_days_in_month(year, month)
+        for year in years
+        for month in range(1, 13)
+    }
+    
+    def year_block(key_prefix: tuple, cells: dict) -> dict:
+        block = {}
+        for year in years:
+            block[str(year)] = {
+                str(month): (
+                    cells.get(key_prefix + (year, month))
+                    or create_default_month_data(month_days[(year, month)])
+                )
+                for month in range(1, 13)
+            }
+        return block
     
-    if not all_results:
-        return pd.DataFrame()
+    result_dict = {}
+    for 중분류, 소분류_list in subcategories_by_category.items():
+        result_dict[중분류] = year_block((중분류,), category_cells)
+        result_dict[중분류]["소분류"] = {
+            소분류: year_block((중분류, 소분류), subcategory_cells)
+            for 소분류 in 소분류_list
+        }
     
-    return pd.concat(all_results, ignore_index=True)
+    return result_dict
 
 
-def export_json(df: pd.DataFrame, output_path: str = "stock_weeks_result.json"):
+def _month_cell_index(result_dict: dict) -> dict:
     """
-    결과를 JSON 형태로 출력
-    항상 1~12월 전체 월 키를 생성하며, 데이터가 없는 월은 기본값으로 채움
+    대시보드 JSON 구조 → 차원 사전 + 기본값이 아닌 월 셀 목록 (컬럼형/창고재고주수 표 공통)
+    
+    Returns:
+        {"categories", "subcategories", "years", "subcategoriesByCategory",
+         "cells": [(중분류 인덱스, 소분류 인덱스 또는 -1, 연도 인덱스, 월, 월 데이터)]}
     """
-    if df.empty:
-        print("출력할 데이터가 없습니다.")
-        return
+    categories = list(result_dict.keys())
+    years = sorted({year for cat_data in result_dict.values() for year in cat_data if year != "소분류"})
+    year_index = {year: i for i, year in enumerate(years)}
     
-    def create_default_month_data(year: int, month: int) -> dict:
-        days = get_days_in_month(year, month)
-        return {
-            "전체재고주수": None,
-            "대리상재고주수": None,
-            "창고재고주수": None,
-            "기초데이터": {
-                "월일수": days,
-                "전체재고금액": 0,
-                "대리상재고금액": 0,
-                "직영재고금액": 0,
-                "전체판매금액": 0,
-                "대리상판매금액": 0,
-                "직영판매금액": 0,
-            },
-        }
+    subcategories: list[str] = []
+    sub_index: dict[str, int] = {}
+    subcategories_by_category = []
+    cells = []
     
-    subcategory_data_map = {}
-    subcategory_base_data_map = {}
-    category_base_agg = {}
+    def add_cells(cat_i: int, sub_i: int, year_blocks: dict):
+        for year, months in year_blocks.items():
+            for month, cell in months.items():
+                if all(cell[col] is None for col in WEEKS_COLUMNS):
+                    continue
+                cells.append((cat_i, sub_i, year_index[year], int(month), cell))
     
-    for _, row in df.iterrows():
-        year = int(row["year"])
-        month = int(row["month"])
-        중분류 = row["중분류"]
-        소분류 = row["소분류"]
+    for cat_i, 중분류 in enumerate(categories):
+        cat_data = result_dict[중분류]
+        add_cells(cat_i, -1, {year: months for year, months in cat_data.items() if year != "소분류"})
         
-        기초데이터 = {
-            "월일수": int(row.get("월일수", get_days_in_month(year, month))),
-            "전체재고금액": float(row.get("전체재고금액", 0)),
-            "대리상재고금액": float(row.get("대리상재고금액", 0)),
-            "직영재고금액": float(row.get("직영재고금액", 0)),
-            "전체판매금액": float(row.get("전체판매금액", 0)),
-            "대리상판매금액": float(row.get("대리상판매금액", 0)),
-            "직영판매금액": float(row.get("직영판매금액", 0)),
-        }
-        
-        sub_value = {
-            "전체재고주수": row["전체재고주수"],
-            "대리상재고주수": row["대리상재고주수"],
-            "창고재고주수": row["창고재고주수"],
-            "기초데이터": 기초데이터
-        }
-        
-        sub_key = (중분류, 소분류, year, month)
-        subcategory_data_map[sub_key] = sub_value
-        subcategory_base_data_map[sub_key] = 기초데이터
-        
-        cat_key = (중분류, year, month)
-        if cat_key not in category_base_agg:
-            category_base_agg[cat_key] = {
-                "월일수": 기초데이터["월일수"],
-                "전체재고금액": 0.0,
-                "대리상재고금액": 0.0,
-                "직영재고금액": 0.0,
-                "전체판매금액": 0.0,
-                "대리상판매금액": 0.0,
-                "직영판매금액": 0.0,
+        sub_list = []
+        for 소분류, sub_data in cat_data.get("소분류", {}).items():
+            if 소분류 not in sub_index:
+                sub_index[소분류] = len(subcategories)
+                subcategories.append(소분류)
+            sub_list.append(sub_index[소분류])
+            add_cells(cat_i, sub_index[소분류], sub_data)
+        subcategories_by_category.append(sub_list)
+    
+    return {
+        "categories": categories,
+        "subcategories": subcategories,
+        "years": years,
+        "subcategoriesByCategory": subcategories_by_category,
+        "cells": cells,
+    }
+
+
+def to_columnar_dict(result_dict: dict) -> dict:
+    """
+    대시보드 JSON 구조 → 컬럼형 구조 (차원 사전 + 지표별 병렬 배열)
+    
+    - categories / subcategories / years: 차원 사전 (셀은 인덱스로 참조)
+    - subcategoriesByCategory: 중분류별 소분류 인덱스 목록 (표시 순서 유지)
+    - cells: 기본값이 아닌 월 데이터만 저장, subcategory == -1 이면 중분류 셀
+      (기본값 셀은 utils/columnar-stock-weeks.ts에서 연도/월로 복원)
+    """
+    index = _month_cell_index(result_dict)
+    has_window = any(SALES_WINDOW_KEY in cell for *_, cell in index["cells"])
+    window_cols = WINDOW_COLUMNS if has_window else []
+    
+    cells = {"category": [], "subcategory": [], "year": [], "month": []}
+    cells.update({col: [] for col in WEEKS_COLUMNS + BASE_COLUMNS + window_cols})
+    for cat_i, sub_i, year_i, month, cell in index["cells"]:
+        cells["category"].append(cat_i)
+        cells["subcategory"].append(sub_i)
+        cells["year"].append(year_i)
+        cells["month"].append(month)
+        for col in WEEKS_COLUMNS:
+            cells[col].append(cell[col])
+        for col in BASE_COLUMNS:
+            cells[col].append(cell["기초데이터"][col])
+        for col in window_cols:
+            cells[col].append(cell[SALES_WINDOW_KEY][col.removeprefix("구간")])
+    
+    columnar = {
+        "format": "stock-weeks-columnar",
+        "version": COLUMNAR_FORMAT_VERSION,
+        "categories": index["categories"],
+        "subcategories": index["subcategories"],
+        "years": index["years"],
+        "subcategoriesByCategory": index["subcategoriesByCategory"],
+        "weeksKeys": WEEKS_COLUMNS,
+        "baseKeys": BASE_COLUMNS,
+    }
+    if has_window:
+        columnar["windowKeys"] = WINDOW_COLUMNS
+    columnar["cells"] = cells
+    return columnar
+
+
+def warehouse_weeks_coefficients(or_stock, total_sales, or_sales, days) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    셀별 창고재고주수 계수 (compute_weeks_metrics의 창고재고주수와 같은 중간값)
+    
+    창고재고주수(n) = (직영재고 - 주간 직영판매 × n) / 주간 전체판매 (소수점 2자리 반올림)
+    
+    Returns:
+        (직영재고, 주간 전체판매, 주간 직영판매) 배열, 주간 전체판매가 0(또는 NaN)인 셀("판매0")은 NaN
+    """
+    or_stock = np.asarray(or_stock, dtype=np.float64)
+    total_sales = np.asarray(total_sales, dtype=np.float64)
+    or_sales = np.asarray(or_sales, dtype=np.float64)
+    days = np.asarray(days, dtype=np.float64)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weekly_sales = (total_sales / days) * 7
+        or_weekly_sales = np.where(np.isnan(or_sales), 0.0, (or_sales / days) * 7)
+    
+    weekly_sales[weekly_sales == 0] = np.nan
+    return or_stock, weekly_sales, or_weekly_sales
+
+
+def to_warehouse_weeks_dict(result_dict: dict) -> dict:
+    """
+    대시보드 JSON 구조 → 셀별 창고재고주수 계수
+    
+    - 차원 사전과 셀 구성(category/subcategory/year/month)은 컬럼형 출력과 동일
+    - orStock/weeklySales/orWeeklySales[셀]: 직영재고, 주간 전체판매, 주간 직영판매
+      (weeklySales가 null이면 "판매0", 이 셀의 나머지 계수는 0)
+    - n별 표 대신 계수만 저장하므로 크기가 n 범위와 무관하고,
+      대시보드는 utils/warehouse-weeks.ts에서 임의의 n을 (orStock - orWeeklySales × n) / weeklySales로 바로 계산
+    """
+    index = _month_cell_index(result_dict)
+    bases = [_cell_weeks_base(cell) for *_, cell in index["cells"]]
+    base = {
+        col: np.array([cell_base[col] for cell_base in bases], dtype=np.float64)
+        for col in ["월일수", "직영재고금액", "전체판매금액", "직영판매금액"]
+    }
+    or_stock, weekly_sales, or_weekly_sales = warehouse_weeks_coefficients(
+        base["직영재고금액"], base["전체판매금액"], base["직영판매금액"], base["월일수"]
+    )
+    no_sales = np.isnan(weekly_sales)
+    
+    def _values(array: np.ndarray, fill) -> list:
+        values = array.astype(object)
+        values[no_sales] = fill
+        return values.tolist()
+    
+    cells = index["cells"]
+    return {
+        "format": "stock-weeks-warehouse",
+        "version": WAREHOUSE_FORMAT_VERSION,
+        "categories": index["categories"],
+        "subcategories": index["subcategories"],
+        "years": index["years"],
+        "cells": {
+            "category": [c[0] for c in cells],
+            "subcategory": [c[1] for c in cells],
+            "year": [c[2] for c in cells],
+            "month": [c[3] for c in cells],
+        },
+        "orStock": _values(or_stock, 0),
+        "weeklySales": _values(weekly_sales, None),
+        "orWeeklySales": _values(or_weekly_sales, 0),
+    }
+
+
+def _json_bytes(data, compact: bool = False) -> bytes:
+    """JSON 직렬화 (compact=True이면 공백 없이)"""
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_bytes_atomic(output_path, content: bytes):
+    """파일 저장 (임시 파일에 쓴 뒤 교체하여 읽는 쪽이 쓰다 만 파일을 보지 않도록 함)"""
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, output_path)
+
+
+def write_json_atomic(output_path, data, compact: bool = False):
+    """JSON 파일 저장 (write_bytes_atomic 사용)"""
+    write_bytes_atomic(output_path, _json_bytes(data, compact))
+
+
+def write_shards(result_dict: dict, output_path) -> list[dict]:
+    """
+    대시보드 JSON을 (브랜드, 중분류, 연도) 단위 샤드로 저장하고 샤드 매니페스트 갱신
+    
+    - 샤드: shards/<BRAND>/<중분류>/<연도>.json
+      내용은 해당 연도만 담은 CategoryData 조각 {"<연도>": {월...}, "소분류": {소분류: {"<연도>": {월...}}}}
+    - 매니페스트: shards/manifest.json (샤드 경로, 바이트 수, sha256)
+      같은 브랜드의 기존 항목은 교체하고, 더 이상 없는 샤드 파일은 삭제
+    
+    Returns:
+        이번에 저장한 브랜드의 매니페스트 항목 목록
+    """
+    output_path = Path(output_path)
+    brand_key = output_path.stem.removeprefix("stock_weeks_")
+    shards_dir = output_path.parent / SHARDS_DIR_NAME
+    manifest_path = shards_dir / "manifest.json"
+    
+    entries = []
+    for 중분류, cat_data in result_dict.items():
+        for year, months in cat_data.items():
+            if year == "소분류":
+                continue
+            shard = {
+                year: months,
+                "소분류": {
+                    소분류: {year: sub_data[year]}
+                    for 소분류, sub_data in cat_data.get("소분류", {}).items()
+                },
             }
-        
-        category_base_agg[cat_key]["전체재고금액"] += 기초데이터["전체재고금액"]
-        category_base_agg[cat_key]["대리상재고금액"] += 기초데이터["대리상재고금액"]
-        category_base_agg[cat_key]["직영재고금액"] += 기초데이터["직영재고금액"]
-        category_base_agg[cat_key]["전체판매금액"] += 기초데이터["전체판매금액"]
-        category_base_agg[cat_key]["대리상판매금액"] += 기초데이터["대리상판매금액"]
-        category_base_agg[cat_key]["직영판매금액"] += 기초데이터["직영판매금액"]
-    
-    category_data_map = {}
-    for cat_key, base_data in category_base_agg.items():
-        중분류, year, month = cat_key
-        year = int(year)
-        month = int(month)
-        
-        days_in_month = base_data["월일수"]
-        total_stock = base_data["전체재고금액"]
-        agency_stock = base_data["대리상재고금액"]
-        or_stock = base_data["직영재고금액"]
-        total_sales = base_data["전체판매금액"]
-        frs_sales = base_data["대리상판매금액"]
-        or_sales = base_data["직영판매금액"]
-        
-        전체재고주수 = None
-        대리상재고주수 = None
-        창고재고주수 = None
-        
-        if total_sales == 0 or pd.isna(total_sales):
-            전체재고주수 = "판매0"
-        else:
-            weekly_sales = (total_sales / days_in_month) * 7
-            if weekly_sales != 0:
-                전체재고주수 = round(total_stock / weekly_sales, 2)
-            else:
-                전체재고주수 = "판매0"
-        
-        if frs_sales == 0 or pd.isna(frs_sales):
-            대리상재고주수 = "판매0"
-        else:
-            frs_weekly_sales = (frs_sales / days_in_month) * 7
-            if frs_weekly_sales != 0:
-                대리상재고주수 = round(agency_stock / frs_weekly_sales, 2)
+            content = _json_bytes(shard, compact=True)
+            relative_path = f"{brand_key}/{중분류}/{year}.json"
+            shard_path = shards_dir / relative_path
+            shard_path.parent.mkdir(parents=True, exist_ok=True)
+            write_bytes_atomic(shard_path, content)
+            entries.append({
+                "brand": brand_key,
+                "category": 중분류,
+                "year": year,
+                "path": relative_path,
+                "bytes": len(content),
+                "sha256": hashlib.sha256(content).hexdigest(),
+            })
+    
+    manifest = {"version": SHARDS_FORMAT_VERSION, "shards": []}
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    
+    # 이전 실행에서 만들어졌지만 이번에는 없는 샤드 삭제
+    current_paths = {entry["path"] for entry in entries}
+    for entry in manifest["shards"]:
+        if entry["brand"] == brand_key and entry["path"] not in current_paths:
+            (shards_dir / entry["path"]).unlink(missing_ok=True)
+    
+    manifest["version"] = SHARDS_FORMAT_VERSION
+    manifest["shards"] = sorted(
+        [entry for entry in manifest["shards"] if entry["brand"] != brand_key] + entries,
+        key=lambda entry: (entry["brand"], entry["category"], entry["year"])
+    )
+    write_json_atomic(manifest_path, manifest)
+    
+    return entries
+
+
+def select_month_range(
+    months: list[tuple[int, int]],
+    start: tuple[int, int] | None = None,
+    end: tuple[int, int] | None = None
+) -> list[tuple[int, int]]:
+    """(연도, 월) 목록에서 start ~ end 구간만 선택 (양 끝 포함, None이면 제한 없음)"""
+    return [
+        ym for ym in months
+        if (start is None or ym >= start) and (end is None or ym <= end)
+    ]
+
+
+def stock_weeks_dict_to_frame(result_dict: dict, brand: str, n_weeks: int = 25) -> pd.DataFrame:
+    """
+    대시보드 JSON 구조 → 재고주수 결과 DataFrame (build_stock_weeks_dict의 역변환)
+    
+    - 소분류 셀 중 기본값(재고주수 null)이 아닌 월만 행으로 복원
+    - 판매구간 블록이 있으면 WINDOW_COLUMNS로 복원 (판매 누적 구간 모드)
+    - 재고주수는 기초데이터(판매 누적 구간 모드면 구간 값)로 n_weeks 기준 다시 계산
+      (중분류 셀은 build_stock_weeks_dict에서 재계산)
+    
+    Returns:
+        compute_stock_weeks 결과와 같은 컬럼의 DataFrame
+    """
+    key_cols = ["year", "month", "brand", "중분류", "소분류"]
+    window_names = [col.removeprefix("구간") for col in WINDOW_COLUMNS]
+    no_window = (np.nan,) * len(WINDOW_COLUMNS)
+    rows = []
+    for 중분류, category_data in result_dict.items():
+        for 소분류, year_blocks in category_data.get("소분류", {}).items():
+            for year, months in year_blocks.items():
+                for month, cell in months.items():
+                    if cell["전체재고주수"] is None:
+                        continue
+                    base = cell["기초데이터"]
+                    window = cell.get(SALES_WINDOW_KEY)
+                    rows.append(
+                        (int(year), int(month), brand, 중분류, 소분류)
+                        + tuple(base[col] for col in BASE_COLUMNS)
+                        + (tuple(window[name] for name in window_names) if window else no_window)
+                    )
+    
+    if not rows:
+        return pd.DataFrame(columns=key_cols + WEEKS_COLUMNS + BASE_COLUMNS)
+    
+    frame = pd.DataFrame(rows, columns=key_cols + BASE_COLUMNS + WINDOW_COLUMNS)
+    value_cols = BASE_COLUMNS
+    if frame["구간일수"].notna().any():
+        value_cols = BASE_COLUMNS + WINDOW_COLUMNS
+        frame[WINDOW_COLUMNS[:2]] = frame[WINDOW_COLUMNS[:2]].astype(int)
+    metrics = compute_weeks_metrics(
+        frame["전체재고금액"], frame["대리상재고금액"], frame["직영재고금액"],
+        *_weeks_denominators(frame[value_cols]),
+        n_weeks=n_weeks
+    )
+    for name in WEEKS_COLUMNS:
+        frame[name] = metrics[name]
+    return frame[key_cols + WEEKS_COLUMNS + value_cols]
+
+
+def merge_month_slice(
+    existing_df: pd.DataFrame,
+    slice_df: pd.DataFrame,
+    months: list[tuple[int, int]]
+) -> pd.DataFrame:
+    """
+    기존 재고주수 결과에서 months에 해당하는 월을 새로 계산한 결과로 교체
+    (새 결과에 없는 소분류/월은 기존 값도 삭제되어 기본값으로 출력됨)
+    """
+    if existing_df.empty:
+        return slice_df.reset_index(drop=True)
+    
+    replaced = pd.MultiIndex.from_tuples(months, names=["year", "month"]) if months else None
+    keep = existing_df
+    if replaced is not None:
+        existing_months = pd.MultiIndex.from_arrays([existing_df["year"], existing_df["month"]])
+        keep = existing_df[~existing_months.isin(replaced)]
+    
+    frames = [frame for frame in [keep, slice_df] if not frame.empty]
+    if not frames:
+        return existing_df.iloc[0:0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def columnar_output_path(output_path) -> Path:
+    """stock_weeks_<BRAND>.json → stock_weeks_<BRAND>.columnar.json"""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}.columnar.json")
+
+
+def warehouse_output_path(output_path) -> Path:
+    """stock_weeks_<BRAND>.json → stock_weeks_<BRAND>.warehouse.json"""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}.warehouse.json")
+
+
+def delta_output_path(output_path) -> Path:
+    """stock_weeks_<BRAND>.json → stock_weeks_<BRAND>.delta.json"""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}.delta.json")
+
+
+def data_version(content: bytes) -> str:
+    """대시보드 JSON 내용 → 데이터 버전 (sha256 앞자리)"""
+    return hashlib.sha256(content).hexdigest()[:DATA_VERSION_LENGTH]
+
+
+def _year_blocks(result_dict: dict) -> dict[tuple, dict]:
+    """대시보드 JSON 구조 → {(중분류, 소분류 또는 None, 연도): {월: 셀}}"""
+    blocks = {}
+    for 중분류, cat_data in result_dict.items():
+        for key, value in cat_data.items():
+            if key == "소분류":
+                for 소분류, sub_data in value.items():
+                    for year, months in sub_data.items():
+                        blocks[(중분류, 소분류, year)] = months
             else:
-                대리상재고주수 = "판매0"
-        
-        n_weeks_default = 25
-        if or_sales == 0 or pd.isna(or_sales):
-            or_weekly_sales = 0
-        else:
-            or_weekly_sales = (or_sales / days_in_month) * 7
-        
-        직영판매예정재고 = or_weekly_sales * n_weeks_default
-        창고재고 = or_stock - 직영판매예정재고
-        
-        if total_sales == 0 or pd.isna(total_sales):
-            창고재고주수 = "판매0"
+                blocks[(중분류, None, key)] = value
+    return blocks
+
+
+def build_stock_weeks_delta(
+    previous: dict | None,
+    current: dict,
+    base_version: str | None,
+    version: str,
+    brand: str | None = None
+) -> dict:
+    """
+    직전 대시보드 JSON(previous) 대비 바뀐 셀만 담은 델타
+    
+    - set: [중분류, 소분류 또는 null, 연도, 월, 셀] (새로 생긴 연도는 1~12월 전체)
+    - remove: [중분류, 소분류 또는 null, 연도] (없어진 연도 블록)
+    - baseVersion이 대시보드가 가진 dataVersion과 같을 때만 적용 가능,
+      다르면 전체 파일을 다시 받아야 함 (직전 파일이 없으면 baseVersion null, 변경 목록은 비움)
+    """
+    changed, removed = [], []
+    if previous is not None:
+        old_blocks = _year_blocks(previous)
+        new_blocks = _year_blocks(current)
+        for key, months in new_blocks.items():
+            old_months = old_blocks.get(key, {})
+            for month, cell in months.items():
+                if old_months.get(month) != cell:
+                    changed.append([*key, month, cell])
+        removed = [list(key) for key in old_blocks if key not in new_blocks]
+    
+    return {
+        "format": "stock-weeks-delta",
+        "version": DELTA_FORMAT_VERSION,
+        "brand": brand,
+        "baseVersion": base_version,
+        "dataVersion": version,
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "set": changed,
+        "remove": removed,
+    }
+
+
+def write_nested_with_delta(result_dict: dict, output_path, brand: str | None = None) -> dict | None:
+    """
+    대시보드 JSON 저장 + 직전 파일 대비 델타(stock_weeks_<BRAND>.delta.json) 저장
+    (직전 파일은 덮어쓰기 전에 읽음, 델타는 본 파일 교체 후 저장하여 델타가 가리키는 버전이 항상 존재)
+    내용이 직전 파일과 같으면 두 파일 모두 그대로 두어, 변경 없는 재실행이 마지막 델타를 빈 델타로 덮어쓰지 않음
+    
+    Returns:
+        저장한 델타 (변경 없어 저장하지 않았으면 None)
+    """
+    output_path = Path(output_path)
+    content = _json_bytes(result_dict)
+    version = data_version(content)
+    delta_path = delta_output_path(output_path)
+    
+    previous = base_version = None
+    if output_path.exists():
+        previous_content = output_path.read_bytes()
+        base_version = data_version(previous_content)
+        if base_version == version and delta_path.exists():
+            return None
+        try:
+            previous = json.loads(previous_content)
+        except json.JSONDecodeError:
+            base_version = None
+    
+    write_bytes_atomic(output_path, content)
+    
+    delta = build_stock_weeks_delta(previous, json.loads(content), base_version, version, brand)
+    write_json_atomic(delta_path, delta, compact=True)
+    return delta
+
+
+def build_brand_summary(result_dict: dict, years: int = SUMMARY_YEARS) -> dict:
+    """
+    대시보드 JSON 구조 → 홈 화면용 브랜드 요약 (홈 카드가 읽는 월만)
+    
+    - years: 홈 화면 연도 선택 대상, 데이터가 있는 최근 N개 연도
+    - categories: 중분류 → 연도 → 월 → {"기초데이터": ...} (소분류 블록 제외)
+      - 선택 대상 연도는 데이터가 있는 모든 월
+      - 그 전 연도는 카드의 전년 동월 비교에 쓰이는 월(다음 연도에 데이터가 있는 월)만
+    - 홈 카드는 기초데이터로 재고주수를 다시 계산하므로 재고주수 값은 넣지 않음
+    - 데이터가 없는 월(기본값 셀)은 생략
+    """
+    data_cells = {}
+    for 중분류, cat_data in result_dict.items():
+        for year, months in cat_data.items():
+            if year == "소분류":
+                continue
+            for month, cell in months.items():
+                if not all(cell[col] is None for col in WEEKS_COLUMNS):
+                    data_cells.setdefault(중분류, {}).setdefault(year, {})[month] = cell
+    
+    data_years = sorted({year for year_blocks in data_cells.values() for year in year_blocks})
+    selectable = data_years[-years:]
+    # (연도 → 남길 월): 선택 대상 연도는 전체 월, 전년은 선택 대상 연도에 데이터가 있는 월
+    keep_months = {year: None for year in selectable}
+    for year in selectable:
+        previous = str(int(year) - 1)
+        if previous not in keep_months:
+            keep_months[previous] = {
+                month for year_blocks in data_cells.values() for month in year_blocks.get(year, {})
+            }
+    
+    categories = {}
+    for 중분류 in result_dict:
+        year_blocks = {}
+        for year, months in data_cells.get(중분류, {}).items():
+            if year not in keep_months:
+                continue
+            cells = {
+                month: {"기초데이터": cell["기초데이터"]} for month, cell in months.items()
+                if keep_months[year] is None or month in keep_months[year]
+            }
+            if cells:
+                year_blocks[year] = cells
+        categories[중분류] = year_blocks
+    return {"years": selectable, "categories": categories}
+
+
+def write_summary_json(summaries: dict[str, dict], out_dir, n_weeks: int = 25) -> Path:
+    """
+    브랜드 요약 → stock_weeks_summary.json (홈 화면용, 공백 없는 JSON)
+    이번에 출력하지 않은 브랜드는 기존 파일의 요약을 유지
+    
+    Args:
+        summaries: {브랜드: build_brand_summary 결과}
+    """
+    summary_path = Path(out_dir) / SUMMARY_FILE_NAME
+    brands = {}
+    if summary_path.exists():
+        with open(summary_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        # 형식 버전이 다른 기존 요약은 섞지 않음 (출력하지 않은 브랜드는 다음 전체 실행 때 다시 채워짐)
+        if previous.get("version") == SUMMARY_FORMAT_VERSION:
+            brands = previous.get("brands", {})
         else:
-            weekly_sales = (total_sales / days_in_month) * 7
-            if weekly_sales != 0:
-                창고재고주수 = round(창고재고 / weekly_sales, 2)
-            else:
-                창고재고주수 = "판매0"
-        
-        category_data_map[cat_key] = {
-            "전체재고주수": 전체재고주수,
-            "대리상재고주수": 대리상재고주수,
-            "창고재고주수": 창고재고주수,
-            "기초데이터": base_data
-        }
+            print(f"⚠️  [경고] {summary_path.name}의 형식 버전이 달라 기존 브랜드 요약을 사용하지 않습니다.")
+    brands.update(summaries)
+    
+    summary = {
+        "format": "stock-weeks-summary",
+        "version": SUMMARY_FORMAT_VERSION,
+        "nWeeks": n_weeks,
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "brands": {brand: brands[brand] for brand in TARGET_BRANDS if brand in brands},
+    }
+    write_json_atomic(summary_path, summary, compact=True)
+    return summary_path
+
+
+def export_json(
+    df: pd.DataFrame,
+    output_path: str = "stock_weeks_result.json",
+    n_weeks: int = 25,
+    formats: list[str] | tuple[str, ...] = ("nested",),
+    brand: str | None = None
+):
+    """
+    결과를 JSON 형태로 출력
+    항상 1~12월 전체 월 키를 생성하며, 데이터가 없는 월은 기본값으로 채움
+    중분류 창고재고주수는 n_weeks(직영 판매예정 주수) 기준으로 계산
     
-    years = sorted(set(int(row["year"]) for _, row in df.iterrows()))
-    categories = sorted(set(row["중분류"] for _, row in df.iterrows()))
-    subcategories_by_category = defaultdict(set)
-    for _, row in df.iterrows():
-        subcategories_by_category[row["중분류"]].add(row["소분류"])
+    formats:
+        - "nested": 기존 대시보드 JSON (output_path)
+          + 직전 실행 대비 바뀐 셀만 담은 델타 (stock_weeks_<BRAND>.delta.json)
+        - "columnar": 컬럼형 압축 JSON (stock_weeks_<BRAND>.columnar.json)
+        - "shards": (브랜드, 중분류, 연도)별 샤드 + 매니페스트 (shards/manifest.json)
+        - "warehouse": 셀별 창고재고주수 계수 (stock_weeks_<BRAND>.warehouse.json)
     
-    result_dict = {}
+    brand: 실행 리포트의 단계 기록에 표시할 브랜드명
     
-    for 중분류 in categories:
-        result_dict[중분류] = {}
-        
-        for year in years:
-            year_str = str(year)
-            year_result = {}
-            
-            for month in range(1, 13):
-                month_str = str(month)
-                year_result[month_str] = create_default_month_data(year, month)
-                
-                key = (중분류, year, month)
-                if key in category_data_map:
-                    year_result[month_str] = category_data_map[key]
-            
-            result_dict[중분류][year_str] = year_result
-        
-        if 중분류 in subcategories_by_category:
-            result_dict[중분류]["소분류"] = {}
-            
-            for 소분류 in sorted(subcategories_by_category[중분류]):
-                result_dict[중분류]["소분류"][소분류] = {}
-                
-                for year in years:
-                    year_str = str(year)
-                    year_result = {}
-                    
-                    for month in range(1, 13):
-                        month_str = str(month)
-                        year_result[month_str] = create_default_month_data(year, month)
-                        
-                        sub_key = (중분류, 소분류, year, month)
-                        if sub_key in subcategory_data_map:
-                            year_result[month_str] = subcategory_data_map[sub_key]
-                        elif sub_key in subcategory_base_data_map:
-                            year_result[month_str]["기초데이터"] = subcategory_base_data_map[sub_key]
-                    
-                    result_dict[중분류]["소분류"][소분류][year_str] = year_result
+    Returns:
+        대시보드 JSON 구조 (출력할 데이터가 없으면 None)
+    """
+    for output_format in formats:
+        if output_format not in EXPORT_FORMATS:
+            raise ValueError(f"출력 형식은 {EXPORT_FORMATS} 중 하나여야 합니다: {output_format}")
+    
+    if df.empty:
+        print("출력할 데이터가 없습니다.")
+        return
+    
+    with track_stage("export_build", None, brand=brand, rows_in=len(df), profile=True):
+        result_dict = build_stock_weeks_dict(df, n_weeks)
     
     if result_dict:
         first_category = list(result_dict.keys())[0]
@@ -726,12 +3268,279 @@ def export_json(df: pd.DataFrame, output_path: str = "stock_weeks_result.json"):
                 else:
                     print(f"[경고] 월 키가 12개가 아닙니다: {len(months_in_result)}개")
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(result_dict, f, ensure_ascii=False, indent=2)
+    if "nested" in formats:
+        with track_stage("export_write", "nested", brand=brand, profile=True):
+            delta = write_nested_with_delta(result_dict, output_path, brand)
+        if delta is None:
+            print(f"결과가 {output_path}와 같아 저장하지 않았습니다. (직전 델타 {delta_output_path(output_path).name} 유지)")
+        elif delta["baseVersion"] is None:
+            print(f"결과가 {output_path}에 저장되었습니다.")
+            print(f"  - 델타: 직전 파일 없음 (버전 {delta['dataVersion']}, 대시보드는 전체 파일 로드)")
+        else:
+            print(f"결과가 {output_path}에 저장되었습니다.")
+            print(
+                f"  - 델타: {delta['baseVersion']} → {delta['dataVersion']}, "
+                f"변경 셀 {len(delta['set'])}개, 삭제 연도 {len(delta['remove'])}개 ({delta_output_path(output_path).name})"
+            )
+        print(f"  - 각 연도별로 1~12월 전체 월 키가 생성됩니다.")
+        print(f"  - 데이터가 없는 월은 기본값(null 및 기초데이터 0)으로 채워집니다.")
+    
+    if "columnar" in formats:
+        columnar_path = columnar_output_path(output_path)
+        with track_stage("export_write", "columnar", brand=brand, profile=True):
+            write_json_atomic(columnar_path, to_columnar_dict(result_dict), compact=True)
+        print(f"컬럼형 결과가 {columnar_path}에 저장되었습니다.")
+    
+    if "shards" in formats:
+        with track_stage("export_write", "shards", brand=brand, profile=True) as record:
+            shard_entries = write_shards(result_dict, output_path)
+            record["rows_out"] += len(shard_entries)
+        print(f"샤드 {len(shard_entries)}개가 {Path(output_path).parent / SHARDS_DIR_NAME}에 저장되었습니다.")
+    
+    if "warehouse" in formats:
+        warehouse_path = warehouse_output_path(output_path)
+        with track_stage("export_write", "warehouse", brand=brand, profile=True):
+            write_json_atomic(warehouse_path, to_warehouse_weeks_dict(result_dict), compact=True)
+        print(f"창고재고주수 계수가 {warehouse_path}에 저장되었습니다.")
+    
+    return result_dict
+
+
+def write_brand_outputs(
+    results: dict[str, pd.DataFrame],
+    brands: list[str],
+    out_dir: Path,
+    months: list[tuple[int, int]],
+    partial: bool,
+    n_weeks: int = 25,
+    formats: list[str] | tuple[str, ...] = ("nested",),
+    keep_years: int | None = None,
+    since: tuple[int, int] | None = None,
+    sales_window: int = 1
+):
+    """
+    브랜드별 재고주수 결과 → stock_weeks_<BRAND>.json (및 추가 형식) 출력
+    + 홈 화면용 요약 stock_weeks_summary.json 갱신
+    
+    partial=True이면 기존 JSON에서 months만 새 결과로 교체하고 나머지 월은 기존 값 유지
+    (보관 기간은 병합 결과 전체에 적용, 모든 파일은 임시 파일 → 교체 방식으로 저장)
+    기존 JSON의 판매 누적 구간이 sales_window와 다르면 병합하지 않고 ValueError (전체 재계산 필요)
+    """
+    summaries = {}
+    for brand in brands:
+        print(f"\n{'='*50}")
+        print(f"{brand} 브랜드 결과 출력")
+        print(f"{'='*50}\n")
+        
+        result_df = results[brand]
+        output_file = out_dir / f"stock_weeks_{brand.replace(' ', '_')}.json"
+        
+        if partial and output_file.exists():
+            with open(output_file, "r", encoding="utf-8") as f:
+                existing = json.load(f)
+            existing_window = stock_weeks_sales_window(existing)
+            if existing_window is not None and existing_window != sales_window:
+                raise ValueError(
+                    f"{output_file.name}의 판매 누적 구간({existing_window}개월)이 이번 실행({sales_window}개월)과 달라 "
+                    f"병합할 수 없습니다. --from/--to 없이 전체 재계산하세요."
+                )
+            existing_df = stock_weeks_dict_to_frame(existing, brand, n_weeks)
+            result_df = merge_month_slice(existing_df, result_df, months)
+            
+            # 보관 기간은 병합 결과 전체에 적용
+            if not result_df.empty and (keep_years is not None or since is not None):
+                kept = apply_retention(
+                    sorted(set(zip(result_df["year"], result_df["month"]))), keep_years, since
+                )
+                result_df = result_df[
+                    pd.MultiIndex.from_arrays([result_df["year"], result_df["month"]]).isin(kept)
+                ]
+            print(f"기존 {output_file.name}에 {len(months)}개월 병합")
+        
+        if not result_df.empty:
+            result_dict = export_json(
+                result_df,
+                str(output_file),
+                n_weeks=n_weeks,
+                formats=formats,
+                brand=brand
+            )
+            with track_stage("export_build", "summary", brand=brand):
+                summaries[brand] = build_brand_summary(result_dict)
+            print(f"\n{brand} 처리 완료: {len(result_df)}건")
+            print(f"생성된 파일: {output_file}")
+            print(f"  → {out_dir} 폴더에 저장되었습니다.")
+        else:
+            print(f"\n{brand} 처리 완료: 데이터 없음")
+    
+    if summaries:
+        with track_stage("export_write", "summary"):
+            summary_path = write_summary_json(summaries, out_dir, n_weeks)
+        print(f"\n홈 화면 요약({len(summaries)}개 브랜드)이 {summary_path}에 저장되었습니다.")
+
+
+WATCH_INTERVAL_SECONDS = 5.0
+
+
+def snapshot_source_files() -> dict[Path, tuple[int, float]]:
+    """입력 폴더(대리상재고/판매매출)의 CSV 파일별 (크기, 수정시각)"""
+    snapshot = {}
+    for folder in [AGENCY_STOCK_PATH, SALES_PATH]:
+        for file_path in folder.glob("*.csv"):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                # 목록을 읽은 뒤 삭제/이동된 파일
+                continue
+            snapshot[file_path] = (stat.st_size, stat.st_mtime)
+    return snapshot
+
+
+def source_file_month(file_path: Path) -> tuple[int, int] | None:
+    """입력 파일명(YYYY.MM.csv / YYYY.MM.DD.csv) → (연도, 월), 형식이 다르면 None"""
+    parts = file_path.stem.split(".")
+    if len(parts) not in (2, 3) or not all(part.isdigit() for part in parts):
+        return None
+    year, month = int(parts[0]), int(parts[1])
+    return (year, month) if 1 <= month <= 12 else None
+
+
+def affected_months(
+    changed: list[tuple[int, int]],
+    available: list[tuple[int, int]],
+    sales_window: int = 1
+) -> list[tuple[int, int]]:
+    """
+    입력 파일이 바뀐 월 → 다시 계산할 월
+    (sales_window > 1이면 바뀐 월을 판매 누적 구간에 포함하는 이후 월도 포함, available에 있는 월만)
+    """
+    periods = {year * 12 + month - 1 for year, month in changed}
+    months = set(changed)
+    months.update(
+        (year, month) for year, month in available
+        if any(0 < year * 12 + month - 1 - p < sales_window for p in periods)
+    )
+    return sorted(months)
+
+
+def write_anomaly_report(
+    out_dir: Path,
+    keep_years: int | None = None,
+    since: tuple[int, int] | None = None
+) -> pd.DataFrame:
+    """
+    큐브 집계로 이상치를 검사하여 out_dir/ANOMALY_REPORT_NAME에 저장하고 요약 출력
+    
+    리포트는 파일 하나를 통째로 교체하므로, 부분 재계산(--from/--to, --brands)이나 감시 모드에서도
+    이번에 다시 읽은 월/브랜드만이 아니라 보관 기간 전체 월 × 전체 브랜드로 검사
+    (큐브 조회만 하므로 CSV는 다시 읽지 않음, 큐브에 없는 월은 이상치 없이 지나감)
+    
+    Returns:
+        이상치 DataFrame
+    """
+    brands = TARGET_BRANDS
+    months = apply_retention(discover_months(), keep_years, since)
+    conn = open_cube()
+    try:
+        anomalies = check_anomalies(conn, brands, months)
+    finally:
+        conn.close()
+    write_json_atomic(out_dir / ANOMALY_REPORT_NAME, build_anomaly_report(anomalies, months))
+    if anomalies.empty:
+        print("\n이상치 없음 (직전 월 기준선 대비)")
+    else:
+        counts = ", ".join(f"{year}.{month:02d} {n}건" for (year, month), n in anomalies.groupby(["year", "month"]).size().items())
+        print(f"\n⚠️  [경고] 이상치 {len(anomalies)}건 감지(유지됨): {counts}")
+        print(f"   상세 내용은 {out_dir / ANOMALY_REPORT_NAME} 참고")
+    return anomalies
+
+
+def watch_sources(
+    brands: list[str],
+    out_dir: Path,
+    n_weeks: int = 25,
+    interval: float = WATCH_INTERVAL_SECONDS,
+    workers: int = 1,
+    sales_window: int = 1,
+    formats: list[str] | tuple[str, ...] = ("nested",),
+    keep_years: int | None = None,
+    since: tuple[int, int] | None = None,
+    max_updates: int | None = None
+) -> int:
+    """
+    입력 폴더 감시 모드: CSV가 추가/변경/삭제되면 그 월만 다시 집계하여 브랜드별 JSON의 해당 월을 교체
+    
+    - 폴링 방식 (interval초마다 파일 크기/수정시각 비교, 별도 패키지 없이 공유 폴더에서도 동작)
+    - 복사 중인 파일은 크기/수정시각이 한 주기 동안 그대로일 때 반영
+    - 집계는 큐브 기준 (바뀐 파일만 다시 읽음), JSON은 write_brand_outputs(partial=True)로 병합 후 원자적 교체
+    - 반영 후 이상치 리포트는 보관 기간 전체 월 × 전체 브랜드로 다시 검사, 홈 화면 요약은 write_brand_outputs가 함께 갱신
+    - 반영 중 오류(파일 잠김, 큐브 DB 잠김, 스키마 불일치 등)가 나면 오류 내용을 출력하고 다음 주기에 다시 시도
+    
+    Args:
+        max_updates: 이 횟수만큼 반영하면 종료 (None이면 Ctrl+C까지 계속)
+    
+    Returns:
+        반영 횟수
+    """
+    previous = snapshot_source_files()
+    settling: set[Path] = set()
+    updates = 0
+    print(f"\n[감시] {AGENCY_STOCK_PATH}, {SALES_PATH} 폴더 감시 시작 ({interval:g}초 간격, Ctrl+C로 종료)")
     
-    print(f"결과가 {output_path}에 저장되었습니다.")
-    print(f"  - 각 연도별로 1~12월 전체 월 키가 생성됩니다.")
-    print(f"  - 데이터가 없는 월은 기본값(null 및 기초데이터 0)으로 채워집니다.")
+    try:
+        while max_updates is None or updates < max_updates:
+            time.sleep(interval)
+            current = snapshot_source_files()
+            changed = {path for path in previous.keys() | current.keys() if previous.get(path) != current.get(path)}
+            previous = current
+            
+            ready = settling - changed
+            settling = changed
+            months = sorted({month for month in map(source_file_month, ready) if month is not None})
+            if not months:
+                continue
+            # 파일이 모두 삭제된 월도 다시 계산해야 큐브/JSON에서 빠짐 (보관 기간 밖의 월은 제외)
+            available = discover_months()
+            kept = set(apply_retention(sorted(set(available) | set(months)), keep_years, since))
+            months = [month for month in affected_months(months, available, sales_window) if month in kept]
+            if not months:
+                continue
+            
+            started = time.perf_counter()
+            print(f"\n[감시] 변경 감지: {', '.join(f'{y}.{m:02d}' for y, m in months)} 다시 계산")
+            try:
+                results = preprocess_brands(
+                    brands,
+                    n_weeks=n_weeks,
+                    workers=workers,
+                    months=months,
+                    sales_window=sales_window
+                )
+                write_brand_outputs(
+                    results,
+                    brands,
+                    out_dir,
+                    months,
+                    partial=True,
+                    n_weeks=n_weeks,
+                    formats=formats,
+                    keep_years=keep_years,
+                    since=since,
+                    sales_window=sales_window
+                )
+                write_anomaly_report(out_dir, keep_years, since)
+            except Exception as e:
+                # 감시는 장시간 실행되므로 어떤 오류든 기록만 하고 계속 (예: 다른 실행이 cube.sqlite를 잡고 있는 경우)
+                print(f"\n⚠️  [감시] 반영 실패, 다음 주기에 다시 시도합니다: {type(e).__name__}: {e}")
+                traceback.print_exc()
+                settling |= ready
+                continue
+            
+            updates += 1
+            print(f"\n[감시] 반영 완료 ({time.perf_counter() - started:.1f}초)")
+    except KeyboardInterrupt:
+        print("\n[감시] 종료")
+    return updates
 
 
 if __name__ == "__main__":
@@ -742,23 +3551,187 @@ if __name__ == "__main__":
        - public/data/stock_weeks_MLB.json
        - public/data/stock_weeks_MLB_KIDS.json
        - public/data/stock_weeks_DISCOVERY.json
+    3. 일부 월/브랜드만 다시 계산하여 기존 JSON에 반영:
+       python preprocess_stock_weeks.py --brands MLB --from 2025.05 --to 2025.05
     
     변경 사항:
     - 직영재고 폴더(C:\2.대시보드(파일)\재고주수\직영재고)는 더 이상 사용하지 않음
     - 대리상재고 폴더의 CSV 파일에서 Channel 2 기준으로 FRS/OR 분리하여 사용
     """
-    for brand in TARGET_BRANDS:
-        print(f"\n{'='*50}")
-        print(f"{brand} 브랜드 처리 시작")
-        print(f"{'='*50}\n")
-        
-        result_df = preprocess_all(brand, n_weeks=25)
-        
-        if not result_df.empty:
-            output_file = DATA_DIR / f"stock_weeks_{brand.replace(' ', '_')}.json"
-            export_json(result_df, str(output_file))
-            print(f"\n{brand} 처리 완료: {len(result_df)}건")
-            print(f"생성된 파일: {output_file}")
-            print(f"  → public/data 폴더에 저장되었습니다.")
-        else:
-            print(f"\n{brand} 처리 완료: 데이터 없음")
+    parser = argparse.ArgumentParser(description="재고주수 대시보드 전처리")
+    parser.add_argument(
+        "--base-path",
+        type=Path,
+        default=None,
+        help=f"대리상재고/판매매출 폴더가 있는 상위 폴더 (기본값: {BASE_PATH})"
+    )
+    parser.add_argument(
+        "--brands",
+        nargs="+",
+        choices=TARGET_BRANDS,
+        default=TARGET_BRANDS,
+        help="처리할 브랜드 (기본값: 전체)"
+    )
+    parser.add_argument(
+        "--from",
+        dest="from_month",
+        type=parse_year_month,
+        default=None,
+        help="이 연월(YYYY.MM)부터만 다시 계산하여 기존 JSON에 병합"
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_month",
+        type=parse_year_month,
+        default=None,
+        help="이 연월(YYYY.MM)까지만 다시 계산하여 기존 JSON에 병합"
+    )
+    parser.add_argument(
+        "--n-weeks",
+        type=int,
+        default=25,
+        help="창고재고주수 계산 시 직영 판매예정 주수 (기본값: 25)"
+    )
+    parser.add_argument(
+        "--sales-window",
+        type=int,
+        default=1,
+        metavar="N",
+        help="재고주수 분모를 직전 N개월(당월 포함) 판매 평균으로 계산 (기본값: 1, 당월 판매)"
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        default=DATA_DIR,
+        help=f"JSON 출력 폴더 (기본값: {DATA_DIR})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="월별 처리를 병렬로 실행할 프로세스 수 (기본값: 1, 직렬)"
+    )
+    parser.add_argument(
+        "--format",
+        dest="formats",
+        nargs="+",
+        choices=EXPORT_FORMATS,
+        default=["nested"],
+        help="출력 형식 (nested: 기존 JSON, columnar: 컬럼형 압축 JSON, shards: 중분류/연도별 샤드, "
+             "warehouse: 창고재고주수 계수, 여러 개 지정 가능)"
+    )
+    parser.add_argument(
+        "--keep-years",
+        type=int,
+        default=None,
+        help="최근 N개 연도만 처리/출력 (예: 2 → 최신 연도와 그 전 연도)"
+    )
+    parser.add_argument(
+        "--since",
+        type=parse_year_month,
+        default=None,
+        help="이 연월(YYYY.MM)부터만 처리/출력 (예: 2024.01)"
+    )
+    parser.add_argument(
+        "--sidecar-index",
+        action="store_true",
+        help="집계하는 원본 파일마다 사이드카 인덱스(.cache/sidecar: 그룹별 행 번호 범위, 이상치 행 번호/바이트 위치) 저장"
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=None,
+        metavar="MB",
+        help="프로세스당 메모리(RSS) 상한(MB): 청크 크기를 예산에 맞춰 조정하고 초과 시 오류로 중단 (--workers N이면 최대 약 N+1배)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="처리 후 입력 폴더를 감시하여 CSV가 바뀐 월만 다시 계산해 JSON에 반영 (Ctrl+C로 종료)"
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=WATCH_INTERVAL_SECONDS,
+        metavar="SECONDS",
+        help=f"--watch의 폴더 확인 간격(초) (기본값: {WATCH_INTERVAL_SECONDS:g})"
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=None,
+        help="단계별(월별 로딩/계산, 브랜드별 출력) cProfile 결과(.prof)를 저장할 폴더"
+    )
+    args = parser.parse_args()
+    
+    if args.from_month and args.to_month and args.from_month > args.to_month:
+        parser.error("--from은 --to보다 이후일 수 없습니다.")
+    if args.sales_window < 1:
+        parser.error("--sales-window은 1 이상이어야 합니다.")
+    if args.watch_interval <= 0:
+        parser.error("--watch-interval은 0보다 커야 합니다.")
+    
+    PROFILE_DIR = args.profile_dir
+    WRITE_SIDECAR_INDEX = args.sidecar_index
+    MEMORY_BUDGET_MB = args.memory_budget
+    if args.base_path is not None:
+        configure_paths(args.base_path)
+    run_started = time.time()
+    run_wall_start = time.perf_counter()
+    n_weeks = args.n_weeks
+    out_dir = args.out_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+    
+    # --from/--to 지정 시 해당 구간만 다시 읽고, 나머지 월은 기존 JSON 값을 유지
+    partial = args.from_month is not None or args.to_month is not None
+    months = select_month_range(
+        apply_retention(discover_months(), args.keep_years, args.since),
+        args.from_month,
+        args.to_month
+    )
+    if partial:
+        print(f"부분 재계산: {len(months)}개월 ({', '.join(f'{y}.{m:02d}' for y, m in months) or '해당 월 없음'})")
+    
+    # 월별 CSV는 한 번만 읽고 브랜드별 결과로 분배
+    results = preprocess_brands(
+        args.brands,
+        n_weeks=n_weeks,
+        workers=args.workers,
+        months=months,
+        sales_window=args.sales_window
+    )
+    
+    # 큐브 집계를 직전 월 기준선과 비교한 이상치 리포트 (출력 JSON과 같은 폴더, 보관 기간 전체 월 × 전체 브랜드)
+    write_anomaly_report(out_dir, args.keep_years, args.since)
+    
+    write_brand_outputs(
+        results,
+        args.brands,
+        out_dir,
+        months,
+        partial,
+        n_weeks=n_weeks,
+        formats=args.formats,
+        keep_years=args.keep_years,
+        since=args.since,
+        sales_window=args.sales_window
+    )
+    
+    # 단계별 시간/메모리 실행 리포트 (출력 JSON과 같은 폴더)
+    report_args = {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()}
+    report = build_run_report(run_started, time.perf_counter() - run_wall_start, report_args)
+    write_json_atomic(out_dir / RUN_REPORT_NAME, report)
+    print(f"\n실행 리포트가 {out_dir / RUN_REPORT_NAME}에 저장되었습니다. (총 {report['wall_seconds']:.1f}초)")
+    
+    if args.watch:
+        watch_sources(
+            args.brands,
+            out_dir,
+            n_weeks=n_weeks,
+            interval=args.watch_interval,
+            workers=args.workers,
+            sales_window=args.sales_window,
+            formats=args.formats,
+            keep_years=args.keep_years,
+            since=args.since
+        )
@@ -0,0 +1,5 @@
+#!/bin/sh
+# Linux 배치 서버용 실행 스크립트 (옵션은 그대로 전달)
+# 예: ./run_preprocess.sh --base-path /data/재고주수 --brands MLB --from 2025.05 --to 2025.05
+cd "$(dirname "$0")" || exit 1
+exec python3 preprocess_stock_weeks.py "$@"
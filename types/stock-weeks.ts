@@ -13,12 +13,22 @@ export interface BaseData {
   직영판매금액: number;
 }
 
+// 판매 누적 구간 (--sales-window N으로 만든 JSON에만 있음, 재고주수 분모)
+export interface SalesWindowData {
+  개월수: number;
+  일수: number;
+  전체판매금액: number;
+  대리상판매금액: number;
+  직영판매금액: number;
+}
+
 // 월별 재고주수 데이터
 export interface MonthData {
   전체재고주수: number | string | null;
   대리상재고주수: number | string | null;
   창고재고주수: number | string | null;
-  기초데이터?: BaseData;
+  기초데이터?: BaseData; // 항상 당월 값
+  판매구간?: SalesWindowData;
 }
 
 // 연도별 데이터
@@ -45,6 +55,26 @@ export interface StockWeeksData {
 // 브랜드 타입
 export type Brand = "MLB" | "MLB KIDS" | "DISCOVERY";
 
+// 홈 화면용 월 데이터 (기초데이터만, 재고주수는 calcWeeksFromBase로 계산)
+export type SummaryMonthData = Pick<MonthData, "기초데이터">;
+
+// 홈 화면용 브랜드 요약 (홈 카드가 읽는 월만)
+export interface BrandSummaryData {
+  years: string[]; // 연도 선택 대상 (그 외 연도는 전년 동월 비교용 월만 포함)
+  categories: {
+    [category: string]: { [year: string]: Record<string, SummaryMonthData> }; // 중분류 → 연도 → 월 (소분류 제외, 데이터 없는 월 생략)
+  };
+}
+
+// 홈 화면용 요약 JSON 구조 (stock_weeks_summary.json)
+export interface StockWeeksSummary {
+  format: "stock-weeks-summary";
+  version: number;
+  nWeeks: number;
+  generatedAt: string;
+  brands: Partial<Record<Brand, BrandSummaryData>>;
+}
+
 // 중분류 한글 매핑
 export const CATEGORY_NAMES: Record<string, string> = {
   Shoes: "슈즈",
@@ -2,10 +2,29 @@
  * 기초데이터로부터 재고주수 계산 헬퍼 함수
  */
 
-import { BaseData } from "@/types/stock-weeks";
+import { BaseData, MonthData } from "@/types/stock-weeks";
 
 export type WeeksKind = "전체재고주수" | "대리상재고주수" | "창고재고주수";
 
+/**
+ * 월 데이터의 재고주수 계산 기준
+ * 판매구간(판매 누적 구간 모드)이 있으면 판매금액/월일수를 구간 값으로 바꾼 기초데이터, 없으면 기초데이터 그대로
+ */
+export function weeksBaseData(monthData: MonthData | undefined): BaseData | undefined {
+  const baseData = monthData?.기초데이터;
+  const salesWindow = monthData?.판매구간;
+  if (!baseData || !salesWindow) {
+    return baseData;
+  }
+  return {
+    ...baseData,
+    월일수: salesWindow.일수,
+    전체판매금액: salesWindow.전체판매금액,
+    대리상판매금액: salesWindow.대리상판매금액,
+    직영판매금액: salesWindow.직영판매금액,
+  };
+}
+
 /**
  * 기초데이터를 기반으로 재고주수를 계산
  * @param baseData - 기초데이터
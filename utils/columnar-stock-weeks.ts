@@ -0,0 +1,181 @@
+/**
+ * 컬럼형 재고주수 JSON(stock_weeks_<BRAND>.columnar.json) 로더
+ * preprocess_stock_weeks.py의 --format columnar 출력을 StockWeeksData 형태로 복원합니다.
+ */
+
+import {
+  BaseData,
+  CategoryData,
+  MonthData,
+  StockWeeksData,
+  SubCategoryData,
+  YearData,
+} from "@/types/stock-weeks";
+
+type WeeksValue = number | string | null;
+
+// 컬럼형 JSON 구조
+export interface ColumnarStockWeeks {
+  format: "stock-weeks-columnar";
+  version: number;
+  categories: string[];
+  subcategories: string[];
+  years: string[];
+  subcategoriesByCategory: number[][];
+  weeksKeys: string[];
+  baseKeys: string[];
+  windowKeys?: string[]; // 판매 누적 구간 모드에서만 (구간* 배열이 함께 있음)
+  cells: {
+    category: number[];
+    subcategory: number[]; // -1이면 중분류 셀
+    year: number[];
+    month: number[];
+    전체재고주수: WeeksValue[];
+    대리상재고주수: WeeksValue[];
+    창고재고주수: WeeksValue[];
+    월일수: number[];
+    전체재고금액: number[];
+    대리상재고금액: number[];
+    직영재고금액: number[];
+    전체판매금액: number[];
+    대리상판매금액: number[];
+    직영판매금액: number[];
+    구간개월수?: number[];
+    구간일수?: number[];
+    구간전체판매금액?: number[];
+    구간대리상판매금액?: number[];
+    구간직영판매금액?: number[];
+  };
+}
+
+/**
+ * 데이터가 없는 월의 기본값 (전처리 create_default_month_data와 동일)
+ */
+function createDefaultMonthData(year: string, month: number): MonthData {
+  return {
+    전체재고주수: null,
+    대리상재고주수: null,
+    창고재고주수: null,
+    기초데이터: {
+      월일수: new Date(Number(year), month, 0).getDate(),
+      전체재고금액: 0,
+      대리상재고금액: 0,
+      직영재고금액: 0,
+      전체판매금액: 0,
+      대리상판매금액: 0,
+      직영판매금액: 0,
+    },
+  };
+}
+
+/**
+ * 셀 인덱스 목록 → 연도별 1~12월 데이터
+ */
+function buildYearBlocks(payload: ColumnarStockWeeks, cellIndexes: number[]): SubCategoryData {
+  const { years, cells } = payload;
+  const blocks: SubCategoryData = {};
+
+  years.forEach((year) => {
+    const yearData: YearData = {};
+    for (let month = 1; month <= 12; month++) {
+      yearData[String(month)] = createDefaultMonthData(year, month);
+    }
+    blocks[year] = yearData;
+  });
+
+  cellIndexes.forEach((i) => {
+    const baseData: BaseData = {
+      월일수: cells.월일수[i],
+      전체재고금액: cells.전체재고금액[i],
+      대리상재고금액: cells.대리상재고금액[i],
+      직영재고금액: cells.직영재고금액[i],
+      전체판매금액: cells.전체판매금액[i],
+      대리상판매금액: cells.대리상판매금액[i],
+      직영판매금액: cells.직영판매금액[i],
+    };
+    const monthData: MonthData = {
+      전체재고주수: cells.전체재고주수[i],
+      대리상재고주수: cells.대리상재고주수[i],
+      창고재고주수: cells.창고재고주수[i],
+      기초데이터: baseData,
+    };
+    if (cells.구간일수) {
+      monthData.판매구간 = {
+        개월수: cells.구간개월수![i],
+        일수: cells.구간일수[i],
+        전체판매금액: cells.구간전체판매금액![i],
+        대리상판매금액: cells.구간대리상판매금액![i],
+        직영판매금액: cells.구간직영판매금액![i],
+      };
+    }
+    blocks[years[cells.year[i]]][String(cells.month[i])] = monthData;
+  });
+
+  return blocks;
+}
+
+/**
+ * 컬럼형 JSON → StockWeeksData
+ * 셀 인덱스만 중분류별로 미리 나누어 두고, 중분류 데이터는 처음 접근할 때 생성합니다.
+ */
+export function fromColumnarStockWeeks(payload: ColumnarStockWeeks): StockWeeksData {
+  const { categories, subcategories, subcategoriesByCategory, cells } = payload;
+
+  // 중분류별 → (소분류 인덱스 → 셀 인덱스 목록), 소분류 인덱스 -1은 중분류 셀
+  const cellsByCategory: Map<number, number[]>[] = categories.map(() => new Map());
+  cells.category.forEach((categoryIndex, i) => {
+    const bySubcategory = cellsByCategory[categoryIndex];
+    const subcategoryIndex = cells.subcategory[i];
+    const list = bySubcategory.get(subcategoryIndex);
+    if (list) {
+      list.push(i);
+    } else {
+      bySubcategory.set(subcategoryIndex, [i]);
+    }
+  });
+
+  const data: StockWeeksData = {};
+
+  categories.forEach((category, categoryIndex) => {
+    let cached: CategoryData | undefined;
+
+    Object.defineProperty(data, category, {
+      enumerable: true,
+      configurable: true,
+      get(): CategoryData {
+        if (!cached) {
+          const bySubcategory = cellsByCategory[categoryIndex];
+          const categoryData: CategoryData = buildYearBlocks(payload, bySubcategory.get(-1) ?? []);
+          const subcategoryData: { [subCategory: string]: SubCategoryData } = {};
+          subcategoriesByCategory[categoryIndex].forEach((subcategoryIndex) => {
+            subcategoryData[subcategories[subcategoryIndex]] = buildYearBlocks(
+              payload,
+              bySubcategory.get(subcategoryIndex) ?? []
+            );
+          });
+          categoryData.소분류 = subcategoryData;
+          cached = categoryData;
+        }
+        return cached;
+      },
+    });
+  });
+
+  return data;
+}
+
+/**
+ * 컬럼형 JSON 파일을 가져와 StockWeeksData로 복원
+ * @param url - 예: "/data/stock_weeks_MLB.columnar.json"
+ */
+export async function loadColumnarStockWeeks(url: string): Promise<StockWeeksData> {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Failed to load ${url}: ${response.status}`);
+  }
+  const payload = (await response.json()) as ColumnarStockWeeks;
+  if (payload.format !== "stock-weeks-columnar") {
+    throw new Error(`Unsupported stock weeks format: ${payload.format}`);
+  }
+  return fromColumnarStockWeeks(payload);
+}
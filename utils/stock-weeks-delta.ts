@@ -0,0 +1,117 @@
+/**
+ * 재고주수 델타(stock_weeks_<BRAND>.delta.json) 적용 헬퍼
+ * preprocess_stock_weeks.py가 대시보드 JSON을 저장할 때 직전 실행 대비 바뀐 셀만 델타로 함께 저장하므로,
+ * 이미 로드한 데이터가 델타의 기준 버전이면 전체 파일을 다시 받지 않고 바뀐 셀만 반영합니다.
+ */
+
+import { CategoryData, MonthData, StockWeeksData, SubCategoryData, YearData } from "@/types/stock-weeks";
+
+// 델타 파일 구조
+export interface StockWeeksDelta {
+  format: "stock-weeks-delta";
+  version: number;
+  brand: string | null;
+  baseVersion: string | null; // 직전 파일의 데이터 버전 (없으면 null → 전체 파일 로드)
+  dataVersion: string; // 이번 파일의 데이터 버전
+  generatedAt: string;
+  set: [string, string | null, string, string, MonthData][]; // [중분류, 소분류 또는 null, 연도, 월, 셀]
+  remove: [string, string | null, string][]; // [중분류, 소분류 또는 null, 연도]
+}
+
+// 데이터 + 데이터 버전
+export interface VersionedStockWeeks {
+  data: StockWeeksData;
+  dataVersion: string;
+}
+
+/**
+ * "/data/stock_weeks_MLB.json" → "/data/stock_weeks_MLB.delta.json"
+ */
+export function toDeltaUrl(url: string): string {
+  return url.replace(/\.json$/, ".delta.json");
+}
+
+/**
+ * 델타를 StockWeeksData에 적용 (data를 직접 수정, 같은 델타를 다시 적용해도 결과 동일)
+ * 빈 소분류/중분류는 삭제하고, 소분류 블록은 항상 연도 키 뒤에 둡니다.
+ */
+export function applyStockWeeksDelta(data: StockWeeksData, delta: StockWeeksDelta): StockWeeksData {
+  delta.remove.forEach(([category, subCategory, year]) => {
+    const categoryData = data[category];
+    if (!categoryData) {
+      return;
+    }
+    if (subCategory === null) {
+      delete categoryData[year];
+    } else if (categoryData.소분류?.[subCategory]) {
+      delete categoryData.소분류[subCategory][year];
+      if (Object.keys(categoryData.소분류[subCategory]).length === 0) {
+        delete categoryData.소분류[subCategory];
+      }
+    }
+    const hasYears = Object.keys(categoryData).some((key) => key !== "소분류");
+    if (!hasYears && Object.keys(categoryData.소분류 ?? {}).length === 0) {
+      delete data[category];
+    }
+  });
+
+  delta.set.forEach(([category, subCategory, year, month, cell]) => {
+    const categoryData: CategoryData = data[category] ?? {};
+    if (subCategory === null) {
+      const yearData = (categoryData[year] as YearData | undefined) ?? {};
+      yearData[month] = cell;
+      categoryData[year] = yearData;
+    } else {
+      const subcategoryData = categoryData.소분류 ?? {};
+      const years: SubCategoryData = subcategoryData[subCategory] ?? {};
+      years[year] = { ...(years[year] ?? {}), [month]: cell };
+      subcategoryData[subCategory] = years;
+      categoryData.소분류 = subcategoryData;
+    }
+
+    // 소분류 블록이 항상 연도 키 뒤에 오도록 다시 추가
+    if (categoryData.소분류) {
+      const subcategoryData = categoryData.소분류;
+      delete categoryData.소분류;
+      categoryData.소분류 = subcategoryData;
+    }
+    data[category] = categoryData;
+  });
+
+  return data;
+}
+
+/**
+ * 최신 재고주수 데이터 가져오기
+ * - 델타의 데이터 버전이 current와 같으면 그대로 반환
+ * - 델타의 기준 버전이 current와 같으면 델타만 적용
+ * - 그 외(첫 로드, 여러 번 갱신을 놓친 경우)에는 전체 파일을 데이터 버전을 붙여 다시 받음
+ * @param url - 예: "/data/stock_weeks_MLB.json"
+ * @param current - 이전에 이 함수로 받은 결과 (없으면 null)
+ */
+export async function refreshStockWeeks(
+  url: string,
+  current: VersionedStockWeeks | null
+): Promise<VersionedStockWeeks> {
+  const deltaResponse = await fetch(toDeltaUrl(url), { cache: "no-cache" });
+  if (!deltaResponse.ok) {
+    throw new Error(`Failed to load ${toDeltaUrl(url)}: ${deltaResponse.status}`);
+  }
+  const delta = (await deltaResponse.json()) as StockWeeksDelta;
+  if (delta.format !== "stock-weeks-delta") {
+    throw new Error(`Unsupported stock weeks delta format: ${delta.format}`);
+  }
+
+  if (current && current.dataVersion === delta.dataVersion) {
+    return current;
+  }
+  if (current && delta.baseVersion !== null && current.dataVersion === delta.baseVersion) {
+    return { data: applyStockWeeksDelta(current.data, delta), dataVersion: delta.dataVersion };
+  }
+
+  const response = await fetch(`${url}?v=${delta.dataVersion}`);
+  if (!response.ok) {
+    throw new Error(`Failed to load ${url}: ${response.status}`);
+  }
+  return { data: (await response.json()) as StockWeeksData, dataVersion: delta.dataVersion };
+}
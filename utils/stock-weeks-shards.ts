@@ -0,0 +1,111 @@
+/**
+ * 재고주수 샤드(public/data/shards) 로더
+ * preprocess_stock_weeks.py의 --format shards 출력에서 화면에 필요한 (브랜드, 중분류, 연도)만 가져옵니다.
+ */
+
+import { Brand, CategoryData, StockWeeksData, SubCategoryData, YearData } from "@/types/stock-weeks";
+
+// 샤드 매니페스트 항목
+export interface ShardEntry {
+  brand: string; // 파일명 기준 브랜드 키 (예: "MLB_KIDS")
+  category: string;
+  year: string;
+  path: string; // shards 폴더 기준 상대 경로
+  bytes: number;
+  sha256: string;
+}
+
+// 샤드 매니페스트 (shards/manifest.json)
+export interface ShardManifest {
+  version: number;
+  shards: ShardEntry[];
+}
+
+// 샤드 파일 내용: 한 연도만 담은 중분류 데이터 조각
+export interface StockWeeksShard {
+  [year: string]: YearData | { [subCategory: string]: SubCategoryData };
+  소분류: { [subCategory: string]: SubCategoryData };
+}
+
+export const SHARDS_BASE_URL = "/data/shards";
+
+/**
+ * 브랜드명 → 샤드 브랜드 키 (출력 파일명과 동일하게 공백을 "_"로 변환)
+ */
+export function toShardBrandKey(brand: Brand): string {
+  return brand.replace(/ /g, "_");
+}
+
+/**
+ * 샤드 매니페스트 로드
+ */
+export async function fetchShardManifest(baseUrl: string = SHARDS_BASE_URL): Promise<ShardManifest> {
+  const response = await fetch(`${baseUrl}/manifest.json`, { cache: "no-cache" });
+  if (!response.ok) {
+    throw new Error(`Failed to load shard manifest: ${response.status}`);
+  }
+  return (await response.json()) as ShardManifest;
+}
+
+/**
+ * 샤드 하나를 StockWeeksData에 병합 (연도 블록 및 소분류별 연도 블록 추가)
+ */
+export function mergeStockWeeksShard(target: StockWeeksData, category: string, shard: StockWeeksShard): void {
+  const categoryData: CategoryData = target[category] ?? {};
+  const subcategoryData = categoryData.소분류 ?? {};
+
+  Object.entries(shard).forEach(([key, value]) => {
+    if (key !== "소분류") {
+      categoryData[key] = value as YearData;
+    }
+  });
+
+  Object.entries(shard.소분류 ?? {}).forEach(([subCategory, years]) => {
+    subcategoryData[subCategory] = { ...(subcategoryData[subCategory] ?? {}), ...years };
+  });
+
+  // 소분류 블록이 항상 연도 키 뒤에 오도록 다시 추가
+  delete categoryData.소분류;
+  categoryData.소분류 = subcategoryData;
+  target[category] = categoryData;
+}
+
+/**
+ * 지정한 브랜드/중분류/연도의 샤드만 가져와 StockWeeksData로 병합
+ * 샤드 URL에 내용 해시를 붙여 내용이 바뀐 샤드만 다시 받도록 합니다.
+ * @param manifest - fetchShardManifest() 결과
+ * @param brand - 브랜드
+ * @param categories - 가져올 중분류 목록
+ * @param years - 가져올 연도 목록 (예: ["2024", "2025"])
+ * @param target - 이미 로드된 데이터에 추가할 경우 지정
+ */
+export async function loadStockWeeksShards(
+  manifest: ShardManifest,
+  brand: Brand,
+  categories: string[],
+  years: string[],
+  target: StockWeeksData = {},
+  baseUrl: string = SHARDS_BASE_URL
+): Promise<StockWeeksData> {
+  const brandKey = toShardBrandKey(brand);
+  const entries = manifest.shards.filter(
+    (entry) => entry.brand === brandKey && categories.includes(entry.category) && years.includes(entry.year)
+  );
+
+  const shards = await Promise.all(
+    entries.map(async (entry) => {
+      const response = await fetch(`${baseUrl}/${entry.path}?v=${entry.sha256.slice(0, 12)}`);
+      if (!response.ok) {
+        throw new Error(`Failed to load shard ${entry.path}: ${response.status}`);
+      }
+      return { entry, shard: (await response.json()) as StockWeeksShard };
+    })
+  );
+
+  // 연도 순서대로 병합하여 키 순서를 원본 JSON과 맞춤
+  shards
+    .sort((a, b) => a.entry.year.localeCompare(b.entry.year))
+    .forEach(({ entry, shard }) => mergeStockWeeksShard(target, entry.category, shard));
+
+  return target;
+}
@@ -0,0 +1,104 @@
+/**
+ * 창고재고주수 계수(stock_weeks_<BRAND>.warehouse.json) 조회 헬퍼
+ * 창고재고주수는 직영 판매예정 주수(n)에 대해 선형이므로, preprocess_stock_weeks.py의 --format warehouse 출력에는
+ * 셀별 계수(직영재고, 주간 전체판매, 주간 직영판매)만 저장되어 있고 n을 바꿀 때 곱셈 한 번으로 계산합니다.
+ */
+
+import { BaseData } from "@/types/stock-weeks";
+import { calcWeeksFromBase } from "@/utils/calc-weeks";
+
+// 창고재고주수 계수 JSON 구조
+export interface WarehouseWeeksTable {
+  format: "stock-weeks-warehouse";
+  version: number;
+  categories: string[];
+  subcategories: string[];
+  years: string[];
+  cells: {
+    category: number[];
+    subcategory: number[]; // -1이면 중분류 셀
+    year: number[];
+    month: number[];
+  };
+  orStock: number[]; // 직영재고금액
+  weeklySales: (number | null)[]; // 주간 전체판매, null이면 "판매0"
+  orWeeklySales: number[]; // 주간 직영판매
+}
+
+/**
+ * (중분류, 소분류, 연도, 월, n) → 창고재고주수
+ * 표에 없는 셀(데이터 없는 월)이거나 n이 0 이상의 유한한 수가 아니면 undefined
+ */
+export type WarehouseWeeksLookup = (
+  category: string,
+  subCategory: string | null,
+  year: string,
+  month: number | string,
+  nWeeks: number
+) => number | string | undefined;
+
+function cellKey(category: string, subCategory: string | null, year: string, month: number | string): string {
+  return `${category}|${subCategory ?? ""}|${year}|${month}`;
+}
+
+/**
+ * 창고재고주수 계수 → 조회 함수 (셀 위치 인덱스는 한 번만 만듦)
+ * 값 = (직영재고 - 주간 직영판매 × n) / 주간 전체판매, 전처리 출력과 같이 소수점 2자리 반올림
+ */
+export function createWarehouseWeeksLookup(table: WarehouseWeeksTable): WarehouseWeeksLookup {
+  const { categories, subcategories, years, cells, orStock, weeklySales, orWeeklySales } = table;
+
+  const cellIndex = new Map<string, number>();
+  cells.category.forEach((categoryIndex, i) => {
+    const subcategoryIndex = cells.subcategory[i];
+    const subCategory = subcategoryIndex === -1 ? null : subcategories[subcategoryIndex];
+    cellIndex.set(cellKey(categories[categoryIndex], subCategory, years[cells.year[i]], cells.month[i]), i);
+  });
+
+  return (category, subCategory, year, month, nWeeks) => {
+    if (!Number.isFinite(nWeeks) || nWeeks < 0) {
+      return undefined;
+    }
+    const i = cellIndex.get(cellKey(category, subCategory, year, month));
+    if (i === undefined) {
+      return undefined;
+    }
+    const weekly = weeklySales[i];
+    if (weekly === null) {
+      return "판매0";
+    }
+    return Math.round(((orStock[i] - orWeeklySales[i] * nWeeks) / weekly) * 100) / 100;
+  };
+}
+
+/**
+ * 창고재고주수 조회, 계수 파일에 없는 셀이면 기초데이터로 계산 (calcWeeksFromBase)
+ */
+export function warehouseWeeksOrCalc(
+  lookup: WarehouseWeeksLookup | null,
+  baseData: BaseData | undefined,
+  category: string,
+  subCategory: string | null,
+  year: string,
+  month: number | string,
+  nWeeks: number
+): number | string | null {
+  const value = lookup?.(category, subCategory, year, month, nWeeks);
+  return value === undefined ? calcWeeksFromBase(baseData, "창고재고주수", nWeeks) : value;
+}
+
+/**
+ * 창고재고주수 계수 파일을 가져와 조회 함수 생성
+ * @param url - 예: "/data/stock_weeks_MLB.warehouse.json"
+ */
+export async function loadWarehouseWeeks(url: string): Promise<WarehouseWeeksLookup> {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Failed to load ${url}: ${response.status}`);
+  }
+  const table = (await response.json()) as WarehouseWeeksTable;
+  if (table.format !== "stock-weeks-warehouse" || table.version !== 2) {
+    throw new Error(`Unsupported warehouse weeks format: ${table.format} v${table.version}`);
+  }
+  return createWarehouseWeeksLookup(table);
+}